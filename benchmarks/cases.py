@@ -0,0 +1,144 @@
+"""Сценарии бенчмарков: подготовка данных (setup) и измеряемая операция (run).
+
+Каждый сценарий возвращает число обработанных строк — из него считается
+пропускная способность. Файлы с данными генерируются один раз на размер и
+переиспользуются между запусками.
+"""
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional
+
+from scr.file_handlers import FileHandler
+from scr.generators import filter_by_currency, write_transactions
+from scr.masks import mask_account_card, mask_transactions
+from scr.processing import filter_by_state, process_transactions
+from scr.reports import write_report  # noqa: F401 — импорт модуля не должен попадать в замер
+from scr.utils import format_transaction
+from scr.validation import compile_validator
+
+DATA_SEED = 20240101
+
+
+class Case(NamedTuple):
+    name: str
+    setup: Callable[[Path, int], object]
+    run: Callable[[object], int]
+    max_rows: Optional[int] = None
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, setup: Callable[[Path, int], object], max_rows: Optional[int] = None):
+    def register(run):
+        CASES[name] = Case(name, setup, run, max_rows)
+        return run
+
+    return register
+
+
+def data_file(workdir: Path, rows: int, fmt: str) -> Path:
+    """Сгенерированный файл на rows строк; создаётся при первом обращении"""
+    path = Path(workdir) / f"transactions_{rows}.{fmt}"
+    if not path.exists():
+        tmp = path.with_name(f".{path.name}.tmp")
+        write_transactions(tmp, rows, seed=DATA_SEED, fmt=fmt)
+        tmp.replace(path)
+    return path
+
+
+def json_file(workdir, rows):
+    return data_file(workdir, rows, 'json')
+
+
+def csv_file(workdir, rows):
+    return data_file(workdir, rows, 'csv')
+
+
+def xlsx_file(workdir, rows):
+    return data_file(workdir, rows, 'xlsx')
+
+
+def records(workdir, rows):
+    return FileHandler.load_json(json_file(workdir, rows))
+
+
+def report_target(workdir, rows):
+    return records(workdir, rows), Path(workdir) / f"report_{rows}.jsonl"
+
+
+def _count(iterable) -> int:
+    count = 0
+    for _ in iterable:
+        count += 1
+    return count
+
+
+# --- загрузчики FileHandler ---
+
+@case('load_json', json_file)
+def load_json(path):
+    return len(FileHandler.load_json(path))
+
+
+@case('iter_json', json_file)
+def iter_json(path):
+    return _count(FileHandler.iter_json(path))
+
+
+@case('load_csv', csv_file)
+def load_csv(path):
+    return len(FileHandler.load_csv(path))
+
+
+@case('iter_csv_transactions', csv_file)
+def iter_csv_transactions(path):
+    return _count(FileHandler.iter_csv_transactions(path))
+
+
+# XLSX на миллионах строк генерируется и читается минутами, поэтому размер ограничен
+@case('load_xlsx', xlsx_file, max_rows=1_000_000)
+def load_xlsx(path):
+    return len(FileHandler.load_xlsx(path))
+
+
+@case('iter_xlsx', xlsx_file, max_rows=1_000_000)
+def iter_xlsx(path):
+    return _count(FileHandler.iter_xlsx(path))
+
+
+# --- обработка ---
+
+@case('process_transactions', records)
+def process(transactions):
+    return process_transactions(transactions, keep_records=False)['count']
+
+
+@case('validate', records)
+def validate(transactions):
+    check = compile_validator()
+    return sum(1 for tx in transactions if not check(tx))
+
+
+@case('filter', records)
+def filter_transactions(transactions):
+    filter_by_state(transactions)
+    _count(filter_by_currency(transactions, 'USD'))
+    return len(transactions)
+
+
+@case('mask', records)
+def mask(transactions):
+    # Кэш очищается, чтобы каждый повтор измерял одинаковую работу
+    mask_account_card.cache_clear()
+    return _count(mask_transactions(transactions))
+
+
+@case('format_transaction', records)
+def format_all(transactions):
+    return _count(map(format_transaction, transactions))
+
+
+@case('save_report', report_target)
+def save_report(state):
+    transactions, path = state
+    return FileHandler.save_report(transactions, path)
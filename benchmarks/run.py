@@ -0,0 +1,186 @@
+"""Запуск бенчмарков и сравнение с сохранённой базовой линией.
+
+    python -m benchmarks.run --rows 10000 --rows 1000000 --allocations
+    python -m benchmarks.run --case load_json --case mask --threshold 0.3
+    python -m benchmarks.run --save-baseline
+
+Каждый сценарий выполняется в отдельном процессе, чтобы пиковый RSS не
+зависел от предыдущих замеров. Код возврата 1 означает регрессию больше
+порога по пропускной способности, пиковому RSS или объёму выделений.
+"""
+import argparse
+import gc
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.cases import CASES
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / 'baseline.json'
+DEFAULT_OUTPUT = BENCH_DIR / 'results.json'
+DEFAULT_WORKDIR = BENCH_DIR / '.data'
+DEFAULT_ROWS = 10_000
+DEFAULT_THRESHOLD = 0.25
+# Нижняя граница измеренного времени: быстрый сценарий может уложиться в разрешение таймера
+MIN_SECONDS = max(time.get_clock_info('perf_counter').resolution, 1e-9)
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса, МБ (ru_maxrss — в КБ в Linux и в байтах в macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def measure(name: str, rows: int, workdir, repeats: int = 3, allocations: bool = False) -> Dict:
+    """Замеряет сценарий: лучшее время из repeats, пиковый RSS и, по желанию, пик выделений tracemalloc"""
+    case = CASES[name]
+    Path(workdir).mkdir(parents=True, exist_ok=True)
+    state = case.setup(Path(workdir), rows)
+    setup_rss = peak_rss_mb()
+
+    times = []
+    processed = 0
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        processed = case.run(state)
+        times.append(time.perf_counter() - start)
+    seconds = max(min(times), MIN_SECONDS)
+    result = {
+        'case': name,
+        'rows': rows,
+        'processed': processed,
+        'seconds': round(seconds, 6),
+        'rows_per_s': round(processed / seconds, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'run_rss_mb': round(peak_rss_mb() - setup_rss, 1),
+    }
+    if allocations:
+        # Отдельный прогон: tracemalloc замедляет код и исказил бы время
+        gc.collect()
+        tracemalloc.start()
+        case.run(state)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['alloc_peak_mb'] = round(peak / (1024 * 1024), 2)
+    return result
+
+
+def run_benchmarks(cases: List[str], sizes: List[int], workdir=DEFAULT_WORKDIR, repeats: int = 3,
+                   allocations: bool = False, isolate: bool = True) -> List[Dict]:
+    results = []
+    for rows in sizes:
+        for name in cases:
+            max_rows = CASES[name].max_rows
+            if max_rows is not None and rows > max_rows:
+                print(f"{name}: пропущен для {rows} строк (максимум {max_rows})")
+                continue
+            args = (name, rows, str(workdir), repeats, allocations)
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                    result = executor.submit(measure, *args).result()
+            else:
+                result = measure(*args)
+            print(format_result(result))
+            results.append(result)
+    return results
+
+
+def format_result(result: Dict) -> str:
+    line = (f"{result['case']:<24} {result['rows']:>10} строк  {result['rows_per_s']:>14,.0f} строк/с  "
+            f"{result['seconds']:>9.3f} с  RSS {result['peak_rss_mb']:>8.1f} МБ")
+    if 'alloc_peak_mb' in result:
+        line += f"  выделения {result['alloc_peak_mb']:>8.1f} МБ"
+    return line
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Сравнивает результаты с базовой линией; возвращает описания регрессий больше порога"""
+    base = {(r['case'], r['rows']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        reference = base.get((result['case'], result['rows']))
+        if reference is None:
+            continue
+        title = f"{result['case']} ({result['rows']} строк)"
+        if result['rows_per_s'] < reference['rows_per_s'] * (1 - threshold):
+            regressions.append(f"{title}: {result['rows_per_s']:,.0f} строк/с "
+                               f"против {reference['rows_per_s']:,.0f} в базовой линии")
+        for key, label in (('peak_rss_mb', 'пиковый RSS'), ('alloc_peak_mb', 'пик выделений')):
+            if key in result and key in reference and result[key] > reference[key] * (1 + threshold):
+                regressions.append(f"{title}: {label} {result[key]} МБ против {reference[key]} МБ")
+    return regressions
+
+
+def make_report(results: List[Dict]) -> Dict:
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def load_report(file_path) -> Optional[Dict]:
+    path = Path(file_path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def save_report(report: Dict, file_path):
+    Path(file_path).write_text(json.dumps(report, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description="Бенчмарки обработки транзакций")
+    parser.add_argument('--case', dest='cases', action='append', choices=sorted(CASES),
+                        help="Сценарий (можно несколько раз; по умолчанию — все)")
+    parser.add_argument('--rows', dest='sizes', action='append', type=int,
+                        help=f"Размер данных, строк (можно несколько раз; по умолчанию {DEFAULT_ROWS})")
+    parser.add_argument('--repeats', type=int, default=3, help="Число повторов; берётся лучшее время")
+    parser.add_argument('--allocations', action='store_true', help="Дополнительно замерить выделения tracemalloc")
+    parser.add_argument('--workdir', default=str(DEFAULT_WORKDIR), help="Каталог для сгенерированных данных")
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help="Куда сохранить результаты (JSON)")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Файл базовой линии (JSON)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Допустимое ухудшение, доля (0.25 — 25%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="Записать результаты как новую базовую линию")
+    parser.add_argument('--no-isolate', dest='isolate', action='store_false',
+                        help="Выполнять сценарии в текущем процессе")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    results = run_benchmarks(args.cases or list(CASES), args.sizes or [DEFAULT_ROWS], args.workdir,
+                             args.repeats, args.allocations, args.isolate)
+    report = make_report(results)
+    save_report(report, args.output)
+
+    if args.save_baseline:
+        save_report(report, args.baseline)
+        print(f"Базовая линия сохранена в {args.baseline}")
+        return 0
+
+    baseline = load_report(args.baseline)
+    if baseline is None:
+        print(f"Базовая линия {args.baseline} не найдена, сравнение пропущено")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"РЕГРЕССИЯ: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
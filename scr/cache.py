@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from scr.table import CATEGORICAL_COLUMNS, TransactionTable
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path(os.environ.get('TRANSACTIONS_CACHE_DIR', Path.home() / '.cache' / 'homework-11'))
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_ARRAY_COLUMNS = ('ids', 'dates', 'amounts')
+
+
+def file_digest(file_path) -> str:
+    """Считает BLAKE2b-хэш содержимого файла блоками по 1 МБ"""
+    h = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ParseCache:
+    """Кэш разобранных файлов в виде набора .npy-массивов, читаемых через memory map.
+
+    Запись кэша привязана к абсолютному пути файла, его размеру, mtime и хэшу
+    содержимого. При совпадении размера и mtime хэш не пересчитывается (если не
+    задан verify_content=True); при изменении mtime содержимое сверяется по хэшу,
+    так что простое касание файла кэш не сбрасывает. Устаревшие и повреждённые
+    записи удаляются автоматически.
+    """
+
+    def __init__(self, cache_dir=None, verify_content: bool = False):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+        self.verify_content = verify_content
+
+    def entry_dir(self, source) -> Path:
+        resolved = str(Path(source).resolve())
+        return self.cache_dir / hashlib.sha1(resolved.encode('utf-8')).hexdigest()[:16]
+
+    def evict(self, source):
+        shutil.rmtree(self.entry_dir(source), ignore_errors=True)
+
+    def get(self, source) -> Optional[TransactionTable]:
+        """Возвращает таблицу из кэша или None, если записи нет или она устарела"""
+        entry = self.entry_dir(source)
+        meta_path = entry / 'meta.json'
+        if not meta_path.exists():
+            return None
+
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            if meta['version'] != CACHE_VERSION or meta['path'] != str(Path(source).resolve()):
+                raise ValueError("Запись кэша относится к другому файлу или версии")
+            stat = os.stat(source)
+            if meta['size'] != stat.st_size:
+                raise ValueError("Размер файла изменился")
+            if self.verify_content or meta['mtime_ns'] != stat.st_mtime_ns:
+                if file_digest(source) != meta['digest']:
+                    raise ValueError("Содержимое файла изменилось")
+                if meta['mtime_ns'] != stat.st_mtime_ns:
+                    meta['mtime_ns'] = stat.st_mtime_ns
+                    meta_path.write_text(json.dumps(meta), encoding='utf-8')
+            return self._read(entry, meta)
+        except (OSError, ValueError, KeyError, TypeError):
+            self.evict(source)
+            return None
+
+    @staticmethod
+    def _read(entry: Path, meta: Dict) -> TransactionTable:
+        rows = meta['rows']
+        arrays = {name: np.load(entry / f'{name}.npy', mmap_mode='r') for name in _ARRAY_COLUMNS}
+        codes = {col: np.load(entry / f'codes_{i}.npy', mmap_mode='r') for i, col in enumerate(CATEGORICAL_COLUMNS)}
+        if any(len(a) != rows for a in list(arrays.values()) + list(codes.values())):
+            raise ValueError("Повреждённая запись кэша: длины столбцов не совпадают")
+        categories = {
+            col: np.load(entry / f'categories_{i}.npy').tolist()
+            for i, col in enumerate(CATEGORICAL_COLUMNS)
+        }
+        return TransactionTable(arrays['ids'], arrays['dates'], arrays['amounts'], codes, categories)
+
+    def put(self, source, table: TransactionTable, digest: Optional[str] = None, stat=None):
+        """Сохраняет таблицу; запись сначала пишется во временный каталог, затем атомарно подменяется"""
+        stat = stat or os.stat(source)
+        entry = self.entry_dir(source)
+        tmp = entry.with_name(f'{entry.name}.tmp{os.getpid()}')
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        np.save(tmp / 'ids.npy', np.ascontiguousarray(table.ids))
+        np.save(tmp / 'dates.npy', np.ascontiguousarray(table.dates))
+        np.save(tmp / 'amounts.npy', np.ascontiguousarray(table.amounts))
+        for i, col in enumerate(CATEGORICAL_COLUMNS):
+            np.save(tmp / f'codes_{i}.npy', np.ascontiguousarray(table.codes(col)))
+            np.save(tmp / f'categories_{i}.npy', np.array([str(c) for c in table.categories(col)], dtype=str))
+        meta = {
+            'version': CACHE_VERSION,
+            'path': str(Path(source).resolve()),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'digest': digest or file_digest(source),
+            'rows': len(table),
+        }
+        (tmp / 'meta.json').write_text(json.dumps(meta), encoding='utf-8')
+
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+
+    def load(self, source, parser: Callable = TransactionTable.from_file) -> TransactionTable:
+        """Возвращает таблицу из кэша, а при промахе разбирает файл и кэширует результат"""
+        table = self.get(source)
+        if table is not None:
+            return table
+        # Отпечаток снимается до разбора: если файл поменяется во время чтения,
+        # следующая проверка по хэшу отбросит запись
+        stat = os.stat(source)
+        digest = file_digest(source)
+        table = parser(source)
+        try:
+            self.put(source, table, digest=digest, stat=stat)
+        except OSError:
+            # Невозможность записать кэш не должна мешать загрузке
+            self.evict(source)
+        return table
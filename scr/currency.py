@@ -0,0 +1,277 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scr.dates import day_ordinal
+from scr.money import format_amount, parse_amount
+from scr.processing import get_amount, get_currency_code
+
+DEFAULT_REPORTING_CURRENCY = 'RUB'
+RATE_CACHE_TTL = 3600.0
+RATE_CACHE_SIZE = 100_000
+CONVERT_BATCH_SIZE = 10_000
+INT64_MAX = np.iinfo(np.int64).max
+
+# (код валюты, день 'YYYY-MM-DD')
+RatePair = Tuple[str, str]
+
+
+@lru_cache(maxsize=4096)
+def rate_day(value) -> Optional[str]:
+    """День курса для даты транзакции (в UTC), 'YYYY-MM-DD'"""
+    ordinal = day_ordinal(value)
+    if ordinal is None:
+        return None
+    return date.fromordinal(ordinal).isoformat()
+
+
+class RateProvider(ABC):
+    """Источник курсов: сколько единиц базовой валюты стоит единица валюты в заданный день.
+
+    Наследники реализуют fetch — один вызов на пачку уникальных пар (валюта, день).
+    Пары, для которых курса нет, в ответ не включаются.
+    """
+
+    base = DEFAULT_REPORTING_CURRENCY
+
+    @abstractmethod
+    def fetch(self, pairs: Sequence[RatePair]) -> Dict[RatePair, Decimal]:
+        """Курсы к базовой валюте для пар (валюта, день)"""
+
+
+class FileRateProvider(RateProvider):
+    """Курсы из локального JSON-файла:
+
+    {"base": "RUB", "rates": {"2019-08-26": {"USD": "64.52", "EUR": "71.50"}, ...}}
+
+    Если на нужный день курса нет, берётся последний известный курс до этого дня.
+    """
+
+    def __init__(self, file_path):
+        data = json.loads(Path(file_path).read_text(encoding='utf-8'))
+        self.base = data.get('base', DEFAULT_REPORTING_CURRENCY)
+        history: Dict[str, List[Tuple[str, Decimal]]] = {}
+        for day, rates in sorted(data.get('rates', {}).items()):
+            for code, rate in rates.items():
+                history.setdefault(code, []).append((day, Decimal(str(rate))))
+        self._days = {code: [day for day, _ in items] for code, items in history.items()}
+        self._rates = {code: [rate for _, rate in items] for code, items in history.items()}
+
+    def fetch(self, pairs: Sequence[RatePair]) -> Dict[RatePair, Decimal]:
+        result = {}
+        for code, day in pairs:
+            days = self._days.get(code)
+            if not days:
+                continue
+            pos = bisect_right(days, day) - 1
+            if pos >= 0:
+                result[(code, day)] = self._rates[code][pos]
+        return result
+
+
+class HTTPRateProvider(RateProvider):
+    """Курсы из HTTP-сервиса: GET {base_url}/rates?date=YYYY-MM-DD&base=RUB&symbols=USD,EUR
+
+    Ответ — {"rates": {"USD": "64.52", ...}}. Все валюты одного дня
+    запрашиваются одним запросом через BankAPIClient (пул соединений и повторы).
+    """
+
+    def __init__(self, base_url: str, base: str = DEFAULT_REPORTING_CURRENCY, client=None):
+        from scr.external_api import BankAPIClient
+
+        self.base = base
+        self.base_url = base_url.rstrip('/')
+        self.client = client or BankAPIClient(self.base_url)
+
+    def fetch(self, pairs: Sequence[RatePair]) -> Dict[RatePair, Decimal]:
+        by_day: Dict[str, List[str]] = {}
+        for code, day in pairs:
+            by_day.setdefault(day, []).append(code)
+        result = {}
+        for day, codes in sorted(by_day.items()):
+            params = {'date': day, 'base': self.base, 'symbols': ','.join(sorted(set(codes)))}
+            rates = self.client.request(f"{self.base_url}/rates", params=params).json().get('rates', {})
+            for code in codes:
+                if rates.get(code) is not None:
+                    result[(code, day)] = Decimal(str(rates[code]))
+        return result
+
+
+class RateCache:
+    """Кэш курсов в памяти процесса по ключу (валюта, день) с временем жизни записей"""
+
+    def __init__(self, ttl: float = RATE_CACHE_TTL, maxsize: int = RATE_CACHE_SIZE, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: 'OrderedDict[RatePair, Tuple[Decimal, float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, pair: RatePair) -> Optional[Decimal]:
+        entry = self._entries.get(pair)
+        if entry is not None:
+            if entry[1] > self._clock():
+                self.hits += 1
+                return entry[0]
+            del self._entries[pair]
+        self.misses += 1
+        return None
+
+    def put(self, pair: RatePair, rate: Decimal):
+        self._entries[pair] = (rate, self._clock() + self.ttl)
+        self._entries.move_to_end(pair)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def evict_expired(self) -> int:
+        now = self._clock()
+        expired = [pair for pair, (_, expires) in self._entries.items() if expires <= now]
+        for pair in expired:
+            del self._entries[pair]
+        return len(expired)
+
+
+class CurrencyConverter:
+    """Пересчёт сумм в валюту отчёта.
+
+    Курсы запрашиваются у поставщика одним вызовом на все уникальные пары
+    (валюта, день) пачки, которых нет в кэше; сам пересчёт выполняется
+    над массивом сумм в копейках в целых числах с тем же округлением, что у
+    parse_amount (половина — от нуля). Суммы без валюты считаются уже
+    выраженными в валюте отчёта; для транзакций без даты берётся последний
+    известный курс (курс на сегодня).
+    """
+
+    def __init__(self, provider: RateProvider, target: str = DEFAULT_REPORTING_CURRENCY,
+                 cache: Optional[RateCache] = None):
+        self.provider = provider
+        self.target = target
+        self.cache = cache if cache is not None else RateCache()
+        self.fetches = 0
+
+    def rates(self, pairs: Iterable[RatePair]) -> Dict[RatePair, Decimal]:
+        """Курсы в валюту отчёта для пар (валюта, день); ValueError, если курса нет"""
+        return {pair: Decimal(rate.numerator) / rate.denominator for pair, rate in self._exact_rates(pairs).items()}
+
+    def _exact_rates(self, pairs: Iterable[RatePair]) -> Dict[RatePair, Fraction]:
+        # Кросс-курс как точная дробь: у частного Decimal числитель в 28 знаков и не помещается в int64
+        pairs = set(pairs)
+        base = self.provider.base
+        today = date.today().isoformat()
+        days = {pair: pair[1] or today for pair in pairs}
+        # Курсы к базовой валюте поставщика; для кросс-курса нужен ещё курс валюты отчёта
+        needed = {(code, days[(code, day)]) for code, day in pairs if code != self.target}
+        if self.target != base:
+            needed |= {(self.target, day) for code, day in needed}
+        to_base = {}
+        missing = []
+        for pair in needed:
+            rate = Decimal(1) if pair[0] == base else self.cache.get(pair)
+            if rate is None:
+                missing.append(pair)
+            else:
+                to_base[pair] = rate
+        if missing:
+            fetched = self.provider.fetch(sorted(missing))
+            self.fetches += 1
+            for pair, rate in fetched.items():
+                self.cache.put(pair, rate)
+                to_base[pair] = rate
+
+        result = {}
+        unresolved = []
+        for pair in pairs:
+            code, day = pair[0], days[pair]
+            if code == self.target:
+                result[pair] = Fraction(1)
+            elif (code, day) in to_base and (self.target == base or (self.target, day) in to_base):
+                cross = to_base[(self.target, day)] if self.target != base else Decimal(1)
+                result[pair] = Fraction(to_base[(code, day)]) / Fraction(cross)
+            else:
+                unresolved.append((code, day))
+        if unresolved:
+            listed = ', '.join(f"{code} на {day}" for code, day in sorted(unresolved, key=str)[:5])
+            raise ValueError(f"Нет курса для {listed}")
+        return result
+
+    def convert_amounts(self, amounts: np.ndarray, currencies: Sequence[Optional[str]],
+                        days: Sequence[Optional[str]]) -> np.ndarray:
+        """Пересчитывает массив сумм в копейках; возвращает int64 в копейках валюты отчёта"""
+        amounts = np.asarray(amounts, dtype=np.int64)
+        pair_codes = np.empty(len(amounts), dtype=np.int64)
+        unique: Dict[RatePair, int] = {}
+        for i, (code, day) in enumerate(zip(currencies, days)):
+            pair = (code or self.target, day)
+            pos = unique.get(pair)
+            if pos is None:
+                pos = unique[pair] = len(unique)
+            pair_codes[i] = pos
+        rates = self._exact_rates(unique)
+        numerators = [rates[pair].numerator for pair in unique]
+        denominators = [rates[pair].denominator for pair in unique]
+        # Целочисленный пересчёт в int64; целые Python (dtype=object) — только если произведение переполнится
+        largest = max(int(amounts.max()), -int(amounts.min())) if len(amounts) else 0
+        fits = (largest * max(map(abs, numerators), default=0) <= INT64_MAX
+                and 2 * max(denominators, default=1) <= INT64_MAX)
+        dtype = np.int64 if fits else object
+        products = amounts.astype(dtype) * np.array(numerators, dtype=dtype)[pair_codes]
+        denominators = np.array(denominators, dtype=dtype)[pair_codes]
+        magnitudes = np.abs(products)
+        quotients = magnitudes // denominators
+        remainders = magnitudes - quotients * denominators
+        # Половина копейки округляется от нуля, как в parse_amount
+        quotients = quotients + (2 * remainders >= denominators)
+        return np.where(products < 0, -quotients, quotients).astype(np.int64)
+
+    def convert_table(self, table) -> np.ndarray:
+        """Суммы TransactionTable в валюте отчёта (int64, копейки)"""
+        categories = table.categories('currency') + [None]
+        currencies = np.array(categories, dtype=object)[table.codes('currency')]
+        days = np.datetime_as_string(table.dates.astype('datetime64[D]'), unit='D')
+        days = np.where(days == 'NaT', None, days)
+        return self.convert_amounts(table.amounts, currencies, days)
+
+    def _converted_record(self, tx: Dict, minor: int) -> Dict:
+        converted = dict(tx)
+        amount = format_amount(int(minor))
+        operation_amount = tx.get('operationAmount')
+        if isinstance(operation_amount, dict):
+            converted['originalAmount'] = operation_amount
+            converted['operationAmount'] = {'amount': amount,
+                                            'currency': {'name': self.target, 'code': self.target}}
+        else:
+            converted['originalAmount'] = {'amount': get_amount(tx),
+                                           'currency': {'name': tx.get('currency_name'),
+                                                        'code': get_currency_code(tx)}}
+            converted.update(amount=amount, currency_name=self.target, currency_code=self.target)
+        return converted
+
+    def convert_transactions(self, transactions: Iterable[Dict],
+                             batch_size: int = CONVERT_BATCH_SIZE) -> Iterator[Dict]:
+        """Выдаёт копии транзакций с суммой в валюте отчёта; исходная сумма — в originalAmount"""
+        transactions = iter(transactions)
+        while True:
+            batch = [tx for _, tx in zip(range(batch_size), transactions)]
+            if not batch:
+                break
+            converted = self.convert_amounts(
+                [parse_amount(get_amount(tx)) for tx in batch],
+                [get_currency_code(tx) for tx in batch],
+                [rate_day(tx.get('date')) for tx in batch],
+            )
+            for tx, minor in zip(batch, converted):
+                yield self._converted_record(tx, minor)
@@ -0,0 +1,149 @@
+import re
+from datetime import date, datetime, time, timezone
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence
+
+DISPLAY_FORMAT = '%d.%m.%Y'
+DATE_CACHE_SIZE = 1 << 16
+_DAY_SEPARATORS = ('', 'T', ' ')
+# Расширенный ISO-вид без смещения, который NumPy разбирает сам: YYYY-MM-DD[Thh:mm[:ss[.ffffff]]][Z]
+_DATETIME64_RE = re.compile(r'\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?)?Z?')
+
+
+def parse_date(value) -> Optional[datetime]:
+    """Разбирает ISO-8601 дату в наивный datetime в UTC; None для пустых и некорректных значений.
+
+    Поддерживаются форматы выгрузок: '2019-08-26T10:50:58.294041',
+    '2023-09-05T11:30:32Z', '2019-08-26T10:50:58+03:00' и '2019-08-26'.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime.combine(value, time.min)
+    elif not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _has_offset(value: str) -> bool:
+    tail = value[19:]
+    return '+' in tail or '-' in tail
+
+
+def day_ordinal(value) -> Optional[int]:
+    """Номер дня (date.toordinal) в UTC; для дат без смещения — без полного разбора строки"""
+    if not value:
+        return None
+    if isinstance(value, str) and not _has_offset(value):
+        try:
+            return date.fromisoformat(value[:10]).toordinal()
+        except ValueError:
+            return None
+    parsed = parse_date(value)
+    return parsed.toordinal() if parsed else None
+
+
+def date_bound(value, upper: bool = False) -> datetime:
+    """Граница диапазона дат для фильтров; дата без времени в верхней границе включает весь день.
+
+    Общая для TransactionTable, TransactionIndex и TransactionStore, чтобы
+    date_to='2019-06-30' во всех трёх давал одинаковый результат.
+    """
+    is_day = (isinstance(value, date) and not isinstance(value, datetime)) or \
+        (isinstance(value, str) and len(value) == 10)
+    bound = parse_date(value)
+    if bound is None:
+        raise ValueError(f"Некорректная дата: {value!r}")
+    if upper and is_day:
+        bound = datetime.combine(bound.date(), time.max)
+    return bound
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _format_day(day: str, fmt: str) -> str:
+    parsed = date.fromisoformat(day)
+    if fmt == DISPLAY_FORMAT:
+        return f"{parsed.day:02d}.{parsed.month:02d}.{parsed.year:04d}"
+    return parsed.strftime(fmt)
+
+
+def format_date(value, fmt: str = DISPLAY_FORMAT) -> str:
+    """Форматирует дату для отображения (по умолчанию 26.08.2019); ValueError для некорректной даты.
+
+    Выводится календарный день в том виде, в каком он записан в выгрузке.
+    Результат кэшируется по дню, поэтому повторяющиеся даты не разбираются заново.
+    """
+    if isinstance(value, str):
+        if value[10:11] in _DAY_SEPARATORS and len(value) >= 10:
+            return _format_day(value[:10], fmt)
+        parsed = datetime.fromisoformat(value)
+    elif isinstance(value, (date, datetime)):
+        parsed = value
+    else:
+        raise ValueError(f"Некорректная дата: {value!r}")
+    day = parsed.date() if isinstance(parsed, datetime) else parsed
+    return _format_day(day.isoformat(), fmt)
+
+
+def format_date_column(values: Iterable, fmt: str = DISPLAY_FORMAT, default: Optional[str] = None) -> List:
+    """Форматирует столбец дат; пустые и некорректные значения заменяются на default"""
+    result = []
+    append = result.append
+    format_day = _format_day
+    for value in values:
+        try:
+            if value.__class__ is str and value[10:11] in _DAY_SEPARATORS and len(value) >= 10:
+                append(format_day(value[:10], fmt))
+            else:
+                append(format_date(value, fmt) if value else default)
+        except ValueError:
+            append(default)
+    return result
+
+
+def _datetime64_text(value) -> str:
+    if not value:
+        return 'NaT'
+    if isinstance(value, str) and _DATETIME64_RE.fullmatch(value):
+        # NumPy не поддерживает суффикс часового пояса; 'Z' — это уже UTC
+        return value[:-1] if value.endswith('Z') else value
+    # Смещения, базовый вид ('20190826'), недели, запятая в долях секунды — через полный разбор
+    parsed = parse_date(value)
+    return 'NaT' if parsed is None else parsed.isoformat()
+
+
+def _datetime64_or_nat(text: str):
+    import numpy as np
+
+    try:
+        return np.datetime64(text, 'us')
+    except ValueError:
+        return np.datetime64('NaT', 'us')
+
+
+def to_datetime64(value):
+    import numpy as np
+
+    return np.datetime64(_datetime64_text(value), 'us')
+
+
+def parse_date_column(values: Sequence):
+    """Разбирает столбец ISO-дат в массив datetime64[us] (UTC) одним вызовом NumPy.
+
+    Некорректные значения становятся NaT и не прерывают разбор всего столбца.
+    """
+    import numpy as np
+
+    texts = [_datetime64_text(v) for v in values]
+    try:
+        return np.array(texts, dtype='datetime64[us]')
+    except ValueError:
+        # Несуществующая дата в расширенном виде ('2019-13-45'): разбор по одному значению
+        return np.array([_datetime64_or_nat(text) for text in texts], dtype='datetime64[us]')
@@ -1,22 +1,150 @@
+import random
+import threading
+import time
 import requests
-from typing import Optional, List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterable, Iterator, Optional, List
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_BASE_URL = "https://api.example-bank.com/v1"
+
+
+class BankAPIError(Exception):
+    """Ошибка обращения к API банка после исчерпания повторов"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class BankAPIClient:
+    """Клиент API банка для массовых выгрузок.
+
+    Переиспользует соединения через общий requests.Session, ограничивает число
+    одновременных запросов к одному хосту, повторяет запросы при 429/5xx,
+    ошибках соединения и тайм-аутах с экспоненциальной задержкой и случайным разбросом
+    (с учётом Retry-After) и проходит по страницам ответа.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, max_per_host: int = 8, timeout=(3.05, 30),
+                 max_retries: int = 5, backoff: float = 0.5, max_backoff: float = 30.0,
+                 session: Optional[requests.Session] = None):
+        self.base_url = base_url.rstrip('/')
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_per_host, pool_maxsize=max_per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._limiters: Dict[str, threading.BoundedSemaphore] = {}
+        self._limiters_lock = threading.Lock()
+        self._sleep = time.sleep
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _limiter(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._limiters_lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = threading.BoundedSemaphore(self.max_per_host)
+            return limiter
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                try:
+                    delay = max(delay, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return min(delay, self.max_backoff)
+
+    def request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        """Выполняет GET с повторами; возвращает успешный ответ или бросает BankAPIError"""
+        limiter = self._limiter(url)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                with limiter:
+                    response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise BankAPIError(f"API Error: {e}") from e
+            except requests.RequestException as e:
+                # Неверный адрес, схема и т. п. — повтор не поможет
+                raise BankAPIError(f"API Error: {e}") from e
+            else:
+                if response.status_code < 400:
+                    return response
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    raise BankAPIError(f"API Error: HTTP {response.status_code} для {response.url}",
+                                       status=response.status_code)
+            self._sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    def iter_transactions(self, account_id: str, from_date: str, to_date: str) -> Iterator[Dict]:
+        """Выдаёт транзакции счёта постранично, следуя ссылке на следующую страницу.
+
+        Ссылка берётся из поля "next" тела ответа или из заголовка Link (rel="next").
+        """
+        url = f"{self.base_url}/accounts/{account_id}/transactions"
+        params = {'from': from_date, 'to': to_date}
+        seen = set()
+        while url and url not in seen:
+            seen.add(url)
+            response = self.request(url, params=params)
+            payload = response.json()
+            yield from payload.get('transactions', [])
+
+            next_url = payload.get('next') or response.links.get('next', {}).get('url')
+            # Ссылка на следующую страницу уже содержит все параметры запроса
+            url = urljoin(response.url, next_url) if next_url else None
+            params = None
+
+    def get_transactions(self, account_id: str, from_date: str, to_date: str) -> List[Dict]:
+        return list(self.iter_transactions(account_id, from_date, to_date))
+
+    def get_transactions_many(self, account_ids: Iterable[str], from_date: str, to_date: str,
+                              workers: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """Загружает транзакции нескольких счетов параллельно; порядок ключей совпадает с account_ids"""
+        account_ids = list(account_ids)
+        with ThreadPoolExecutor(max_workers=workers or self.max_per_host) as executor:
+            results = executor.map(lambda account_id: self.get_transactions(account_id, from_date, to_date),
+                                   account_ids)
+            return dict(zip(account_ids, results))
 
 
 class BankAPI:
-    def __init__(self, base_url: str = "https://api.example-bank.com/v1"):
+    """Прежний интерфейс получения транзакций; запросы выполняет BankAPIClient.
+
+    Ошибки не печатаются, а бросаются как BankAPIError.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, client: Optional[BankAPIClient] = None):
         self.base_url = base_url
+        self.client = client or BankAPIClient(base_url)
+
+    def close(self):
+        self.client.close()
 
-    def get_transactions(self, account_id: str, from_date: str, to_date: str) -> Optional[List[Dict]]:
-        endpoint = f"{self.base_url}/accounts/{account_id}/transactions"
-        params = {
-            'from': from_date,
-            'to': to_date
-        }
-
-        try:
-            response = requests.get(endpoint, params=params)
-            response.raise_for_status()
-            return response.json().get('transactions', [])
-        except requests.RequestException as e:
-            print(f"API Error: {e}")
-            return None
\ No newline at end of file
+    def get_transactions(self, account_id: str, from_date: str, to_date: str) -> List[Dict]:
+        return self.client.get_transactions(account_id, from_date, to_date)
@@ -1,7 +1,205 @@
+import codecs
 import json
 import csv
-import openpyxl
+import re
 from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple
+
+JSON_CHUNK_SIZE = 64 * 1024
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = (';', ',', '\t', '|')
+
+# Синонимы заголовков CSV -> поле канонической схемы (как в operations.json)
+CSV_COLUMN_ALIASES = {
+    'id': 'id',
+    'state': 'state',
+    'status': 'state',
+    'date': 'date',
+    'amount': 'amount',
+    'operationamount.amount': 'amount',
+    'currency_name': 'currency_name',
+    'operationamount.currency.name': 'currency_name',
+    'currency_code': 'currency_code',
+    'currency': 'currency_code',
+    'operationamount.currency.code': 'currency_code',
+    'description': 'description',
+    'from': 'from',
+    'to': 'to',
+}
+
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_JSON_DELIMITERS = frozenset(' \t\n\r,]')
+
+
+def _iter_json_array(f, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator:
+    """Инкрементально разбирает JSON-массив из файла, выдавая элементы по одному"""
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def next_char():
+        nonlocal pos
+        while True:
+            pos = _JSON_WHITESPACE.match(buf, pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                return ''
+            read_more()
+
+    if next_char() != '[':
+        # Не массив: разбираем документ целиком, как это делал бы json.load
+        rest = buf[pos:] + f.read()
+        data = json.loads(rest) if rest.strip() else []
+        yield from data if isinstance(data, list) else [data]
+        return
+
+    pos += 1
+    if next_char() == ']':
+        return
+
+    while True:
+        if next_char() == '':
+            raise ValueError("Неожиданный конец JSON-файла")
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_more()
+            continue
+        if not eof and (end == len(buf) or buf[end] not in _JSON_DELIMITERS):
+            # Элемент может быть обрезан границей чанка (например, число "1" из "1.25")
+            read_more()
+            continue
+        pos = end
+        yield item
+
+        c = next_char()
+        if c == ',':
+            pos += 1
+        elif c == ']':
+            return
+        else:
+            raise ValueError(f"Ожидалась ',' или ']' в JSON-массиве, получено {c!r}")
+
+
+def _detect_format(file_path) -> str:
+    """Определяет формат файла по расширению, а при его отсутствии — по первым байтам"""
+    ext = Path(file_path).suffix.lower().lstrip('.')
+    if ext in ('json', 'csv', 'xlsx'):
+        return ext
+    if ext:
+        raise ValueError(f"Неподдерживаемый формат файла: .{ext}")
+
+    with open(file_path, 'rb') as f:
+        head = f.read(512).lstrip(b'\xef\xbb\xbf \t\r\n')
+    if head.startswith(b'PK'):
+        return 'xlsx'
+    if head[:1] in (b'[', b'{'):
+        return 'json'
+    return 'csv'
+
+
+class CsvFormat(NamedTuple):
+    encoding: str
+    delimiter: str
+
+
+def _detect_encoding(head: bytes) -> str:
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # final=False: обрезанный границей чтения многобайтовый символ не считается ошибкой
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1251'
+
+
+def sniff_csv(file_path) -> CsvFormat:
+    """Определяет кодировку и разделитель CSV по первым килобайтам файла"""
+    with open(file_path, 'rb') as f:
+        head = f.read(CSV_SNIFF_BYTES)
+    encoding = _detect_encoding(head)
+    header = head.decode(encoding, errors='ignore').lstrip('\ufeff').splitlines()[:1]
+    header = header[0] if header else ''
+    delimiter = max(CSV_DELIMITERS, key=lambda d: (header.count(d), d == ','))
+    return CsvFormat(encoding, delimiter)
+
+
+def _to_id(value: str):
+    return int(value) if value.isdigit() else value
+
+
+def compile_csv_row_builder(header: List[str]) -> Callable[[List[str]], Dict]:
+    """Строит функцию, превращающую строку CSV в запись формы operations.json.
+
+    Соответствие столбцов вычисляется один раз по заголовку; на каждую строку
+    остаётся только проход по готовой таблице (индекс, ключ, конвертер).
+    """
+    index = {}
+    extras = []
+    for i, name in enumerate(header):
+        canonical = CSV_COLUMN_ALIASES.get(name.strip().lower())
+        if canonical is None:
+            extras.append((name, i))
+        elif canonical not in index:
+            index[canonical] = i
+
+    head_fields = [(key, index[key], _to_id if key == 'id' else None)
+                   for key in ('id', 'state', 'date') if key in index]
+    tail_fields = [(key, index[key], None) for key in ('description', 'from', 'to') if key in index] + \
+                  [(name, i, None) for name, i in extras]
+    i_amount = index.get('amount')
+    i_name = index.get('currency_name')
+    i_code = index.get('currency_code')
+    has_amount = i_amount is not None or i_code is not None
+    width = len(header)
+
+    def build(row: List[str]) -> Dict:
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        record = {}
+        for key, i, convert in head_fields:
+            value = row[i]
+            if value != '':
+                record[key] = convert(value) if convert else value
+        if has_amount:
+            record['operationAmount'] = {
+                'amount': row[i_amount] if i_amount is not None else '',
+                'currency': {
+                    'name': row[i_name] or None if i_name is not None else None,
+                    'code': row[i_code] or None if i_code is not None else None,
+                },
+            }
+        for key, i, _ in tail_fields:
+            value = row[i]
+            if value != '':
+                record[key] = value
+        return record
+
+    return build
+
+
+def iter_csv_rows(lines, header: List[str], csv_format: CsvFormat) -> Iterator[Dict]:
+    """Преобразует строки CSV (без заголовка) в нормализованные записи"""
+    build = compile_csv_row_builder(header)
+    for row in csv.reader(lines, delimiter=csv_format.delimiter):
+        if row:
+            yield build(row)
+
 
 class FileHandler:
     @staticmethod
@@ -16,19 +214,72 @@ class FileHandler:
 
     @staticmethod
     def load_xlsx(file_path):
+        import openpyxl
+
         wb = openpyxl.load_workbook(file_path)
         ws = wb.active
         headers = [cell.value for cell in ws[1]]
         return [dict(zip(headers, row)) for row in ws.iter_rows(min_row=2, values_only=True)]
 
     @staticmethod
-    def save_report(data, file_path):
-        ext = Path(file_path).suffix.lower()
-        if ext == '.json':
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        elif ext == '.csv':
-            with open(file_path, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=data[0].keys())
-                writer.writeheader()
-                writer.writerows(data)
\ No newline at end of file
+    def iter_json(file_path, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Dict]:
+        """Потоково читает JSON-массив транзакций, не загружая файл целиком"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from _iter_json_array(f, chunk_size)
+
+    @staticmethod
+    def iter_csv(file_path) -> Iterator[Dict]:
+        """Потоково читает CSV-файл построчно"""
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            yield from csv.DictReader(f)
+
+    @staticmethod
+    def iter_csv_transactions(file_path, csv_format: CsvFormat = None) -> Iterator[Dict]:
+        """Потоково читает CSV-выгрузку (например, data/csv) в форме записей operations.json"""
+        csv_format = csv_format or sniff_csv(file_path)
+        with open(file_path, 'r', encoding=csv_format.encoding, newline='') as f:
+            reader = csv.reader(f, delimiter=csv_format.delimiter)
+            header = next(reader, None)
+            if header is None:
+                return
+            yield from iter_csv_rows(f, header, csv_format)
+
+    @staticmethod
+    def iter_xlsx(file_path) -> Iterator[Dict]:
+        """Потоково читает XLSX-файл в режиме read_only"""
+        import openpyxl
+
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            headers = next(rows, None)
+            if headers is None:
+                return
+            for row in rows:
+                yield dict(zip(headers, row))
+        finally:
+            wb.close()
+
+    @staticmethod
+    def iter_any(file_path) -> Iterator[Dict]:
+        """Выбирает потоковый загрузчик по формату файла"""
+        fmt = _detect_format(file_path)
+        if fmt == 'json':
+            return FileHandler.iter_json(file_path)
+        if fmt == 'csv':
+            return FileHandler.iter_csv_transactions(file_path)
+        return FileHandler.iter_xlsx(file_path)
+
+    @staticmethod
+    def load_table(file_path, cache_dir=None):
+        """Загружает файл в TransactionTable через кэш разбора (см. scr.cache.ParseCache)"""
+        from scr.cache import ParseCache
+
+        return ParseCache(cache_dir).load(file_path)
+
+    @staticmethod
+    def save_report(data, file_path, fieldnames=None):
+        """Потоково сохраняет отчёт (JSON, JSON Lines, CSV, XLSX; .gz/.zst — со сжатием), см. scr.reports"""
+        from scr.reports import write_report
+
+        return write_report(data, file_path, fieldnames=fieldnames)
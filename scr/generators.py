@@ -1,7 +1,45 @@
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
-from masks import mask_card_number, mask_account
+from pathlib import Path
+from typing import List, Dict, Iterator, Optional
+
+import numpy as np
+
+from scr.masks import mask_card_number
+from scr.processing import get_currency_code
+
+MAX_CARD_NUMBER = 9999999999999999
+GENERATOR_CHUNK_SIZE = 100_000
+
+# Распределения подобраны по data/operations.json и data/csv
+STATE_WEIGHTS = {'EXECUTED': 0.70, 'CANCELED': 0.15, 'PENDING': 0.15}
+CURRENCY_WEIGHTS = {
+    ('RUB', 'руб.'): 0.30,
+    ('USD', 'USD'): 0.20,
+    ('EUR', 'Euro'): 0.12,
+    ('CNY', 'Yuan Renminbi'): 0.10,
+    ('IDR', 'Rupiah'): 0.06,
+    ('PHP', 'Peso'): 0.05,
+    ('BRL', 'Real'): 0.05,
+    ('SEK', 'Krona'): 0.04,
+    ('PLN', 'Zloty'): 0.04,
+    ('UAH', 'Hryvnia'): 0.04,
+}
+# Описание -> (доля, откуда, куда); None — поле отсутствует, 'any' — карта или счёт
+DESCRIPTION_WEIGHTS = {
+    'Перевод организации': (0.35, 'any', 'account'),
+    'Перевод с карты на карту': (0.30, 'card', 'card'),
+    'Перевод с карты на счет': (0.12, 'card', 'account'),
+    'Перевод со счета на счет': (0.12, 'account', 'account'),
+    'Открытие вклада': (0.11, None, 'account'),
+}
+CARD_BRANDS = ('Visa Classic', 'Visa Platinum', 'Visa Gold', 'MasterCard', 'Maestro', 'МИР', 'Discover',
+               'American Express')
+DATE_RANGE = ('2018-01-01T00:00:00', '2023-12-31T23:59:59')
+
+CSV_COLUMNS = ('id', 'state', 'date', 'amount', 'currency_name', 'currency_code', 'from', 'to', 'description')
 
 
 def generate_fake_card_number() -> str:
@@ -36,4 +74,255 @@ def generate_test_transactions(count: int = 10) -> List[Dict]:
             'status': random.choice(["completed", "pending", "failed"])
         })
 
-    return transactions
\ No newline at end of file
+    return transactions
+
+
+def filter_by_currency(data_list: List[Dict], currency: str) -> Iterator[Dict]:
+    """Выдаёт транзакции в указанной валюте"""
+    if not isinstance(data_list, list):
+        raise ValueError("data_list должен быть списком словарей.")
+    for tx in data_list:
+        if not isinstance(tx, dict):
+            raise ValueError("Каждый элемент data_list должен быть словарем.")
+        if get_currency_code(tx) == currency:
+            yield tx
+
+
+def transaction_descriptions(data_list: List[Dict]) -> Iterator[str]:
+    """Выдаёт описания транзакций, пропуская записи без описания"""
+    if not isinstance(data_list, list):
+        raise ValueError("data_list должен быть списком словарей.")
+    for tx in data_list:
+        if not isinstance(tx, dict):
+            raise ValueError("Каждый элемент data_list должен быть словарем.")
+        if 'description' in tx:
+            yield tx['description']
+
+
+def card_number_generator(start: int, stop: int) -> Iterator[str]:
+    """Выдаёт номера карт в формате XXXX XXXX XXXX XXXX из диапазона [start, stop]"""
+    if start > stop:
+        raise ValueError("start должен быть меньше или равен stop.")
+    if start < 1 or stop > MAX_CARD_NUMBER:
+        raise ValueError("Диапазон должен быть от 1 до 9999999999999999.")
+    for number in range(start, stop + 1):
+        digits = f"{number:016d}"
+        yield f"{digits[:4]} {digits[4:8]} {digits[8:12]} {digits[12:]}"
+
+
+def _choice(rng: np.random.Generator, weights: Dict, n: int) -> np.ndarray:
+    p = np.array(list(weights.values()), dtype=np.float64)
+    return rng.choice(len(p), size=n, p=p / p.sum())
+
+
+def _digits(rng: np.random.Generator, n: int, length: int) -> np.ndarray:
+    """Случайные номера из length цифр (без ведущего нуля) в виде массива строк.
+
+    Цифры генерируются как байты ASCII и переинтерпретируются как строки
+    фиксированной длины — без поэлементного преобразования чисел в текст.
+    """
+    digits = rng.integers(ord('0'), ord('9') + 1, size=(n, length), dtype=np.uint8)
+    digits[:, 0] = rng.integers(ord('1'), ord('9') + 1, size=n, dtype=np.uint8)
+    return digits.view(f'S{length}').ravel().astype(f'U{length}')
+
+
+def _instruments(rng: np.random.Generator, kind: np.ndarray) -> np.ndarray:
+    """Строки "from"/"to": kind 0 — карта, 1 — счёт, -1 — поле отсутствует"""
+    n = len(kind)
+    brands = np.array(CARD_BRANDS)[rng.integers(0, len(CARD_BRANDS), n)]
+    cards = np.char.add(np.char.add(brands, ' '), _digits(rng, n, 16))
+    accounts = np.char.add('Счет ', _digits(rng, n, 20))
+    return np.where(kind == 0, cards, np.where(kind == 1, accounts, ''))
+
+
+def generate_chunk(n: int, start_index: int = 0, seed=None) -> Dict[str, np.ndarray]:
+    """Векторно генерирует n транзакций в виде столбцов (массивов NumPy).
+
+    Номера id детерминированно выводятся из порядкового номера строки
+    (start_index + i) и не повторяются в пределах 10^9 строк.
+    """
+    rng = np.random.default_rng(seed)
+    index = np.arange(start_index, start_index + n, dtype=np.int64)
+    ids = (index * 2654435761 + 104729) % 10 ** 9 + 1
+
+    states = np.array(list(STATE_WEIGHTS))[_choice(rng, STATE_WEIGHTS, n)]
+    currencies = _choice(rng, CURRENCY_WEIGHTS, n)
+    codes = np.array([code for code, _ in CURRENCY_WEIGHTS])[currencies]
+    names = np.array([name for _, name in CURRENCY_WEIGHTS])[currencies]
+
+    descriptions_idx = _choice(rng, {k: v[0] for k, v in DESCRIPTION_WEIGHTS.items()}, n)
+    kind_codes = {None: -1, 'card': 0, 'account': 1}
+    from_kind = np.array([kind_codes.get(v[1], 0) for v in DESCRIPTION_WEIGHTS.values()])[descriptions_idx]
+    from_any = np.array([v[1] == 'any' for v in DESCRIPTION_WEIGHTS.values()])[descriptions_idx]
+    from_kind = np.where(from_any, rng.integers(0, 2, n), from_kind)
+    to_kind = np.array([kind_codes[v[2]] for v in DESCRIPTION_WEIGHTS.values()])[descriptions_idx]
+
+    start, end = (np.datetime64(d, 'us') for d in DATE_RANGE)
+    dates = start + rng.integers(0, int((end - start).astype(np.int64)), n).astype('timedelta64[us]')
+    # Логнормальное распределение сумм (в копейках) с медианой около 20 000
+    amounts = np.clip(rng.lognormal(np.log(2_000_000), 0.9, n), 100, 10 ** 9).astype(np.int64)
+
+    return {
+        'id': ids,
+        'state': states,
+        'date': dates,
+        'amount': amounts,
+        'currency_name': names,
+        'currency_code': codes,
+        'from': _instruments(rng, from_kind),
+        'to': _instruments(rng, to_kind),
+        'description': np.array(list(DESCRIPTION_WEIGHTS))[descriptions_idx],
+    }
+
+
+def _chunk_seeds(seed, count: int, chunk_size: int):
+    """Разбивает count строк на чанки с независимыми, но воспроизводимыми seed"""
+    root = np.random.SeedSequence(seed)
+    for chunk_index, start in enumerate(range(0, count, chunk_size)):
+        yield min(chunk_size, count - start), start, np.random.SeedSequence(root.entropy, spawn_key=(chunk_index,))
+
+
+def _json_amounts(amounts: np.ndarray) -> np.ndarray:
+    whole, frac = np.divmod(amounts, 100)
+    return np.char.add(np.char.add(whole.astype(str), '.'), np.char.zfill(frac.astype(str), 2))
+
+
+def chunk_records(chunk: Dict[str, np.ndarray], schema: str = 'json') -> Iterator[Dict]:
+    """Превращает столбцы чанка в записи формы operations.json ('json') или data/csv ('csv')"""
+    if schema == 'csv':
+        columns = render_csv_columns(chunk)
+        for row in zip(*columns):
+            yield dict(zip(CSV_COLUMNS, row))
+        return
+
+    dates = np.datetime_as_string(chunk['date'], unit='us').tolist()
+    amounts = _json_amounts(chunk['amount']).tolist()
+    for i, (tx_id, state, description, name, code, source, target) in enumerate(zip(
+            chunk['id'].tolist(), chunk['state'].tolist(), chunk['description'].tolist(),
+            chunk['currency_name'].tolist(), chunk['currency_code'].tolist(),
+            chunk['from'].tolist(), chunk['to'].tolist())):
+        record = {
+            'id': tx_id,
+            'state': state,
+            'date': dates[i],
+            'operationAmount': {'amount': amounts[i], 'currency': {'name': name, 'code': code}},
+            'description': description,
+        }
+        if source:
+            record['from'] = source
+        record['to'] = target
+        yield record
+
+
+def render_csv_columns(chunk: Dict[str, np.ndarray]) -> List[List]:
+    """Столбцы чанка в порядке CSV_COLUMNS, уже приведённые к строкам формата data/csv"""
+    dates = np.char.add(np.datetime_as_string(chunk['date'], unit='s'), 'Z')
+    return [
+        chunk['id'].astype(str).tolist(),
+        chunk['state'].tolist(),
+        dates.tolist(),
+        # Копейки сохраняются, чтобы итоги совпадали с JSON при том же seed
+        _json_amounts(chunk['amount']).tolist(),
+        chunk['currency_name'].tolist(),
+        chunk['currency_code'].tolist(),
+        chunk['from'].tolist(),
+        chunk['to'].tolist(),
+        chunk['description'].tolist(),
+    ]
+
+
+_JSON_ROW = ('{"id": %s, "state": "%s", "date": "%s", "operationAmount": {"amount": "%s", '
+             '"currency": {"name": "%s", "code": "%s"}}, "description": "%s", %s"to": "%s"}')
+
+
+def render_json_chunk(chunk: Dict[str, np.ndarray]) -> str:
+    """Текст элементов JSON-массива для чанка (без скобок), по одному объекту на строку.
+
+    Значения берутся из фиксированных словарей и цифр, поэтому экранирование не требуется.
+    """
+    dates = np.datetime_as_string(chunk['date'], unit='us').tolist()
+    amounts = _json_amounts(chunk['amount']).tolist()
+    rows = [
+        _JSON_ROW % (tx_id, state, date, amount, name, code, description,
+                     f'"from": "{source}", ' if source else '', target)
+        for tx_id, state, date, amount, name, code, description, source, target in zip(
+            chunk['id'].tolist(), chunk['state'].tolist(), dates, amounts,
+            chunk['currency_name'].tolist(), chunk['currency_code'].tolist(),
+            chunk['description'].tolist(), chunk['from'].tolist(), chunk['to'].tolist())
+    ]
+    return ',\n'.join(rows)
+
+
+def render_csv_chunk(chunk: Dict[str, np.ndarray]) -> str:
+    return ''.join(';'.join(row) + '\n' for row in zip(*render_csv_columns(chunk)))
+
+
+def _render_task(args) -> str:
+    n, start, seed, fmt = args
+    chunk = generate_chunk(n, start, seed)
+    return render_json_chunk(chunk) if fmt == 'json' else render_csv_chunk(chunk)
+
+
+def generate_transactions(count: int, seed=None, schema: str = 'json',
+                          chunk_size: int = GENERATOR_CHUNK_SIZE) -> Iterator[Dict]:
+    """Выдаёт count синтетических транзакций в схеме operations.json или data/csv.
+
+    При одинаковом seed результат воспроизводим и не зависит от способа записи.
+    """
+    for n, start, chunk_seed in _chunk_seeds(seed, count, chunk_size):
+        yield from chunk_records(generate_chunk(n, start, chunk_seed), schema)
+
+
+def write_transactions(file_path, count: int, seed=None, fmt: Optional[str] = None,
+                       chunk_size: int = GENERATOR_CHUNK_SIZE, workers: int = 1):
+    """Потоково пишет count синтетических транзакций в JSON, CSV или XLSX.
+
+    Память ограничена несколькими чанками: при workers > 1 чанки формируются в
+    пуле процессов, но в файл пишутся строго по порядку, так что содержимое
+    файла не зависит от числа процессов.
+    """
+    fmt = fmt or Path(file_path).suffix.lower().lstrip('.') or 'csv'
+    if fmt == 'xlsx':
+        return _write_xlsx(file_path, count, seed, chunk_size)
+    if fmt not in ('json', 'csv'):
+        raise ValueError(f"Неподдерживаемый формат файла: {fmt}")
+
+    tasks = ((n, start, chunk_seed, fmt) for n, start, chunk_seed in _chunk_seeds(seed, count, chunk_size))
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        f.write('[\n' if fmt == 'json' else ';'.join(CSV_COLUMNS) + '\n')
+        first = True
+        for text in _render_ordered(tasks, workers):
+            if fmt == 'json' and not first and text:
+                f.write(',\n')
+            f.write(text)
+            first = first and not text
+        if fmt == 'json':
+            f.write('\n]\n')
+
+
+def _render_ordered(tasks, workers: int) -> Iterator[str]:
+    if workers <= 1:
+        yield from map(_render_task, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = deque()
+        for task in tasks:
+            window.append(executor.submit(_render_task, task))
+            if len(window) >= workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def _write_xlsx(file_path, count: int, seed, chunk_size: int):
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(CSV_COLUMNS))
+    for n, start, chunk_seed in _chunk_seeds(seed, count, chunk_size):
+        columns = render_csv_columns(generate_chunk(n, start, chunk_seed))
+        columns[0] = [int(v) for v in columns[0]]
+        for row in zip(*columns):
+            ws.append(list(row))
+    wb.save(file_path)
@@ -0,0 +1,142 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from scr.dates import date_bound, parse_date
+from scr.money import parse_amount
+from scr.processing import as_values, get_amount, get_currency_code
+
+
+class TransactionIndex:
+    """Индексы по набору транзакций для повторяющихся запросов.
+
+    Строится один раз: хэш-индексы по коду валюты и статусу, отсортированные
+    индексы по дате и сумме. Запрос выбирает самый селективный индекс, берёт из
+    него кандидатов за O(log n + k) и проверяет на них остальные условия.
+    """
+
+    def __init__(self, transactions: Iterable[Dict]):
+        self.records: List[Dict] = []
+        self._currency: List[Optional[str]] = []
+        self._state: List[Optional[str]] = []
+        self._date: List[Optional[datetime]] = []
+        self._amount: List[int] = []
+        self._by_currency: Dict[str, List[int]] = {}
+        self._by_state: Dict[str, List[int]] = {}
+
+        for pos, tx in enumerate(transactions):
+            self.records.append(tx)
+            currency = get_currency_code(tx)
+            state = tx.get('state')
+            self._currency.append(currency)
+            self._state.append(state)
+            # Наивный datetime в UTC: даты с 'Z' и без него сравнимы
+            self._date.append(parse_date(tx.get('date')))
+            self._amount.append(parse_amount(get_amount(tx)))
+            if currency is not None:
+                self._by_currency.setdefault(currency, []).append(pos)
+            if state is not None:
+                self._by_state.setdefault(state, []).append(pos)
+
+        dated = sorted((d, pos) for pos, d in enumerate(self._date) if d is not None)
+        self._date_keys = [d for d, _ in dated]
+        self._date_positions = [pos for _, pos in dated]
+        by_amount = sorted((a, pos) for pos, a in enumerate(self._amount))
+        self._amount_keys = [a for a, _ in by_amount]
+        self._amount_positions = [pos for _, pos in by_amount]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # --- планирование ---
+
+    def _candidates(self, currency=None, state=None, date_from=None, date_to=None,
+                    min_amount=None, max_amount=None) -> Dict[str, tuple]:
+        """Для каждого применимого индекса возвращает (оценка размера, функция выборки позиций)"""
+        plans = {}
+        for name, value, index in (('currency', currency, self._by_currency), ('state', state, self._by_state)):
+            if value is None:
+                continue
+            lists = [index.get(v, []) for v in as_values(value)]
+            plans[name] = (sum(map(len, lists)), lambda lists=lists: heapq.merge(*lists))
+
+        if date_from is not None or date_to is not None:
+            lo = 0 if date_from is None else bisect_left(self._date_keys, date_bound(date_from, upper=False))
+            hi = len(self._date_keys) if date_to is None else \
+                bisect_right(self._date_keys, date_bound(date_to, upper=True))
+            hi = max(lo, hi)
+            plans['date'] = (hi - lo, lambda lo=lo, hi=hi: sorted(self._date_positions[lo:hi]))
+
+        if min_amount is not None or max_amount is not None:
+            lo = 0 if min_amount is None else bisect_left(self._amount_keys, parse_amount(min_amount))
+            hi = len(self._amount_keys) if max_amount is None else \
+                bisect_right(self._amount_keys, parse_amount(max_amount))
+            hi = max(lo, hi)
+            plans['amount'] = (hi - lo, lambda lo=lo, hi=hi: sorted(self._amount_positions[lo:hi]))
+        return plans
+
+    def explain(self, **conditions) -> Dict:
+        """Показывает, какой индекс будет использован и сколько кандидатов он даст"""
+        plans = self._candidates(**conditions)
+        if not plans:
+            return {'index': 'scan', 'candidates': len(self), 'estimates': {}}
+        best = min(plans, key=lambda name: plans[name][0])
+        return {
+            'index': best,
+            'candidates': plans[best][0],
+            'estimates': {name: size for name, (size, _) in plans.items()},
+        }
+
+    def stats(self) -> Dict:
+        """Размеры индексов"""
+        return {
+            'rows': len(self),
+            'currencies': len(self._by_currency),
+            'states': len(self._by_state),
+            'dated_rows': len(self._date_keys),
+        }
+
+    # --- выполнение ---
+
+    def query_positions(self, currency=None, state=None, date_from=None, date_to=None,
+                        min_amount=None, max_amount=None) -> List[int]:
+        """Возвращает позиции подходящих транзакций в исходном порядке"""
+        conditions = dict(currency=currency, state=state, date_from=date_from, date_to=date_to,
+                          min_amount=min_amount, max_amount=max_amount)
+        plans = self._candidates(**conditions)
+        if plans:
+            best = min(plans, key=lambda name: plans[name][0])
+            positions = plans[best][1]()
+        else:
+            best = None
+            positions = range(len(self))
+
+        checks = []
+        if currency is not None and best != 'currency':
+            currencies = set(as_values(currency))
+            checks.append(lambda pos: self._currency[pos] in currencies)
+        if state is not None and best != 'state':
+            states = set(as_values(state))
+            checks.append(lambda pos: self._state[pos] in states)
+        if (date_from is not None or date_to is not None) and best != 'date':
+            lo = date_bound(date_from, upper=False) if date_from is not None else None
+            hi = date_bound(date_to, upper=True) if date_to is not None else None
+            checks.append(lambda pos: self._date[pos] is not None
+                          and (lo is None or self._date[pos] >= lo)
+                          and (hi is None or self._date[pos] <= hi))
+        if (min_amount is not None or max_amount is not None) and best != 'amount':
+            lo_amount = parse_amount(min_amount) if min_amount is not None else None
+            hi_amount = parse_amount(max_amount) if max_amount is not None else None
+            checks.append(lambda pos: (lo_amount is None or self._amount[pos] >= lo_amount)
+                          and (hi_amount is None or self._amount[pos] <= hi_amount))
+
+        return [pos for pos in positions if all(check(pos) for check in checks)]
+
+    def query(self, **conditions) -> List[Dict]:
+        """Возвращает транзакции, удовлетворяющие всем условиям, например:
+
+        index.query(currency='USD', state='EXECUTED', date_from='2019-01-01',
+                    date_to='2019-06-30', min_amount='1000.01')
+        """
+        return [self.records[pos] for pos in self.query_positions(**conditions)]
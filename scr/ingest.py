@@ -0,0 +1,146 @@
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from scr.file_handlers import CsvFormat, FileHandler, _detect_format, iter_csv_rows, sniff_csv
+from scr.processing import TransactionAggregator
+from scr.validation import Quarantine, compile_validator
+
+CSV_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+class IngestTask(NamedTuple):
+    """Единица работы для пула: файл целиком или диапазон байт [start, end) CSV-файла"""
+    path: str
+    start: int = 0
+    end: Optional[int] = None
+    csv_format: Optional[CsvFormat] = None
+
+
+def collect_files(source) -> List[Path]:
+    """Возвращает отсортированный список поддерживаемых файлов из каталога (или сам файл)"""
+    source = Path(source)
+    if source.is_file():
+        return [source]
+    files = []
+    for path in sorted(source.rglob('*')):
+        if not path.is_file() or path.name.startswith('.'):
+            continue
+        try:
+            _detect_format(path)
+        except ValueError:
+            continue
+        files.append(path)
+    return files
+
+
+def split_csv(path, chunk_bytes: int = CSV_CHUNK_BYTES, csv_format: CsvFormat = None) -> List[IngestTask]:
+    """Делит CSV-файл на диапазоны по границам строк; первый диапазон начинается после заголовка.
+
+    Поля с переводом строки внутри кавычек не поддерживаются — для таких файлов
+    следует задавать chunk_bytes больше размера файла.
+    """
+    csv_format = csv_format or sniff_csv(path)
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()
+        start = f.tell()
+        tasks = []
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            if f.tell() < size:
+                f.readline()
+            end = f.tell()
+            tasks.append(IngestTask(str(path), start, end, csv_format))
+            start = end
+    return tasks
+
+
+def plan_tasks(paths: Iterable, chunk_bytes: int = CSV_CHUNK_BYTES) -> List[IngestTask]:
+    """Строит детерминированный список задач: крупные CSV режутся на части, остальное — целиком"""
+    tasks = []
+    for path in paths:
+        if _detect_format(path) != 'csv':
+            tasks.append(IngestTask(str(path)))
+            continue
+        # Формат CSV определяется один раз на файл и передаётся во все его части
+        csv_format = sniff_csv(path)
+        if os.path.getsize(path) > chunk_bytes and not csv_format.encoding.startswith('utf-16'):
+            tasks.extend(split_csv(path, chunk_bytes, csv_format))
+        else:
+            tasks.append(IngestTask(str(path), csv_format=csv_format))
+    return tasks
+
+
+def iter_csv_range(path, start: int, end: int, csv_format: CsvFormat = None) -> Iterator[Dict]:
+    """Читает нормализованные записи из диапазона байт CSV, используя заголовок из начала файла"""
+    csv_format = csv_format or sniff_csv(path)
+    with open(path, 'rb') as f:
+        header_line = f.readline().decode(csv_format.encoding)
+        f.seek(start)
+        data = f.read(end - start).decode(csv_format.encoding)
+    header = next(csv.reader([header_line], delimiter=csv_format.delimiter))
+    yield from iter_csv_rows(io.StringIO(data, newline=''), header, csv_format)
+
+
+def iter_task(task: IngestTask) -> Iterator[Dict]:
+    if task.end is not None:
+        return iter_csv_range(task.path, task.start, task.end, task.csv_format)
+    if task.csv_format is not None:
+        return FileHandler.iter_csv_transactions(task.path, task.csv_format)
+    return FileHandler.iter_any(task.path)
+
+
+def aggregate_task(task: IngestTask) -> TransactionAggregator:
+    """Считает частичный агрегат одной задачи; выполняется в процессе-воркере"""
+    return TransactionAggregator().consume(iter_task(task))
+
+
+def validate_task(task: IngestTask) -> Tuple[TransactionAggregator, List[Tuple[Dict, List[str]]]]:
+    """Проверяет и агрегирует записи задачи; отбракованные возвращает с причинами. Выполняется в воркере"""
+    validate = compile_validator()
+    aggregator = TransactionAggregator()
+    add = aggregator.add
+    rejected = []
+    for tx in iter_task(task):
+        reasons = validate(tx)
+        if reasons:
+            rejected.append((tx, reasons))
+        else:
+            add(tx)
+    return aggregator, rejected
+
+
+def ingest(source, workers: Optional[int] = None, chunk_bytes: int = CSV_CHUNK_BYTES,
+           quarantine: Optional[Quarantine] = None) -> TransactionAggregator:
+    """Параллельно агрегирует все файлы каталога и сливает частичные результаты.
+
+    Частичные агрегаты объединяются в порядке задач, поэтому результат не зависит
+    от числа воркеров и порядка их завершения. С quarantine записи проверяются
+    по схеме в тех же воркерах, а некорректные передаются в карантин вместо остановки.
+    """
+    tasks = plan_tasks(collect_files(source), chunk_bytes)
+    total = TransactionAggregator()
+    worker = aggregate_task if quarantine is None else validate_task
+    if workers == 1 or len(tasks) <= 1:
+        _merge_results(total, tasks, map(worker, tasks), quarantine)
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        _merge_results(total, tasks, executor.map(worker, tasks), quarantine)
+    return total
+
+
+def _merge_results(total: TransactionAggregator, tasks: List[IngestTask], results: Iterable,
+                   quarantine: Optional[Quarantine]):
+    for task, result in zip(tasks, results):
+        if quarantine is None:
+            total.merge(result)
+            continue
+        partial, rejected = result
+        total.merge(partial)
+        for tx, reasons in rejected:
+            quarantine.add(tx, reasons, task.path)
@@ -1,9 +1,191 @@
-from file_handlers import FileHandler
-from processing import process_transactions
-from utils import format_transaction
+# Тяжёлые зависимости (openpyxl, numpy, requests, PyQt5) импортируются только в тех режимах, где нужны
+from scr import profiling
+from scr.file_handlers import FileHandler, _detect_format
+from scr.processing import TransactionAggregator, process_transactions
+from scr.utils import format_transaction
+from scr.validation import Quarantine, iter_valid
+import argparse
+import os
 import sys
 
-def main():
+INPUT_LOADERS = {
+    'json': FileHandler.iter_json,
+    'csv': FileHandler.iter_csv_transactions,
+    'xlsx': FileHandler.iter_xlsx,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m scr.main',
+                                     description="Работа с банковскими транзакциями")
+    parser.add_argument('--input', default=None,
+                        help="Файл с транзакциями: обработать без вопросов (для запуска из cron)")
+    parser.add_argument('--format', choices=sorted(INPUT_LOADERS), default=None,
+                        help="Формат входного файла (по умолчанию — по расширению)")
+    parser.add_argument('--output', default=None,
+                        help="Сохранить транзакции в отчёт; формат по расширению (.json, .jsonl, .csv, .xlsx, .gz)")
+    parser.add_argument('--quarantine', default=None,
+                        help="JSONL-файл для записей, не прошедших проверку схемы (с причинами)")
+    parser.add_argument('--rates', default=None,
+                        help="JSON-файл с курсами валют для пересчёта сумм в валюту отчёта")
+    parser.add_argument('--currency', default='RUB', help="Валюта отчёта (по умолчанию RUB)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Вывести разбивку времени, строк и байт по этапам в stderr")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Добавить к разбивке пики выделений памяти (tracemalloc)")
+    parser.add_argument('--profile-output', default=None,
+                        help="Сохранить данные cProfile в файл pstats (snakeviz, flameprof)")
+    subparsers = parser.add_subparsers(dest='command')
+
+    ingest_parser = subparsers.add_parser('ingest', help="Пакетная обработка всех файлов каталога")
+    ingest_parser.add_argument('source', help="Каталог с выгрузками JSON/CSV/XLSX или отдельный файл")
+    ingest_parser.add_argument('--workers', type=int, default=None,
+                               help="Число процессов (по умолчанию — число ядер)")
+    ingest_parser.add_argument('--chunk-mb', type=int, default=64,
+                               help="Размер части, на которые режутся большие CSV, МБ")
+
+    store_parser = subparsers.add_parser('store', help="Загрузка в локальную базу SQLite и запросы к ней")
+    store_parser.add_argument('db', help="Файл базы данных (создаётся при первом запуске)")
+    store_parser.add_argument('--load', nargs='+', default=[], metavar='PATH',
+                              help="Файлы или каталоги, которые нужно добавить в базу")
+    store_parser.add_argument('--currency', dest='filter_currency', default=None, help="Код валюты")
+    store_parser.add_argument('--state', default=None, help="Статус операции")
+    store_parser.add_argument('--date-from', default=None, help="Начальная дата (ISO)")
+    store_parser.add_argument('--date-to', default=None, help="Конечная дата (ISO, включительно)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    if not (args.profile or args.profile_memory or args.profile_output):
+        run_command(args)
+        return
+
+    with profiling.profile(memory=args.profile_memory, cprofile=bool(args.profile_output)) as profiler:
+        run_command(args)
+    print(profiler.format_report(), file=sys.stderr)
+    if args.profile_output:
+        profiler.dump_stats(args.profile_output)
+
+
+def run_command(args):
+    if args.command == 'ingest':
+        run_ingest(args)
+    elif args.command == 'store':
+        run_store(args)
+    elif args.input:
+        run_batch(args)
+    else:
+        interactive(rates=args.rates, currency=args.currency, quarantine=args.quarantine)
+
+
+def run_ingest(args):
+    from scr.ingest import ingest
+
+    try:
+        with Quarantine(args.quarantine) as quarantine, profiling.stage('ingest'):
+            result = ingest(args.source, workers=args.workers, chunk_bytes=args.chunk_mb * 1024 * 1024,
+                            quarantine=quarantine).result()
+        if profiling.active():
+            from scr.ingest import collect_files
+
+            nbytes = sum(os.path.getsize(path) for path in collect_files(args.source))
+            profiling.count('ingest', rows=result['count'], nbytes=nbytes)
+    except Exception as e:
+        print(f"Ошибка: {e}")
+        sys.exit(1)
+
+    print(f"Обработано транзакций: {result['count']}")
+    for code, group in sorted(result['by_currency'].items()):
+        print(f"{code}: {group['count']} транзакций на сумму {group['total']:.2f}")
+    print_quarantine(quarantine)
+
+
+def run_store(args):
+    from scr.store import TransactionStore
+
+    quarantine = Quarantine(args.quarantine)
+    try:
+        with TransactionStore(args.db) as store, quarantine:
+            for path in args.load:
+                with profiling.stage('load'):
+                    added = store.ingest_dir(path, quarantine)
+                print(f"{path}: добавлено новых транзакций: {added}")
+            with profiling.stage('query'):
+                result = store.aggregate(currency=args.filter_currency, state=args.state,
+                                         date_from=args.date_from, date_to=args.date_to)
+    except Exception as e:
+        print(f"Ошибка: {e}")
+        sys.exit(1)
+
+    print(f"Найдено транзакций: {result['count']}")
+    for code, group in sorted(result['by_currency'].items()):
+        print(f"{code}: {group['count']} транзакций на сумму {group['total']:.2f}")
+    print_quarantine(quarantine)
+
+
+def convert_currency(transactions, rates=None, currency='RUB'):
+    """Пересчитывает суммы в валюту отчёта, если задан файл курсов; возвращает записи и подпись валюты.
+
+    Без курсов подпись — None: суммы в разных валютах складывать нельзя.
+    """
+    if not rates:
+        return transactions, None
+    from scr.currency import CurrencyConverter, FileRateProvider
+
+    transactions = CurrencyConverter(FileRateProvider(rates), target=currency).convert_transactions(transactions)
+    return profiling.instrument(transactions, 'convert'), 'руб.' if currency == 'RUB' else currency
+
+
+def run_batch(args):
+    """Неинтерактивная обработка файла: итоги в stdout и, по желанию, отчёт в --output"""
+    quarantine = Quarantine(args.quarantine)
+    try:
+        fmt = args.format or _detect_format(args.input)
+        transactions = profiling.instrument(INPUT_LOADERS[fmt](args.input), 'parse')
+        if profiling.active():
+            profiling.count('parse', nbytes=os.path.getsize(args.input))
+        transactions = profiling.instrument(iter_valid(transactions, quarantine, args.input), 'validate')
+        transactions, label = convert_currency(transactions, args.rates, args.currency)
+
+        aggregator = TransactionAggregator()
+        with quarantine:
+            if args.output:
+                # Один проход: каждая запись учитывается в итогах по пути в отчёт
+                def counted():
+                    for tx in transactions:
+                        aggregator.add(tx)
+                        yield tx
+
+                FileHandler.save_report(profiling.instrument(counted(), 'aggregate'), args.output)
+            else:
+                with profiling.stage('aggregate'):
+                    aggregator.consume(transactions)
+        result = aggregator.result()
+    except Exception as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print_totals(result, label)
+    print_quarantine(quarantine)
+
+
+def print_totals(result, label=None):
+    """Итоги: общая сумма — только если суммы приведены к валюте label, иначе по каждой валюте"""
+    if label is None:
+        print(f"Итого: {result['count']} транзакций")
+    else:
+        print(f"Итого: {result['count']} транзакций на сумму {result['total_amount']:.2f} {label}")
+    for code, group in sorted(result['by_currency'].items()):
+        print(f"{code}: {group['count']} транзакций на сумму {group['total']:.2f}")
+
+
+def print_quarantine(quarantine: Quarantine):
+    for line in quarantine.summary():
+        print(line, file=sys.stderr)
+
+
+def interactive(rates=None, currency='RUB', quarantine=None):
     print("""Привет! Добро пожаловать в программу работы с банковскими транзакциями.
 Выберите необходимый пункт меню:
 1. Получить информацию о транзакциях из JSON-файла
@@ -18,28 +200,46 @@ def main():
 
     file_path = input("Введите путь к файлу: ")
 
+    quarantine = Quarantine(quarantine)
     try:
         handler = FileHandler()
         if choice == "1":
-            transactions = handler.load_json(file_path)
+            transactions = handler.iter_json(file_path)
         elif choice == "2":
-            transactions = handler.load_csv(file_path)
+            # Разделитель и кодировка определяются по файлу: банковские выгрузки разделены ';'
+            transactions = handler.iter_csv_transactions(file_path)
         else:
-            transactions = handler.load_xlsx(file_path)
+            transactions = handler.iter_xlsx(file_path)
+        transactions = profiling.instrument(transactions, 'parse')
+        if profiling.active():
+            profiling.count('parse', nbytes=os.path.getsize(file_path))
+
+        # Некорректные записи уходят в карантин и не останавливают обработку
+        transactions = profiling.instrument(iter_valid(transactions, quarantine, file_path), 'validate')
+        transactions, label = convert_currency(transactions, rates, currency)
 
-        result = process_transactions(transactions)
-        display_transactions(result['transactions'])
-        print(f"\nИтого: {len(result['transactions'])} транзакций на сумму {result['total_amount']:.2f} руб.")
+        # Загрузка ленивая: время разбора и пересчёта учитывается в своих этапах, а не в aggregate
+        with quarantine, profiling.stage('aggregate'):
+            result = process_transactions(transactions)
+        profiling.count('aggregate', rows=result['count'])
+        with profiling.stage('output'):
+            display_transactions(result['transactions'])
+        profiling.count('output', rows=len(result['transactions']))
+        print()
+        print_totals(result, label)
+        print_quarantine(quarantine)
 
     except Exception as e:
         print(f"Ошибка: {e}")
         sys.exit(1)
 
+
 def display_transactions(transactions):
     print("\nСписок транзакций:")
     for i, tx in enumerate(transactions, 1):
         formatted = format_transaction(tx)
         print(f"{i}. {formatted['date']} - {formatted['description']}: {formatted['amount']}")
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
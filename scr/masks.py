@@ -1,11 +1,126 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+MASK_CACHE_SIZE = 1 << 16
+
+# "Visa Classic 1959232722494097", "Счет 58803664561298323391", "Cчет: 12345678"
+_INSTRUMENT_RE = re.compile(r'^\s*(?P<name>\D*?)[\s:]*(?P<number>\d[\d \-]*)\s*$')
+_ACCOUNT_NAME_RE = re.compile(r'^(?:[сc]ч[её]т|account)', re.IGNORECASE)
+_NON_DIGITS_RE = re.compile(r'\D')
+# Номер внутри произвольного текста ("Visa 4276 3800 1234 5678 / Счет 4081...") или отдельная цифра
+_NUMBER_OR_DIGIT_RE = re.compile(r'(?P<number>\d[\d \-]{3,}\d)|\d')
+ACCOUNT_NUMBER_LENGTH = 20
+
+
 def mask_card_number(card_number):
     """Маскирует номер карты (XXXX XXXX XXXX 1234)"""
     if not card_number or len(card_number) < 4:
         return card_number
     return '**** **** **** ' + card_number[-4:]
 
+
 def mask_account(account):
     """Маскирует номер счета (**1234)"""
     if not account or len(account) < 4:
         return account
-    return '**' + account[-4:]
\ No newline at end of file
+    return '**' + account[-4:]
+
+
+def get_mask_card_number(card_number: str) -> str:
+    """Маскирует номер карты, оставляя первые 6 и последние 4 цифры (2154 12 ** **** **** 5845)"""
+    if not card_number:
+        raise ValueError("Card number is empty")
+    if len(card_number) < 16:
+        raise ValueError("Card number is too short")
+    return f"{card_number[:4]} {card_number[4:6]} ** **** **** {card_number[-4:]}"
+
+
+def get_mask_account(account: str) -> str:
+    """Маскирует номер счёта; у полного 20-значного счёта видны последние 6 цифр, иначе 4"""
+    account = account.strip()
+    if len(account) < 4:
+        raise ValueError("Номер счёта должен содержать минимум 4 цифры.")
+    if not account.isdigit():
+        raise ValueError("Содержит недопустимые символы.")
+    visible = 6 if len(account) >= ACCOUNT_NUMBER_LENGTH else 4
+    return '****' + account[-visible:]
+
+
+def split_instrument(value: str) -> Optional[Tuple[str, str]]:
+    """Делит строку "from"/"to" на название и номер; None, если номера нет"""
+    match = _INSTRUMENT_RE.match(value)
+    if match is None:
+        return None
+    return match.group('name'), _NON_DIGITS_RE.sub('', match.group('number'))
+
+
+def is_account(name: str, number: str) -> bool:
+    if name:
+        return _ACCOUNT_NAME_RE.match(name) is not None
+    return len(number) >= ACCOUNT_NUMBER_LENGTH
+
+
+def _mask_number(name: str, number: str) -> str:
+    if not is_account(name, number) and len(number) >= 16:
+        return get_mask_card_number(number)
+    if len(number) >= 4:
+        return get_mask_account(number)
+    return '****'
+
+
+def _mask_digits_in_text(value: str) -> str:
+    # Каждая группа цифр маскируется отдельно; название — текст между ней и предыдущей группой
+    parts = []
+    end = 0
+    for match in _NUMBER_OR_DIGIT_RE.finditer(value):
+        parts.append(value[end:match.start()])
+        if match.group('number') is None:
+            parts.append('*')
+        else:
+            name = value[end:match.start()].strip(' \t:/,;(')
+            parts.append(_mask_number(name, _NON_DIGITS_RE.sub('', match.group('number'))))
+        end = match.end()
+    parts.append(value[end:])
+    return ''.join(parts)
+
+
+@lru_cache(maxsize=MASK_CACHE_SIZE)
+def mask_account_card(value: str) -> str:
+    """Маскирует строку вида "Visa 1959232722494097" или "Счет 58803664561298323391".
+
+    Результат кэшируется (LRU): одни и те же карты и счета повторяются во многих
+    транзакциях. Если номер не удаётся распознать как карту, он маскируется как
+    счёт; в строке другого вида маскируется каждая группа цифр — исходные цифры
+    в результат не попадают.
+    """
+    parts = split_instrument(value)
+    if parts is None:
+        return _mask_digits_in_text(value)
+    name, number = parts
+    masked = _mask_number(name, number)
+    return f"{name} {masked}" if name else masked
+
+
+def mask_instruments(values: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Маскирует столбец значений "from"/"to"; пустые значения сохраняются как есть"""
+    mask = mask_account_card
+    return [mask(v) if v else v for v in values]
+
+
+def mask_transactions(transactions: Iterable[Dict], fields=('from', 'to')) -> Iterator[Dict]:
+    """Выдаёт копии транзакций с замаскированными полями fields"""
+    mask = mask_account_card
+    for tx in transactions:
+        masked = dict(tx)
+        for field in fields:
+            value = masked.get(field)
+            if value:
+                masked[field] = mask(value)
+        yield masked
+
+
+def masking_cache_info() -> Dict:
+    """Статистика LRU-кэша маскирования: попадания, промахи, размер"""
+    info = mask_account_card.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
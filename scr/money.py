@@ -0,0 +1,101 @@
+import re
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, List
+
+MINOR_DIGITS = 2
+MINOR_UNITS = 10 ** MINOR_DIGITS
+
+_CENT = Decimal(1).scaleb(-MINOR_DIGITS)
+# Запятые только между группами по три цифры: "1,000", "-12,345,678"; "0,500" — дробная запятая
+_COMMA_THOUSANDS_RE = re.compile(r'[+-]?[1-9]\d{0,2}(?:,\d{3})+')
+
+
+def parse_amount(value) -> int:
+    """Переводит сумму в целое число минимальных единиц (копеек/центов) без float и Decimal.
+
+    Строки вида "31957.58", "16210", "-0.5", "1 000,50" и "1,000.50" разбираются напрямую;
+    запятая перед группами по три цифры ("1,000", "12,345") — разделитель тысяч, как и
+    при наличии точки. Дробная часть длиннее двух знаков округляется по правилу half-up.
+    """
+    if value is None or value == '':
+        return 0
+    if isinstance(value, bool):
+        raise ValueError(f"Некорректная сумма: {value!r}")
+    if isinstance(value, int):
+        return value * MINOR_UNITS
+    if isinstance(value, float):
+        # repr(float) — кратчайшее точное десятичное представление, без накопленной ошибки
+        value = repr(value)
+    elif isinstance(value, Decimal):
+        value = str(value)
+    elif not isinstance(value, str):
+        raise ValueError(f"Некорректная сумма: {value!r}")
+
+    s = value.strip()
+    if s.isdigit():
+        return int(s) * MINOR_UNITS
+    s = s.replace(' ', '').replace(' ', '')
+    if ',' in s:
+        if '.' in s:
+            s = _drop_thousands(s, value)
+        elif _COMMA_THOUSANDS_RE.fullmatch(s):
+            s = s.replace(',', '')
+        s = s.replace(',', '.')
+    if 'e' in s or 'E' in s:
+        # Экспоненциальная запись встречается только у очень больших/малых float
+        return _parse_decimal(s, value)
+
+    negative = s.startswith('-')
+    if negative or s.startswith('+'):
+        s = s[1:]
+    whole, _, frac = s.partition('.')
+    if not (whole or frac) or (whole and not whole.isdigit()) or (frac and not frac.isdigit()):
+        raise ValueError(f"Некорректная сумма: {value!r}")
+
+    minor = int(whole or '0') * MINOR_UNITS
+    if frac:
+        minor += int(frac[:MINOR_DIGITS].ljust(MINOR_DIGITS, '0'))
+        if len(frac) > MINOR_DIGITS and frac[MINOR_DIGITS] >= '5':
+            minor += 1
+    return -minor if negative else minor
+
+
+def _drop_thousands(s: str, original) -> str:
+    # Есть и запятая, и точка: последний разделитель — дробный, другой — разряды тысяч ("1,000.50", "1.000,50")
+    decimal_sep = '.' if s.rfind('.') > s.rfind(',') else ','
+    thousands_sep = ',' if decimal_sep == '.' else '.'
+    whole, _, frac = s.rpartition(decimal_sep)
+    groups = whole.lstrip('+-').split(thousands_sep)
+    if not 1 <= len(groups[0]) <= 3 or any(len(group) != 3 for group in groups[1:]):
+        raise ValueError(f"Некорректная сумма: {original!r}")
+    return whole.replace(thousands_sep, '') + '.' + frac
+
+
+def _parse_decimal(s: str, original) -> int:
+    try:
+        return int((Decimal(s) * MINOR_UNITS).to_integral_value(rounding=ROUND_HALF_UP))
+    except ArithmeticError:
+        raise ValueError(f"Некорректная сумма: {original!r}") from None
+
+
+def parse_amounts(values: Iterable) -> List[int]:
+    """Разбирает столбец сумм в минимальные единицы"""
+    return [parse_amount(v) for v in values]
+
+
+def format_amount(minor: int) -> str:
+    """Форматирует сумму в минимальных единицах как строку с двумя знаками: 3195758 -> "31957.58" """
+    sign = '-' if minor < 0 else ''
+    whole, frac = divmod(abs(minor), MINOR_UNITS)
+    return f"{sign}{whole}.{frac:0{MINOR_DIGITS}d}"
+
+
+def to_decimal(minor: int) -> Decimal:
+    """Точное десятичное значение суммы; используется только для итогов, а не для каждой строки"""
+    return Decimal(minor).scaleb(-MINOR_DIGITS)
+
+
+def mean_decimal(total_minor: int, count: int) -> Decimal:
+    if not count:
+        return to_decimal(0)
+    return (to_decimal(total_minor) / count).quantize(_CENT)
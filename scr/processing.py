@@ -1,15 +1,167 @@
-def process_transactions(transactions):
-    """Обрабатывает список транзакций"""
-    processed = []
-    total = 0.0
-
-    for tx in transactions:
-        amount = float(tx.get('amount', 0))
-        processed.append(tx)
-        total += amount
-
-    return {
-        'transactions': processed,
-        'total_amount': total,
-        'count': len(processed)
-    }
\ No newline at end of file
+from typing import Dict, Iterable, List, Optional
+
+from scr.money import mean_decimal, parse_amount, to_decimal
+
+
+def get_amount(tx: Dict):
+    """Возвращает сумму транзакции из вложенной (JSON) или плоской (CSV) структуры"""
+    operation_amount = tx.get('operationAmount')
+    if isinstance(operation_amount, dict):
+        return operation_amount.get('amount', 0)
+    return tx.get('amount', 0)
+
+
+def get_currency_code(tx: Dict) -> Optional[str]:
+    """Возвращает код валюты транзакции из вложенной (JSON) или плоской (CSV) структуры"""
+    operation_amount = tx.get('operationAmount')
+    if isinstance(operation_amount, dict):
+        return (operation_amount.get('currency') or {}).get('code')
+    return tx.get('currency_code') or tx.get('currency')
+
+
+def get_currency_name(tx: Dict) -> Optional[str]:
+    """Возвращает название валюты транзакции из вложенной (JSON) или плоской (CSV) структуры"""
+    operation_amount = tx.get('operationAmount')
+    if isinstance(operation_amount, dict):
+        return (operation_amount.get('currency') or {}).get('name')
+    return tx.get('currency_name')
+
+
+def as_values(value) -> List:
+    """Значение фильтра в виде списка: одна строка или набор строк"""
+    return [value] if isinstance(value, str) else list(value)
+
+
+def get_mask_card_number(card_number: str) -> str:
+    """Маскирует 16-значный номер карты для отчётов: **** **** ****5678"""
+    if not card_number.isdigit():
+        raise ValueError("Card number must contain only digits.")
+    if len(card_number) != 16:
+        raise ValueError("Номер карты должен содержать ровно 16 цифр.")
+    return f"**** **** ****{card_number[-4:]}"
+
+
+def filter_by_state(transactions: Iterable[Dict], state: str = 'EXECUTED') -> List[Dict]:
+    """Возвращает транзакции с указанным статусом (линейный проход; для повторных запросов см. TransactionIndex)"""
+    return [tx for tx in transactions if tx.get('state') == state]
+
+
+def sort_by_date(transactions: Iterable[Dict], reverse: bool = True) -> List[Dict]:
+    """Сортирует транзакции по дате (по умолчанию — сначала новые)"""
+    return sorted(transactions, key=lambda tx: tx.get('date') or '', reverse=reverse)
+
+
+class Aggregate:
+    """Накопительная статистика по суммам: количество, итог, минимум, максимум.
+
+    Суммы хранятся в целых минимальных единицах (копейках), поэтому итоги точны.
+    """
+
+    __slots__ = ('count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, amount):
+        self.count += 1
+        self.total += amount
+        if self.min is None or amount < self.min:
+            self.min = amount
+        if self.max is None or amount > self.max:
+            self.max = amount
+
+    def merge(self, other: 'Aggregate'):
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+
+    @property
+    def mean(self):
+        return mean_decimal(self.total, self.count)
+
+    def as_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'total': to_decimal(self.total),
+            'min': None if self.min is None else to_decimal(self.min),
+            'max': None if self.max is None else to_decimal(self.max),
+            'mean': self.mean,
+        }
+
+
+class TransactionAggregator:
+    """Однопроходная агрегация транзакций по валюте, статусу и описанию.
+
+    Память расходуется пропорционально числу групп, а не числу записей,
+    если не включено сохранение самих транзакций (keep_records=True).
+    """
+
+    def __init__(self, keep_records: bool = False):
+        self.overall = Aggregate()
+        self.by_currency: Dict[str, Aggregate] = {}
+        self.by_state: Dict[str, Aggregate] = {}
+        self.by_description: Dict[str, Aggregate] = {}
+        self.records = [] if keep_records else None
+
+    @staticmethod
+    def _add_to_group(groups: Dict[str, Aggregate], key, amount):
+        if key is None:
+            return
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = Aggregate()
+        group.add(amount)
+
+    def add(self, tx: Dict):
+        amount = parse_amount(get_amount(tx))
+        self.overall.add(amount)
+        self._add_to_group(self.by_currency, get_currency_code(tx), amount)
+        self._add_to_group(self.by_state, tx.get('state'), amount)
+        self._add_to_group(self.by_description, tx.get('description'), amount)
+        if self.records is not None:
+            self.records.append(tx)
+
+    def consume(self, transactions: Iterable[Dict]) -> 'TransactionAggregator':
+        add = self.add
+        for tx in transactions:
+            add(tx)
+        return self
+
+    def merge(self, other: 'TransactionAggregator') -> 'TransactionAggregator':
+        """Объединяет частичные агрегаты (например, посчитанные по разным файлам)"""
+        self.overall.merge(other.overall)
+        for mine, theirs in ((self.by_currency, other.by_currency),
+                             (self.by_state, other.by_state),
+                             (self.by_description, other.by_description)):
+            for key, group in theirs.items():
+                mine.setdefault(key, Aggregate()).merge(group)
+        if self.records is not None and other.records is not None:
+            self.records.extend(other.records)
+        return self
+
+    def result(self) -> Dict:
+        overall = self.overall.as_dict()
+        return {
+            'transactions': self.records,
+            'total_amount': overall['total'],
+            'count': overall['count'],
+            'min_amount': overall['min'],
+            'max_amount': overall['max'],
+            'mean_amount': overall['mean'],
+            'by_currency': {k: v.as_dict() for k, v in self.by_currency.items()},
+            'by_state': {k: v.as_dict() for k, v in self.by_state.items()},
+            'by_description': {k: v.as_dict() for k, v in self.by_description.items()},
+        }
+
+
+def process_transactions(transactions, keep_records: bool = True):
+    """Обрабатывает транзакции за один проход, считая итоги по группам"""
+    return TransactionAggregator(keep_records=keep_records).consume(transactions).result()
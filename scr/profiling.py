@@ -0,0 +1,240 @@
+"""Инструментирование конвейера: время по этапам, счётчики строк и байт, пики памяти.
+
+Пока профилирование не включено, точки замера почти ничего не стоят: stage()
+возвращает общий пустой контекстный менеджер, instrument() — исходный
+итератор без обёртки, count() сразу возвращает управление.
+
+    with profiling.profile(memory=True) as prof:
+        rows = profiling.instrument(FileHandler.iter_json(path), 'parse')
+        with profiling.stage('aggregate'):
+            result = process_transactions(rows)
+    print(prof.format_report())
+"""
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+_NULL_STAGE = nullcontext()
+_active: Optional['Profiler'] = None
+_hooks: List[Callable[[str, str, Dict], None]] = []
+
+
+class StageStats:
+    """Накопленные показатели одного этапа; время — собственное, без вложенных этапов"""
+
+    __slots__ = ('seconds', 'calls', 'rows', 'bytes', 'alloc_peak')
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows = 0
+        self.bytes = 0
+        self.alloc_peak = 0
+
+    def as_dict(self) -> Dict:
+        return {
+            'seconds': round(self.seconds, 6),
+            'calls': self.calls,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'rows_per_s': round(self.rows / self.seconds, 1) if self.seconds and self.rows else None,
+            'alloc_peak_mb': round(self.alloc_peak / (1024 * 1024), 2),
+        }
+
+
+class Profiler:
+    """Сборщик показателей одного запуска.
+
+    memory=True включает tracemalloc и записывает пик выделений по этапам;
+    cprofile=True дополнительно собирает cProfile, который сохраняется через
+    dump_stats в формате pstats (его читают snakeviz, flameprof и т. п.).
+    """
+
+    def __init__(self, memory: bool = False, cprofile: bool = False):
+        self.memory = memory
+        self.stages: Dict[str, StageStats] = {}
+        self.started = None
+        self.wall_seconds = 0.0
+        self._stack: List[list] = []
+        self._cprofile = None
+        if cprofile:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+
+    def _stats(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    def start(self):
+        self.started = time.perf_counter()
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.start()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.stop()
+        self.wall_seconds = time.perf_counter() - self.started
+
+    def enter(self, name: str):
+        if self.memory:
+            import tracemalloc
+
+            # Пик внешнего этапа фиксируется до сброса счётчика вложенным этапом
+            if self._stack:
+                parent = self._stats(self._stack[-1][0])
+                parent.alloc_peak = max(parent.alloc_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        # [этап, время начала, время вложенных этапов]
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def exit(self):
+        name, start, children = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        stats = self._stats(name)
+        stats.seconds += elapsed - children
+        stats.calls += 1
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        if self.memory:
+            import tracemalloc
+
+            stats.alloc_peak = max(stats.alloc_peak, tracemalloc.get_traced_memory()[1])
+
+    def count(self, name: str, rows: int = 0, nbytes: int = 0):
+        stats = self._stats(name)
+        stats.rows += rows
+        stats.bytes += nbytes
+
+    def report(self) -> Dict:
+        """Разбивка запуска по этапам в виде словаря (для JSON)"""
+        return {
+            'wall_seconds': round(self.wall_seconds, 6),
+            'stages': {name: stats.as_dict() for name, stats in self.stages.items()},
+        }
+
+    def format_report(self) -> str:
+        """Текстовая таблица этапов с долей времени от общего"""
+        total = self.wall_seconds or sum(stats.seconds for stats in self.stages.values()) or 1.0
+        lines = [f"{'Этап':<16}{'Время, с':>10}{'Доля':>8}{'Строк':>12}{'Строк/с':>14}{'Данные, МБ':>16}"
+                 + (f"{'Пик памяти, МБ':>17}" if self.memory else '')]
+        for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].seconds):
+            data = stats.as_dict()
+            line = (f"{name:<16}{stats.seconds:>10.3f}{stats.seconds / total:>8.1%}{stats.rows:>12}"
+                    f"{data['rows_per_s'] or 0:>14,.0f}{stats.bytes / (1024 * 1024):>16.2f}")
+            if self.memory:
+                line += f"{data['alloc_peak_mb']:>17.2f}"
+            lines.append(line)
+        lines.append(f"Всего: {self.wall_seconds:.3f} с")
+        return '\n'.join(lines)
+
+    def dump_stats(self, file_path):
+        """Сохраняет данные cProfile в формате pstats"""
+        if self._cprofile is None:
+            raise ValueError("cProfile не был включён (Profiler(cprofile=True))")
+        self._cprofile.dump_stats(str(file_path))
+
+
+def add_hook(callback: Callable[[str, str, Dict], None]):
+    """Регистрирует обработчик событий callback(event, stage, data).
+
+    События: 'stage_end' (data — показатели этапа после завершения) и
+    'count' (data — rows и bytes). Вызываются только при активном профилировании.
+    """
+    _hooks.append(callback)
+
+
+def remove_hook(callback: Callable[[str, str, Dict], None]):
+    _hooks.remove(callback)
+
+
+def _emit(event: str, name: str, data: Dict):
+    for hook in _hooks:
+        hook(event, name, data)
+
+
+def active() -> Optional[Profiler]:
+    return _active
+
+
+@contextmanager
+def profile(memory: bool = False, cprofile: bool = False) -> Iterator[Profiler]:
+    """Включает профилирование на время блока with и возвращает Profiler"""
+    global _active
+    if _active is not None:
+        raise RuntimeError("Профилирование уже запущено")
+    profiler = Profiler(memory=memory, cprofile=cprofile)
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = None
+
+
+@contextmanager
+def _stage(profiler: Profiler, name: str):
+    profiler.enter(name)
+    try:
+        yield
+    finally:
+        profiler.exit()
+        if _hooks:
+            _emit('stage_end', name, profiler.stages[name].as_dict())
+
+
+def stage(name: str):
+    """Контекстный менеджер замера этапа; без активного профилирования — пустой"""
+    if _active is None:
+        return _NULL_STAGE
+    return _stage(_active, name)
+
+
+def count(name: str, rows: int = 0, nbytes: int = 0):
+    """Добавляет к этапу число строк и прочитанных/записанных байт"""
+    if _active is None:
+        return
+    _active.count(name, rows, nbytes)
+    if _hooks:
+        _emit('count', name, {'rows': rows, 'bytes': nbytes})
+
+
+def _instrumented(profiler: Profiler, iterable: Iterable, name: str) -> Iterator:
+    iterator = iter(iterable)
+    rows = 0
+    try:
+        while True:
+            profiler.enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                profiler.exit()
+            rows += 1
+            yield item
+    finally:
+        profiler.count(name, rows)
+        if _hooks:
+            _emit('count', name, {'rows': rows, 'bytes': 0})
+
+
+def instrument(iterable: Iterable, name: str) -> Iterable:
+    """Засчитывает этапу name время получения каждого элемента и число элементов.
+
+    Без активного профилирования возвращает iterable как есть.
+    """
+    if _active is None:
+        return iterable
+    return _instrumented(_active, iterable, name)
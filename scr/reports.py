@@ -0,0 +1,246 @@
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from scr import profiling
+
+REPORT_FORMATS = ('json', 'jsonl', 'csv', 'xlsx')
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+WRITE_BUFFER_SIZE = 1024 * 1024
+WRITE_BATCH_SIZE = 10_000
+# Плоские столбцы CSV/XLSX для записей вида operations.json; вложенные поля — через точку
+TRANSACTION_FIELDS = ('id', 'state', 'date', 'operationAmount.amount', 'operationAmount.currency.name',
+                      'operationAmount.currency.code', 'description', 'from', 'to')
+
+
+def detect_report_format(file_path) -> Tuple[str, Optional[str]]:
+    """Определяет формат и сжатие по имени файла: report.jsonl.gz -> ('jsonl', 'gzip')"""
+    path = Path(file_path)
+    compression = COMPRESSION_SUFFIXES.get(path.suffix.lower())
+    if compression:
+        path = path.with_suffix('')
+    fmt = path.suffix.lower().lstrip('.')
+    if fmt == 'ndjson':
+        fmt = 'jsonl'
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Неподдерживаемый формат отчёта: {Path(file_path).name}")
+    return fmt, compression
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Значение типа {type(value).__name__} не сериализуется в JSON")
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def flat_keys(record: Dict, prefix: str = '') -> Iterator[str]:
+    """Имена полей записи с вложенными словарями через точку: operationAmount.currency.code"""
+    for key, value in record.items():
+        if isinstance(value, dict) and value:
+            yield from flat_keys(value, f"{prefix}{key}.")
+        else:
+            yield prefix + key
+
+
+def field_getter(name: str) -> Callable[[Dict], object]:
+    """Функция извлечения поля; имя с точками обращается к вложенным словарям (operationAmount.amount)"""
+    if '.' not in name:
+        return lambda record: record.get(name)
+    path = name.split('.')
+
+    def get(record):
+        for key in path:
+            if not isinstance(record, dict):
+                return None
+            record = record.get(key)
+        return record
+
+    return get
+
+
+def _open_binary(file_path, compression: Optional[str]):
+    if compression is None:
+        return open(file_path, 'wb', buffering=WRITE_BUFFER_SIZE)
+    if compression == 'gzip':
+        return gzip.open(file_path, 'wb', compresslevel=6)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Для сжатия zstd установите пакет zstandard") from None
+        return zstandard.ZstdCompressor().stream_writer(open(file_path, 'wb'), closefd=True)
+    raise ValueError(f"Неподдерживаемое сжатие: {compression}")
+
+
+class ReportWriter:
+    """Потоковая запись отчёта: JSON Lines, компактный JSON-массив, CSV или XLSX.
+
+    Записи принимаются по одной или итератором и пишутся пачками через буфер,
+    поэтому объём памяти не зависит от размера отчёта. Для CSV и XLSX набор
+    столбцов задаётся заранее (fieldnames) или собирается из полей первой пачки
+    записей: вложенные словари раскладываются в столбцы через точку, известные
+    поля идут в порядке TRANSACTION_FIELDS. Поле, впервые встреченное позже,
+    вызывает ValueError, а не теряется.
+    """
+
+    def __init__(self, file_path, fmt: Optional[str] = None, fieldnames: Optional[Sequence[str]] = None,
+                 compression: Optional[str] = None):
+        detected_fmt, detected_compression = detect_report_format(file_path) if fmt is None else (fmt, None)
+        self.fmt = detected_fmt
+        if self.fmt not in REPORT_FORMATS:
+            raise ValueError(f"Неподдерживаемый формат отчёта: {self.fmt}")
+        self.compression = compression or detected_compression
+        if self.fmt == 'xlsx' and self.compression:
+            raise ValueError("XLSX уже сжат и не поддерживает дополнительное сжатие")
+        self.file_path = file_path
+        # Отчёт пишется во временный файл рядом и подменяет file_path только после успешного close()
+        self._part_path = Path(file_path).with_name(Path(file_path).name + '.part')
+        self.fieldnames = list(fieldnames) if fieldnames is not None else None
+        # Ключи заголовка, выведенного из данных; None — столбцы заданы явно
+        self._inferred: Optional[frozenset] = None
+        self.rows_written = 0
+        self._getters: Optional[List[Callable]] = None
+        self._stream = None
+        self._workbook = None
+        self._sheet = None
+        self._csv = None
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_json_default).encode
+        self._open()
+
+    def _open(self):
+        if self.fmt == 'xlsx':
+            import openpyxl
+
+            self._workbook = openpyxl.Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet()
+            return
+        binary = _open_binary(self._part_path, self.compression)
+        self._stream = io.TextIOWrapper(binary, encoding='utf-8', newline='', write_through=False)
+        if self.fmt == 'json':
+            self._stream.write('[')
+        elif self.fmt == 'csv':
+            self._csv = csv.writer(self._stream)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _start_table(self, batch: List[Dict]):
+        if self.fieldnames is None:
+            # Объединение полей первой пачки: у "Открытие вклада" нет "from"
+            found = dict.fromkeys(key for record in batch for key in flat_keys(record))
+            declared = [name for name in TRANSACTION_FIELDS if name in found]
+            self.fieldnames = declared + [name for name in found if name not in TRANSACTION_FIELDS]
+            self._inferred = frozenset(self.fieldnames)
+        self._getters = [field_getter(name) for name in self.fieldnames]
+        if self.fmt == 'csv':
+            self._csv.writerow(self.fieldnames)
+        else:
+            self._sheet.append(self.fieldnames)
+
+    def write(self, record: Dict):
+        self.write_many((record,))
+
+    def write_many(self, records: Iterable[Dict]) -> int:
+        """Записывает записи пачками по WRITE_BATCH_SIZE; возвращает их количество"""
+        records = iter(records)
+        written = 0
+        while True:
+            batch = [record for _, record in zip(range(WRITE_BATCH_SIZE), records)]
+            if not batch:
+                break
+            self._write_batch(batch)
+            written += len(batch)
+            self.rows_written += len(batch)
+        return written
+
+    def _write_batch(self, batch: List[Dict]):
+        if self.fmt == 'jsonl':
+            encode = self._encode
+            self._stream.write(''.join([encode(record) + '\n' for record in batch]))
+        elif self.fmt == 'json':
+            encode = self._encode
+            prefix = ',' if self.rows_written else ''
+            self._stream.write(prefix + ','.join([encode(record) for record in batch]))
+        else:
+            if self._getters is None:
+                self._start_table(batch)
+            elif self._inferred is not None:
+                self._check_keys(batch)
+            getters = self._getters
+            rows = ([_cell(get(record)) for get in getters] for record in batch)
+            if self.fmt == 'csv':
+                self._csv.writerows(rows)
+            else:
+                for row in rows:
+                    self._sheet.append(row)
+
+    def _check_keys(self, batch: List[Dict]):
+        known = self._inferred
+        for record in batch:
+            keys = set(flat_keys(record))
+            if not known.issuperset(keys):
+                extra = ', '.join(sorted(keys - known))
+                raise ValueError(f"Поля {extra} нет в заголовке отчёта, выведенном из первых записей; "
+                                 f"задайте столбцы явно (fieldnames)")
+
+    def close(self):
+        if self.fmt in ('csv', 'xlsx') and self._getters is None and self.fieldnames is not None:
+            self._start_table([])
+        if self._workbook is not None:
+            self._workbook.save(self._part_path)
+            self._workbook = None
+        elif self._stream is not None:
+            if self.fmt == 'json':
+                self._stream.write(']')
+            self._stream.close()
+            self._stream = None
+        else:
+            return
+        os.replace(self._part_path, self.file_path)
+
+    def abort(self):
+        """Прерывает запись: незавершённый отчёт удаляется, file_path не меняется"""
+        if self._workbook is not None:
+            # Write-only книга держит строки во временном файле; он освобождается только при save()
+            self._workbook.save(self._part_path)
+            self._workbook = None
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._part_path.exists():
+            self._part_path.unlink()
+
+
+def write_report(records: Iterable[Dict], file_path, fmt: Optional[str] = None,
+                 fieldnames: Optional[Sequence[str]] = None, compression: Optional[str] = None) -> int:
+    """Потоково записывает отчёт; формат и сжатие по умолчанию определяются по имени файла"""
+    with profiling.stage('write'):
+        with ReportWriter(file_path, fmt=fmt, fieldnames=fieldnames, compression=compression) as writer:
+            written = writer.write_many(records)
+    if profiling.active():
+        profiling.count('write', rows=written, nbytes=os.path.getsize(file_path))
+    return written
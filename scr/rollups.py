@@ -0,0 +1,204 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from scr.cache import file_digest
+from scr.dates import day_ordinal
+from scr.file_handlers import FileHandler
+from scr.ingest import collect_files
+from scr.money import parse_amount, to_decimal
+from scr.processing import get_amount, get_currency_code
+
+ROLLUP_VERSION = 1
+PERIODS = ('day', 'month', 'year')
+
+
+def _bound(value) -> Optional[int]:
+    if value is None:
+        return None
+    ordinal = day_ordinal(value)
+    if ordinal is None:
+        raise ValueError(f"Некорректная дата: {value!r}")
+    return ordinal
+
+
+def _period_label(ordinal: int, period: str) -> str:
+    day = date.fromordinal(ordinal)
+    if period == 'day':
+        return day.isoformat()
+    if period == 'month':
+        return f"{day.year:04d}-{day.month:02d}"
+    return f"{day.year:04d}"
+
+
+class RollupStore:
+    """Материализованные дневные агрегаты (количество и сумма) по валюте и статусу.
+
+    Агрегаты пополняются инкрементально — по записям или по новым файлам, — а
+    итоги за произвольный диапазон дат считаются по префиксным суммам за
+    O(log n) по числу дней, без повторного чтения исходных данных.
+    """
+
+    def __init__(self):
+        # день -> (валюта, статус) -> [количество, сумма в копейках]
+        self._days: Dict[int, Dict[Tuple[Optional[str], Optional[str]], List[int]]] = {}
+        self.sources: Dict[str, Dict] = {}
+        self._series_cache: Dict[Tuple, Tuple[List[int], List[int], List[int]]] = {}
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    # --- пополнение ---
+
+    def add(self, tx: Dict):
+        ordinal = day_ordinal(tx.get('date'))
+        if ordinal is None:
+            self.skipped += 1
+            return
+        if self._series_cache:
+            self._series_cache.clear()
+        key = (get_currency_code(tx), tx.get('state'))
+        bucket = self._days.setdefault(ordinal, {}).setdefault(key, [0, 0])
+        bucket[0] += 1
+        bucket[1] += parse_amount(get_amount(tx))
+
+    def consume(self, transactions: Iterable[Dict]) -> 'RollupStore':
+        add = self.add
+        for tx in transactions:
+            add(tx)
+        return self
+
+    def merge(self, other: 'RollupStore') -> 'RollupStore':
+        """Добавляет агрегаты другого хранилища (источники не переносятся)"""
+        if self._series_cache:
+            self._series_cache.clear()
+        for ordinal, buckets in other._days.items():
+            mine = self._days.setdefault(ordinal, {})
+            for key, (count, total) in buckets.items():
+                bucket = mine.setdefault(key, [0, 0])
+                bucket[0] += count
+                bucket[1] += total
+        self.skipped += other.skipped
+        return self
+
+    def ingest_file(self, file_path) -> bool:
+        """Учитывает файл, если он ещё не был учтён; возвращает True, если файл добавлен.
+
+        Повторная загрузка того же файла пропускается. Если учтённый файл
+        изменился, агрегаты нельзя обновить без вычитания старых данных —
+        в этом случае бросается ValueError. Файл сначала агрегируется отдельно
+        и попадает в хранилище только после успешного чтения целиком, поэтому
+        ошибка разбора не оставляет частичных итогов.
+        """
+        key = str(Path(file_path).resolve())
+        stat = os.stat(file_path)
+        known = self.sources.get(key)
+        if known is not None:
+            if known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+                return False
+            if known['size'] == stat.st_size and file_digest(file_path) == known['digest']:
+                known['mtime_ns'] = stat.st_mtime_ns
+                return False
+            raise ValueError(f"Файл {file_path} уже учтён и с тех пор изменился; пересоберите агрегаты")
+
+        digest = file_digest(file_path)
+        partial = RollupStore().consume(FileHandler.iter_any(file_path))
+        self.merge(partial)
+        self.sources[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest}
+        return True
+
+    def ingest_dir(self, source) -> List[Path]:
+        """Учитывает все новые файлы каталога; возвращает список добавленных"""
+        return [path for path in collect_files(source) if self.ingest_file(path)]
+
+    # --- хранение ---
+
+    def save(self, file_path):
+        rows = [
+            [ordinal, currency, state, count, total]
+            for ordinal, buckets in sorted(self._days.items())
+            for (currency, state), (count, total) in buckets.items()
+        ]
+        data = {'version': ROLLUP_VERSION, 'sources': self.sources, 'days': rows}
+        tmp = Path(f"{file_path}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp, file_path)
+
+    @classmethod
+    def load(cls, file_path) -> 'RollupStore':
+        """Загружает агрегаты; если файла нет, возвращает пустое хранилище"""
+        store = cls()
+        if not os.path.exists(file_path):
+            return store
+        data = json.loads(Path(file_path).read_text(encoding='utf-8'))
+        if data.get('version') != ROLLUP_VERSION:
+            raise ValueError(f"Неподдерживаемая версия файла агрегатов: {data.get('version')}")
+        store.sources = data['sources']
+        for ordinal, currency, state, count, total in data['days']:
+            store._days.setdefault(ordinal, {})[(currency, state)] = [count, total]
+        return store
+
+    # --- запросы ---
+
+    def _series(self, currency=None, state=None) -> Tuple[List[int], List[int], List[int]]:
+        """Дни и префиксные суммы (количество, сумма) для среза по валюте/статусу; кэшируется до изменения"""
+        key = (currency, state)
+        series = self._series_cache.get(key)
+        if series is not None:
+            return series
+        days, counts, totals = [], [0], [0]
+        for ordinal in sorted(self._days):
+            count = total = 0
+            for (bucket_currency, bucket_state), (c, t) in self._days[ordinal].items():
+                if currency is not None and bucket_currency != currency:
+                    continue
+                if state is not None and bucket_state != state:
+                    continue
+                count += c
+                total += t
+            if count:
+                days.append(ordinal)
+                counts.append(counts[-1] + count)
+                totals.append(totals[-1] + total)
+        series = self._series_cache[key] = (days, counts, totals)
+        return series
+
+    def range_total(self, date_from=None, date_to=None, currency: Optional[str] = None,
+                    state: Optional[str] = None) -> Dict:
+        """Количество и сумма за диапазон дат включительно (O(log n) после построения среза)"""
+        days, counts, totals = self._series(currency, state)
+        lo_day = _bound(date_from)
+        hi_day = _bound(date_to)
+        lo = 0 if lo_day is None else bisect_left(days, lo_day)
+        hi = len(days) if hi_day is None else bisect_right(days, hi_day)
+        hi = max(lo, hi)
+        return {'count': counts[hi] - counts[lo], 'total': to_decimal(totals[hi] - totals[lo])}
+
+    def rollup(self, period: str = 'day', currency: Optional[str] = None, state: Optional[str] = None,
+               date_from=None, date_to=None) -> List[Dict]:
+        """Итоги по дням, месяцам или годам в хронологическом порядке"""
+        if period not in PERIODS:
+            raise ValueError(f"Период должен быть одним из: {', '.join(PERIODS)}")
+        days, counts, totals = self._series(currency, state)
+        lo_day = _bound(date_from)
+        hi_day = _bound(date_to)
+        lo = 0 if lo_day is None else bisect_left(days, lo_day)
+        hi = len(days) if hi_day is None else bisect_right(days, hi_day)
+
+        result = []
+        for i in range(lo, hi):
+            label = _period_label(days[i], period)
+            count = counts[i + 1] - counts[i]
+            total = totals[i + 1] - totals[i]
+            if result and result[-1]['period'] == label:
+                result[-1]['count'] += count
+                result[-1]['_total'] += total
+            else:
+                result.append({'period': label, 'count': count, '_total': total})
+        for row in result:
+            row['total'] = to_decimal(row.pop('_total'))
+        return result
@@ -0,0 +1,259 @@
+import sqlite3
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from scr.dates import date_bound, parse_date
+from scr.file_handlers import FileHandler
+from scr.ingest import collect_files
+from scr.money import format_amount, mean_decimal, parse_amount, to_decimal
+from scr.processing import as_values, get_amount, get_currency_code, get_currency_name
+from scr.validation import Quarantine
+
+INSERT_BATCH_SIZE = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    state TEXT,
+    date TEXT,
+    amount INTEGER NOT NULL,
+    currency_code TEXT,
+    currency_name TEXT,
+    description TEXT,
+    "from" TEXT,
+    "to" TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_currency ON transactions (currency_code, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_state ON transactions (state, date);
+"""
+
+_INSERT = ('INSERT OR IGNORE INTO transactions (id, state, date, amount, currency_code, currency_name, '
+           'description, "from", "to") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)')
+
+_COLUMNS = 'id, state, date, amount, currency_code, currency_name, description, "from", "to"'
+
+# Столбцы группировки: те же имена, что у TransactionTable.group_by
+GROUP_COLUMNS = {
+    'state': 'state',
+    'currency': 'currency_code',
+    'currency_name': 'currency_name',
+    'description': 'description',
+    'from': '"from"',
+    'to': '"to"',
+}
+
+
+def _store_date(value) -> Optional[str]:
+    """Дата в UTC с микросекундами: строки одной длины сравниваются в SQL как даты"""
+    parsed = parse_date(value)
+    return parsed.isoformat(timespec='microseconds') if parsed else None
+
+
+def _date_bound(value, upper: bool) -> str:
+    return date_bound(value, upper).isoformat(timespec='microseconds')
+
+
+def _row(tx: Dict) -> Optional[Tuple]:
+    tx_id = tx.get('id')
+    if isinstance(tx_id, str):
+        tx_id = int(tx_id) if tx_id.strip().isdigit() else None
+    if not isinstance(tx_id, int) or isinstance(tx_id, bool):
+        return None
+    return (tx_id, tx.get('state') or None, _store_date(tx.get('date')), parse_amount(get_amount(tx)),
+            get_currency_code(tx) or None, get_currency_name(tx) or None, tx.get('description') or None,
+            tx.get('from') or None, tx.get('to') or None)
+
+
+class TransactionStore:
+    """Постоянное хранилище транзакций в SQLite.
+
+    Записи загружаются пачками через executemany в режиме WAL, дубликаты по id
+    отбрасываются. Фильтры повторяют условия TransactionTable.mask и
+    TransactionIndex.query (дата без времени в date_to включает весь день),
+    агрегаты — результат process_transactions, но выполняются по индексам на
+    диске без повторного разбора исходных файлов. Записи без целого id или с
+    некорректной суммой сохранить нельзя: они не попадают в итоги, считаются
+    в skipped и передаются в quarantine, если он задан.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = str(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(_SCHEMA)
+        self.skipped = 0
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+
+    # --- загрузка ---
+
+    def ingest(self, transactions: Iterable[Dict], batch_size: int = INSERT_BATCH_SIZE,
+               quarantine: Optional[Quarantine] = None, source=None) -> int:
+        """Добавляет транзакции; возвращает число новых (записи с уже известным id пропускаются)"""
+        before = self.connection.total_changes
+        batch = []
+        for tx in transactions:
+            try:
+                row = _row(tx)
+                reason = None
+            except ValueError:
+                row, reason = None, "operationAmount.amount: некорректное значение"
+            if row is None:
+                self.skipped += 1
+                if quarantine is not None:
+                    if reason is None:
+                        reason = "id: нет значения" if tx.get('id') in (None, '') else "id: некорректное значение"
+                    quarantine.add(tx, [reason], source)
+                continue
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self._insert(batch)
+                batch = []
+        if batch:
+            self._insert(batch)
+        return self.connection.total_changes - before
+
+    def _insert(self, rows: List[Tuple]):
+        with self.connection:
+            self.connection.executemany(_INSERT, rows)
+
+    def ingest_file(self, file_path, quarantine: Optional[Quarantine] = None) -> int:
+        return self.ingest(FileHandler.iter_any(file_path), quarantine=quarantine, source=file_path)
+
+    def ingest_dir(self, source, quarantine: Optional[Quarantine] = None) -> int:
+        """Загружает все поддерживаемые файлы каталога (или один файл)"""
+        return sum(self.ingest_file(path, quarantine) for path in collect_files(source))
+
+    # --- запросы ---
+
+    @staticmethod
+    def _where(currency=None, state=None, description=None, date_from=None, date_to=None,
+               min_amount=None, max_amount=None) -> Tuple[str, List]:
+        clauses, params = [], []
+        for column, value in (('currency_code', currency), ('state', state), ('description', description)):
+            if value is None:
+                continue
+            values = as_values(value)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        if date_from is not None:
+            clauses.append('date >= ?')
+            params.append(_date_bound(date_from, upper=False))
+        if date_to is not None:
+            clauses.append('date <= ?')
+            params.append(_date_bound(date_to, upper=True))
+        if min_amount is not None:
+            clauses.append('amount >= ?')
+            params.append(parse_amount(min_amount))
+        if max_amount is not None:
+            clauses.append('amount <= ?')
+            params.append(parse_amount(max_amount))
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def iter_filter(self, order_by: str = 'date', reverse: bool = False, **conditions) -> Iterator[Dict]:
+        """Выдаёт подходящие транзакции в форме operations.json"""
+        if order_by not in ('id', 'date', 'amount'):
+            raise ValueError(f"Сортировка по столбцу {order_by!r} не поддерживается")
+        where, params = self._where(**conditions)
+        direction = 'DESC' if reverse else 'ASC'
+        cursor = self.connection.execute(
+            f'SELECT {_COLUMNS} FROM transactions{where} ORDER BY {order_by} {direction}, id {direction}', params)
+        for tx_id, state, date, amount, code, name, description, source, target in cursor:
+            record = {
+                'id': tx_id,
+                'state': state,
+                'date': date,
+                'operationAmount': {'amount': format_amount(amount), 'currency': {'name': name, 'code': code}},
+                'description': description,
+            }
+            if source is not None:
+                record['from'] = source
+            if target is not None:
+                record['to'] = target
+            yield record
+
+    def filter(self, **conditions) -> List[Dict]:
+        """Фильтрует транзакции; условия те же, что у TransactionTable.mask и TransactionIndex.query"""
+        return list(self.iter_filter(**conditions))
+
+    def count(self, **conditions) -> int:
+        where, params = self._where(**conditions)
+        return self.connection.execute(f'SELECT COUNT(*) FROM transactions{where}', params).fetchone()[0]
+
+    def sum(self, **conditions) -> Decimal:
+        where, params = self._where(**conditions)
+        total = self.connection.execute(f'SELECT SUM(amount) FROM transactions{where}', params).fetchone()[0]
+        return to_decimal(total or 0)
+
+    def group_by(self, by: str, **conditions) -> Dict[str, Dict]:
+        """Количество и сумма по значениям столбца, как TransactionTable.group_by"""
+        column = GROUP_COLUMNS.get(by)
+        if column is None:
+            raise ValueError(f"Группировка по столбцу {by!r} не поддерживается")
+        where, params = self._where(**conditions)
+        where += (' AND ' if where else ' WHERE ') + f'{column} IS NOT NULL'
+        rows = self.connection.execute(
+            f'SELECT {column}, COUNT(*), SUM(amount) FROM transactions{where} GROUP BY {column}', params)
+        return {key: {'count': count, 'total': to_decimal(total)} for key, count, total in rows}
+
+    def _groups(self, by: str, **conditions) -> Dict[str, Dict]:
+        column = GROUP_COLUMNS[by]
+        where, params = self._where(**conditions)
+        where += (' AND ' if where else ' WHERE ') + f'{column} IS NOT NULL'
+        rows = self.connection.execute(
+            f'SELECT {column}, COUNT(*), SUM(amount), MIN(amount), MAX(amount) FROM transactions{where} '
+            f'GROUP BY {column}', params)
+        return {key: _aggregate_dict(count, total, low, high) for key, count, total, low, high in rows}
+
+    def aggregate(self, **conditions) -> Dict:
+        """Итоги в форме результата process_transactions (без списка самих транзакций)"""
+        where, params = self._where(**conditions)
+        count, total, low, high = self.connection.execute(
+            f'SELECT COUNT(*), SUM(amount), MIN(amount), MAX(amount) FROM transactions{where}', params).fetchone()
+        overall = _aggregate_dict(count, total, low, high)
+        return {
+            'transactions': None,
+            'total_amount': overall['total'],
+            'count': overall['count'],
+            'min_amount': overall['min'],
+            'max_amount': overall['max'],
+            'mean_amount': overall['mean'],
+            'by_currency': self._groups('currency', **conditions),
+            'by_state': self._groups('state', **conditions),
+            'by_description': self._groups('description', **conditions),
+        }
+
+    def to_table(self, **conditions):
+        """Выборка в виде TransactionTable для векторной обработки"""
+        from scr.table import TransactionTable
+
+        return TransactionTable.from_records(self.iter_filter(**conditions))
+
+    def explain(self, **conditions) -> List[str]:
+        """План выполнения запроса SQLite — видно, какой индекс используется"""
+        where, params = self._where(**conditions)
+        rows = self.connection.execute(f'EXPLAIN QUERY PLAN SELECT {_COLUMNS} FROM transactions{where}', params)
+        return [row[-1] for row in rows]
+
+
+def _aggregate_dict(count: int, total, low, high) -> Dict:
+    # Тот же вид, что у Aggregate.as_dict
+    return {
+        'count': count,
+        'total': to_decimal(total or 0),
+        'min': to_decimal(low) if count else None,
+        'max': to_decimal(high) if count else None,
+        'mean': mean_decimal(total or 0, count),
+    }
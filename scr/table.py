@@ -0,0 +1,234 @@
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+from scr.dates import date_bound, parse_date_column, to_datetime64
+from scr.file_handlers import FileHandler
+from scr.masks import mask_instruments
+from scr.money import format_amount, parse_amount, to_decimal
+from scr.processing import get_amount, get_currency_code, get_currency_name
+
+CATEGORICAL_COLUMNS = ('state', 'currency', 'currency_name', 'description', 'from', 'to')
+SORTABLE_COLUMNS = ('id', 'date', 'amount') + CATEGORICAL_COLUMNS
+
+MISSING_ID = -1
+MISSING_CODE = -1
+
+
+class TransactionTable:
+    """Колоночное хранилище транзакций на массивах NumPy.
+
+    Числовые поля лежат в типизированных массивах (суммы — int64 в копейках),
+    а строковые (статус, валюта, описание, отправитель и получатель) — в виде
+    кодов категорий int32 со словарём значений, общим для всех выборок из таблицы.
+    """
+
+    def __init__(self, ids: np.ndarray, dates: np.ndarray, amounts: np.ndarray,
+                 codes: Dict[str, np.ndarray], categories: Dict[str, List[str]], _lookup=None):
+        self.ids = ids
+        self.dates = dates
+        self.amounts = amounts
+        self._codes = codes
+        self._categories = categories
+        if _lookup is None:
+            _lookup = {col: {v: i for i, v in enumerate(cats)} for col, cats in categories.items()}
+        self._lookup = _lookup
+
+    # --- конструкторы ---
+
+    @classmethod
+    def from_records(cls, transactions: Iterable[Dict]) -> 'TransactionTable':
+        """Строит таблицу из словарей в форме operations.json или плоской CSV-форме"""
+        ids, dates, amounts = [], [], []
+        lookups = {col: {} for col in CATEGORICAL_COLUMNS}
+        codes = {col: [] for col in CATEGORICAL_COLUMNS}
+        getters = {
+            'state': lambda tx: tx.get('state'),
+            'currency': get_currency_code,
+            'currency_name': get_currency_name,
+            'description': lambda tx: tx.get('description'),
+            'from': lambda tx: tx.get('from'),
+            'to': lambda tx: tx.get('to'),
+        }
+
+        for tx in transactions:
+            tx_id = tx.get('id')
+            ids.append(MISSING_ID if tx_id in (None, '') else int(tx_id))
+            dates.append(tx.get('date'))
+            amounts.append(parse_amount(get_amount(tx)))
+            for col, getter in getters.items():
+                value = getter(tx)
+                if value is None or value == '':
+                    codes[col].append(MISSING_CODE)
+                    continue
+                lookup = lookups[col]
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                codes[col].append(code)
+
+        return cls(
+            np.array(ids, dtype=np.int64),
+            parse_date_column(dates),
+            np.array(amounts, dtype=np.int64),
+            {col: np.array(values, dtype=np.int32) for col, values in codes.items()},
+            {col: list(lookup) for col, lookup in lookups.items()},
+        )
+
+    @classmethod
+    def from_json(cls, file_path) -> 'TransactionTable':
+        return cls.from_records(FileHandler.iter_json(file_path))
+
+    @classmethod
+    def from_csv(cls, file_path) -> 'TransactionTable':
+        return cls.from_records(FileHandler.iter_csv_transactions(file_path))
+
+    @classmethod
+    def from_xlsx(cls, file_path) -> 'TransactionTable':
+        return cls.from_records(FileHandler.iter_xlsx(file_path))
+
+    @classmethod
+    def from_file(cls, file_path) -> 'TransactionTable':
+        return cls.from_records(FileHandler.iter_any(file_path))
+
+    # --- доступ к данным ---
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def categories(self, column: str) -> List[str]:
+        return self._categories[column]
+
+    def codes(self, column: str) -> np.ndarray:
+        return self._codes[column]
+
+    def column(self, column: str) -> np.ndarray:
+        """Возвращает столбец; категориальные столбцы декодируются в массив объектов"""
+        if column == 'id':
+            return self.ids
+        if column == 'date':
+            return self.dates
+        if column == 'amount':
+            return self.amounts
+        values = np.array(self._categories[column] + [None], dtype=object)
+        return values[self._codes[column]]
+
+    def take(self, selector) -> 'TransactionTable':
+        """Возвращает новую таблицу по булевой маске или массиву индексов"""
+        return TransactionTable(
+            self.ids[selector],
+            self.dates[selector],
+            self.amounts[selector],
+            {col: codes[selector] for col, codes in self._codes.items()},
+            self._categories,
+            self._lookup,
+        )
+
+    def masked(self, columns=('from', 'to')) -> 'TransactionTable':
+        """Возвращает таблицу с замаскированными реквизитами.
+
+        Маскируются только уникальные значения словаря категорий, коды строк
+        переиспользуются без копирования. Если разные номера дают одну маску,
+        их категории сливаются в одну и коды строк перекодируются.
+        """
+        categories = dict(self._categories)
+        codes = dict(self._codes)
+        for column in columns:
+            labels = mask_instruments(categories[column])
+            merged = {}
+            remap = [merged.setdefault(label, len(merged)) for label in labels]
+            categories[column] = list(merged)
+            if len(merged) < len(labels):
+                # Последний элемент отображает код пропуска -1 сам в себя
+                codes[column] = np.array(remap + [-1], dtype=codes[column].dtype)[codes[column]]
+        return TransactionTable(self.ids, self.dates, self.amounts, codes, categories)
+
+    def to_records(self) -> Iterator[Dict]:
+        """Выдаёт строки таблицы в форме operations.json"""
+        decoded = {col: self.column(col) for col in CATEGORICAL_COLUMNS}
+        dates = np.datetime_as_string(self.dates, unit='us')
+        for i in range(len(self)):
+            record = {
+                'id': int(self.ids[i]),
+                'state': decoded['state'][i],
+                'date': None if dates[i] == 'NaT' else str(dates[i]),
+                'operationAmount': {
+                    'amount': format_amount(int(self.amounts[i])),
+                    'currency': {'name': decoded['currency_name'][i], 'code': decoded['currency'][i]},
+                },
+                'description': decoded['description'][i],
+            }
+            for col in ('from', 'to'):
+                if decoded[col][i] is not None:
+                    record[col] = decoded[col][i]
+            yield record
+
+    # --- векторные операции ---
+
+    def _category_mask(self, column: str, value) -> np.ndarray:
+        codes = self._codes[column]
+        if isinstance(value, (list, tuple, set, frozenset)):
+            wanted = [self._lookup[column][v] for v in value if v in self._lookup[column]]
+            return np.isin(codes, wanted)
+        code = self._lookup[column].get(value)
+        if code is None:
+            return np.zeros(len(codes), dtype=bool)
+        return codes == code
+
+    def mask(self, currency=None, state=None, description=None,
+             date_from=None, date_to=None, min_amount=None, max_amount=None) -> np.ndarray:
+        """Строит булеву маску по набору условий (все условия объединяются через И)"""
+        result = np.ones(len(self), dtype=bool)
+        for column, value in (('currency', currency), ('state', state), ('description', description)):
+            if value is not None:
+                result &= self._category_mask(column, value)
+        if date_from is not None:
+            result &= self.dates >= to_datetime64(date_bound(date_from))
+        if date_to is not None:
+            # Дата без времени включает весь день, как в TransactionIndex и TransactionStore
+            result &= self.dates <= to_datetime64(date_bound(date_to, upper=True))
+        if min_amount is not None:
+            result &= self.amounts >= parse_amount(min_amount)
+        if max_amount is not None:
+            result &= self.amounts <= parse_amount(max_amount)
+        return result
+
+    def filter(self, **conditions) -> 'TransactionTable':
+        """Фильтрует таблицу; принимает те же условия, что и mask()"""
+        return self.take(self.mask(**conditions))
+
+    def sort(self, by: str = 'date', reverse: bool = False) -> 'TransactionTable':
+        if by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Сортировка по столбцу {by!r} не поддерживается")
+        if by in CATEGORICAL_COLUMNS:
+            cats = self._categories[by]
+            # Ранг категории в алфавитном порядке; пропуски — в конце
+            ranks = np.empty(len(cats) + 1, dtype=np.int64)
+            ranks[np.argsort(np.array(cats, dtype=object), kind='stable')] = np.arange(len(cats))
+            ranks[-1] = len(cats)
+            keys = ranks[self._codes[by]]
+        else:
+            keys = self.column(by)
+        order = np.argsort(keys, kind='stable')
+        if reverse:
+            order = order[::-1]
+        return self.take(order)
+
+    def sum(self) -> Decimal:
+        return to_decimal(int(self.amounts.sum()))
+
+    def group_by(self, by: str) -> Dict[str, Dict]:
+        """Считает количество и сумму по каждой категории столбца за один проход bincount"""
+        codes = self._codes[by]
+        present = codes >= 0
+        size = len(self._categories[by])
+        counts = np.bincount(codes[present], minlength=size)
+        # bincount с весами считает во float64; np.add.at по int64 сохраняет точность
+        totals = np.zeros(size, dtype=np.int64)
+        np.add.at(totals, codes[present], self.amounts[present])
+        return {
+            category: {'count': int(counts[i]), 'total': to_decimal(int(totals[i]))}
+            for i, category in enumerate(self._categories[by])
+            if counts[i]
+        }
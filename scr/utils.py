@@ -1,4 +1,6 @@
-from datetime import datetime
+from scr.dates import format_date
+from scr.money import format_amount, parse_amount
+from scr.processing import get_amount
 
 
 def format_transaction(transaction):
@@ -6,12 +8,12 @@ def format_transaction(transaction):
     date = transaction.get('date', '')
     if date:
         try:
-            date = datetime.strptime(date, '%Y-%m-%d').strftime('%d.%m.%Y')
+            date = format_date(date)
         except ValueError:
             pass
 
     return {
         'date': date,
         'description': transaction.get('description', 'Без описания'),
-        'amount': f"{transaction.get('amount', 0):.2f} руб."
+        'amount': f"{format_amount(parse_amount(get_amount(transaction)))} руб."
     }
@@ -0,0 +1,158 @@
+import json
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from scr.money import parse_amount
+from scr.processing import get_currency_code
+
+
+class Field(NamedTuple):
+    """Правило для одного поля канонической записи.
+
+    get — ключ верхнего уровня или функция; значение должно быть экземпляром
+    types и, если задан check, пройти его.
+    """
+    name: str
+    get: Union[str, Callable[[Dict], object]]
+    types: Tuple[type, ...]
+    check: Optional[Callable[[object], bool]] = None
+    required: bool = True
+
+
+def _raw_amount(tx: Dict):
+    # В отличие от get_amount, отсутствующая сумма не подменяется нулём
+    operation_amount = tx.get('operationAmount')
+    if isinstance(operation_amount, dict):
+        return operation_amount.get('amount')
+    return tx.get('amount')
+
+
+def _is_id(value) -> bool:
+    if isinstance(value, str):
+        return value.isdigit()
+    return not isinstance(value, bool) and value >= 0
+
+
+def _is_date(value) -> bool:
+    if isinstance(value, str):
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            return False
+    return True
+
+
+def _is_amount(value) -> bool:
+    # Обычный вид суммы в выгрузках ("31957.58", "16210"); остальное проверяется полным разбором
+    if isinstance(value, str) and value.replace('.', '', 1).isdigit():
+        return True
+    try:
+        parse_amount(value)
+    except ValueError:
+        return False
+    return True
+
+
+# Канонический вид записи — как в operations.json; плоские записи CSV/XLSX проверяются по тем же полям.
+# "from" необязателен: у "Открытие вклада" счёта списания нет и в настоящих выгрузках.
+SCHEMA = (
+    Field('id', 'id', (int, str), _is_id),
+    Field('state', 'state', (str,)),
+    Field('date', 'date', (str, date), _is_date),
+    Field('operationAmount.amount', _raw_amount, (str, int, float, Decimal), _is_amount),
+    Field('operationAmount.currency.code', get_currency_code, (str,)),
+    Field('description', 'description', (str,)),
+    Field('from', 'from', (str,), required=False),
+    Field('to', 'to', (str,), required=False),
+)
+
+
+def compile_validator(schema: Sequence[Field] = SCHEMA) -> Callable[[Dict], List[str]]:
+    """Строит функцию проверки записи; возвращает список причин отбраковки (пустой — запись корректна).
+
+    Правила разворачиваются в кортеж один раз, на каждую запись остаётся
+    проход по готовой таблице (получение значения, проверка).
+    """
+    # Поля верхнего уровня читаются через dict.get без вызова функции-геттера
+    rules = tuple((isinstance(field.get, str), field.get, field.types, field.check, field.required,
+                   f"{field.name}: нет значения", f"{field.name}: некорректное значение") for field in schema)
+
+    def validate(tx) -> List[str]:
+        if not isinstance(tx, dict):
+            return ["запись не является объектом"]
+        reasons = []
+        get_key = tx.get
+        for by_key, get, types, check, required, missing, invalid in rules:
+            value = get_key(get) if by_key else get(tx)
+            if value is None or value == '':
+                if required:
+                    reasons.append(missing)
+            elif not isinstance(value, types) or (check is not None and not check(value)):
+                reasons.append(invalid)
+        return reasons
+
+    return validate
+
+
+class Quarantine:
+    """Приёмник отбракованных записей: JSONL-файл с причинами и счётчики по причинам.
+
+    Каждая строка файла — {"source": ..., "reasons": [...], "record": {...}}.
+    Без file_path записи только подсчитываются.
+    """
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.count = 0
+        self.reasons: Counter = Counter()
+        self._file = None
+        self._started = False
+
+    def open(self) -> 'Quarantine':
+        if self.file_path is not None and self._file is None:
+            # Файл перезаписывается только при первом открытии, повторное открытие дописывает
+            self._file = open(self.file_path, 'a' if self._started else 'w', encoding='utf-8')
+            self._started = True
+        return self
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, record, reasons: List[str], source=None):
+        self.count += 1
+        self.reasons.update(reasons)
+        if self.file_path is None:
+            return
+        self.open()
+        entry = {'source': None if source is None else str(source), 'reasons': reasons, 'record': record}
+        self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+
+    def summary(self) -> List[str]:
+        """Строки сводки для вывода: число отбракованных записей и частота каждой причины"""
+        if not self.count:
+            return []
+        lines = [f"Отбраковано записей: {self.count}" + (f" (см. {self.file_path})" if self.file_path else '')]
+        lines.extend(f"  {reason}: {n}" for reason, n in self.reasons.most_common())
+        return lines
+
+
+def iter_valid(transactions: Iterable, quarantine: Optional[Quarantine] = None, source=None,
+               validate: Optional[Callable[[Dict], List[str]]] = None) -> Iterator[Dict]:
+    """Пропускает дальше только корректные записи, остальные передаёт в quarantine"""
+    validate = validate or compile_validator()
+    for tx in transactions:
+        reasons = validate(tx)
+        if not reasons:
+            yield tx
+        elif quarantine is not None:
+            quarantine.add(tx, reasons, source)
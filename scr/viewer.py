@@ -0,0 +1,399 @@
+"""Окно просмотра транзакций на PyQt5; импортируется только для графического режима"""
+import csv
+import os
+import sys
+import threading
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QObject, QRunnable, Qt, QThreadPool, pyqtSignal
+from PyQt5.QtWidgets import (QApplication, QComboBox, QFileDialog, QHBoxLayout, QLabel, QProgressBar, QPushButton,
+                             QTableView, QVBoxLayout, QWidget)
+
+from scr.dates import format_date
+from scr.file_handlers import _detect_format, _iter_json_array, FileHandler, iter_csv_rows, sniff_csv
+from scr.masks import mask_account_card
+from scr.money import format_amount, parse_amount
+from scr.processing import TransactionAggregator, get_amount, get_currency_code
+
+__all__ = ['TransactionTableModel', 'TransactionLoader', 'TransactionWidget', 'open_stream', 'main']
+
+FETCH_BATCH_SIZE = 500
+PROGRESS_EVERY_ROWS = 10_000
+
+
+def open_stream(file_path) -> Tuple[Iterator[Dict], Optional[Callable[[], int]]]:
+    """Потоковый загрузчик файла и функция, возвращающая число прочитанных байт.
+
+    Для XLSX (сжатый архив) позиция в файле не отражает прогресс, поэтому
+    вместо функции возвращается None.
+    """
+    fmt = _detect_format(file_path)
+    if fmt == 'xlsx':
+        return FileHandler.iter_xlsx(file_path), None
+    csv_format = sniff_csv(file_path) if fmt == 'csv' else None
+    # Файл открывается в самом генераторе: закрытый до начала чтения генератор не оставляет дескриптор
+    opened = []
+
+    def records():
+        with open(file_path, 'r', encoding=csv_format.encoding if csv_format else 'utf-8', newline='') as f:
+            opened.append(f)
+            if csv_format is None:
+                yield from _iter_json_array(f)
+                return
+            header = next(csv.reader(f, delimiter=csv_format.delimiter), None)
+            if header is not None:
+                yield from iter_csv_rows(f, header, csv_format)
+
+    def position() -> int:
+        # Позиция нижележащего файла: сколько байт уже прочитано в буфер
+        return opened[0].buffer.raw.tell() if opened else 0
+
+    return records(), position
+
+
+def _cell_amount(tx: Dict) -> str:
+    value = get_amount(tx)
+    try:
+        return format_amount(parse_amount(value))
+    except ValueError:
+        return str(value)
+
+
+def _cell_date(tx: Dict) -> str:
+    value = tx.get('date')
+    try:
+        return format_date(value) if value else ''
+    except ValueError:
+        return str(value)
+
+
+def _cell_instrument(field: str) -> Callable[[Dict], str]:
+    def get(tx):
+        value = tx.get(field)
+        return mask_account_card(value) if value else ''
+
+    return get
+
+
+class TransactionTableModel(QAbstractTableModel):
+    """Модель таблицы транзакций с ленивой подгрузкой.
+
+    Записи читаются из потокового загрузчика пачками по batch_size, только
+    когда представление прокручивается к концу (canFetchMore/fetchMore), а
+    ячейки форматируются при отрисовке — поэтому открытие большого файла не
+    ждёт его полного разбора. Исключение из источника не выходит за пределы
+    fetchMore (в PyQt5 это завершило бы приложение): подгрузка прекращается,
+    а текст ошибки передаётся сигналом failed.
+    """
+
+    failed = pyqtSignal(str)
+
+    COLUMNS = (
+        ('Дата', _cell_date),
+        ('Описание', lambda tx: tx.get('description') or ''),
+        ('Сумма', _cell_amount),
+        ('Валюта', lambda tx: get_currency_code(tx) or ''),
+        ('Статус', lambda tx: tx.get('state') or ''),
+        ('Откуда', _cell_instrument('from')),
+        ('Куда', _cell_instrument('to')),
+    )
+    AMOUNT_COLUMN = 2
+
+    def __init__(self, records: Iterable[Dict] = (), batch_size: int = FETCH_BATCH_SIZE, parent=None):
+        super().__init__(parent)
+        self.batch_size = batch_size
+        self._rows = []
+        self._source: Optional[Iterator[Dict]] = iter(records)
+        self.error: Optional[str] = None
+
+    def set_source(self, records: Optional[Iterable[Dict]], rows: Iterable[Dict] = ()):
+        """Заменяет источник записей; ранее загруженные строки сбрасываются.
+
+        rows — уже прочитанные записи (первая пачка из фонового потока);
+        records=None — других записей нет.
+        """
+        self.beginResetModel()
+        self.close()
+        self._rows = list(rows)
+        self._source = iter(records) if records is not None else None
+        self.error = None
+        self.endResetModel()
+
+    def close(self):
+        close = getattr(self._source, 'close', None)
+        if close is not None:
+            close()
+        self._source = None
+
+    def record(self, row: int) -> Dict:
+        return self._rows[row]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.COLUMNS[index.column()][1](self._rows[index.row()])
+        if role == Qt.TextAlignmentRole and index.column() == self.AMOUNT_COLUMN:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section][0]
+        return section + 1
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._source is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._source is None:
+            return
+        batch = []
+        try:
+            batch.extend(islice(self._source, self.batch_size))
+        except Exception as e:
+            # Строки, прочитанные до ошибки, остаются в таблице
+            self.error = str(e)
+        if len(batch) < self.batch_size:
+            self.close()
+        if batch:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+            self._rows.extend(batch)
+            self.endInsertRows()
+        if self.error is not None:
+            self.failed.emit(self.error)
+
+
+class LoaderSignals(QObject):
+    """Сигналы фоновой загрузки; доставляются в поток интерфейса через очередь событий"""
+
+    opened = pyqtSignal(list, object)  # первая пачка записей и источник остальных (None — записей больше нет)
+    progress = pyqtSignal(int, int)  # процент (-1, если неизвестен), обработано строк
+    finished = pyqtSignal(dict)      # результат TransactionAggregator.result()
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class TransactionLoader(QRunnable):
+    """Загрузка файла в QThreadPool: первая пачка строк для таблицы, затем полный проход
+    с агрегацией, прогрессом и отменой.
+
+    Файл открывается и первая пачка читается тоже в фоне: openpyxl в режиме
+    read_only при первом чтении разбирает sharedStrings целиком, и в потоке
+    интерфейса это заморозило бы окно.
+    """
+
+    def __init__(self, file_path, progress_every: int = PROGRESS_EVERY_ROWS, preview_size: int = FETCH_BATCH_SIZE):
+        super().__init__()
+        self.file_path = file_path
+        self.progress_every = progress_every
+        self.preview_size = preview_size
+        self.signals = LoaderSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _read_preview(self) -> bool:
+        try:
+            records = FileHandler.iter_any(self.file_path)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return False
+        batch = []
+        error = None
+        try:
+            batch.extend(islice(records, self.preview_size))
+        except Exception as e:
+            # Записи, прочитанные до ошибки, всё равно показываются
+            error = str(e)
+        if error is not None or len(batch) < self.preview_size:
+            records.close()
+            records = None
+        self.signals.opened.emit(batch, records)
+        if error is not None:
+            self.signals.failed.emit(error)
+            return False
+        return True
+
+    def run(self):
+        if not self._read_preview():
+            return
+        try:
+            size = os.path.getsize(self.file_path)
+            records, position = open_stream(self.file_path)
+            aggregator = TransactionAggregator()
+            rows = 0
+            try:
+                for tx in records:
+                    if rows % self.progress_every == 0:
+                        if self._cancel.is_set():
+                            self.signals.cancelled.emit()
+                            return
+                        percent = int(position() * 100 / size) if position and size else -1
+                        self.signals.progress.emit(percent, rows)
+                    aggregator.add(tx)
+                    rows += 1
+            finally:
+                records.close()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.progress.emit(100, rows)
+        self.signals.finished.emit(aggregator.result())
+
+
+class TransactionWidget(QWidget):
+    FILE_FILTERS = {'JSON': 'JSON (*.json)', 'CSV': 'CSV (*.csv)', 'XLSX': 'Excel (*.xlsx)'}
+
+    def __init__(self, thread_pool: Optional[QThreadPool] = None):
+        super().__init__()
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self.loader: Optional[TransactionLoader] = None
+        self.result: Optional[Dict] = None
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.label = QLabel("Выберите тип файла для загрузки транзакций:")
+        layout.addWidget(self.label)
+
+        self.combo = QComboBox()
+        self.combo.addItems(["JSON", "CSV", "XLSX"])
+        layout.addWidget(self.combo)
+
+        self.btn_load = QPushButton("Загрузить транзакции")
+        self.btn_load.clicked.connect(self.choose_file)
+        layout.addWidget(self.btn_load)
+
+        self.model = TransactionTableModel(parent=self)
+        self.model.failed.connect(self._on_model_failed)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        layout.addWidget(self.table)
+
+        status = QHBoxLayout()
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+        status.addWidget(self.progress)
+        self.btn_cancel = QPushButton("Отмена")
+        self.btn_cancel.setEnabled(False)
+        self.btn_cancel.clicked.connect(self.cancel)
+        status.addWidget(self.btn_cancel)
+        layout.addLayout(status)
+
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+
+        self.setLayout(layout)
+
+    def choose_file(self):
+        file_filter = self.FILE_FILTERS[self.combo.currentText()]
+        file_path, _ = QFileDialog.getOpenFileName(self, "Выберите файл", "", file_filter)
+        if file_path:
+            self.load_file(file_path)
+
+    def load_file(self, file_path):
+        """Открывает файл в фоне: таблица получает первую пачку строк, затем приходят итоги"""
+        self.cancel()
+        self.result = None
+        self.model.set_source(None)
+        self.summary.setText("Загрузка…")
+        self.progress.setRange(0, 100)
+        self.progress.setValue(0)
+
+        loader = TransactionLoader(file_path)
+        loader.signals.opened.connect(self._on_opened)
+        loader.signals.progress.connect(self._on_progress)
+        loader.signals.finished.connect(self._on_finished)
+        loader.signals.failed.connect(self._on_failed)
+        loader.signals.cancelled.connect(self._on_cancelled)
+        self.loader = loader
+        self.btn_cancel.setEnabled(True)
+        self.thread_pool.start(loader)
+
+    def cancel(self):
+        if self.loader is not None:
+            self.loader.cancel()
+
+    def _is_current(self) -> bool:
+        # Сигналы отменённой загрузки могут прийти уже после начала новой
+        return self.loader is not None and self.sender() is self.loader.signals
+
+    def _on_opened(self, rows: list, records):
+        if not self._is_current():
+            if records is not None:
+                records.close()
+            return
+        self.model.set_source(records, rows)
+
+    def _on_progress(self, percent: int, rows: int):
+        if not self._is_current():
+            return
+        if percent < 0:
+            self.progress.setRange(0, 0)
+        else:
+            self.progress.setValue(percent)
+        self.summary.setText(f"Обработано строк: {rows}")
+
+    def _on_finished(self, result: Dict):
+        if not self._is_current():
+            return
+        self.result = result
+        self.progress.setRange(0, 100)
+        self.progress.setValue(100)
+        self.btn_cancel.setEnabled(False)
+        by_currency = ', '.join(f"{code}: {group['total']:.2f}"
+                                for code, group in sorted(result['by_currency'].items(), key=lambda item: str(item[0])))
+        self.summary.setText(f"Итого: {result['count']} транзакций. {by_currency}")
+
+    def _on_failed(self, message: str):
+        if not self._is_current():
+            return
+        self.btn_cancel.setEnabled(False)
+        self.summary.setText(f"Ошибка: {message}")
+
+    def _on_model_failed(self, message: str):
+        # Фоновый разбор того же файла остановился бы на той же ошибке
+        self.cancel()
+        self.loader = None
+        self.btn_cancel.setEnabled(False)
+        self.summary.setText(f"Ошибка: {message}")
+
+    def _on_cancelled(self):
+        if not self._is_current():
+            return
+        self.btn_cancel.setEnabled(False)
+        self.summary.setText("Загрузка отменена")
+
+    def closeEvent(self, event):
+        self.cancel()
+        self.model.close()
+        super().closeEvent(event)
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    widget = TransactionWidget()
+    widget.resize(1000, 600)
+    widget.show()
+    return app.exec_()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
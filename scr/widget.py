@@ -1,22 +1,44 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QPushButton
+import re
+from datetime import date
 
+from scr.dates import format_date
+from scr.masks import get_mask_account
 
-class TransactionWidget(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.init_ui()
+# Классы окна (TransactionWidget и др.) живут в scr.viewer и загружаются вместе с PyQt5 при первом
+# обращении через __getattr__. В __all__ их нет: иначе "import *" загружал бы PyQt5.
+__all__ = ['get_date', 'get_mask_account']
 
-    def init_ui(self):
-        layout = QVBoxLayout()
+_VIEWER_NAMES = frozenset({'TransactionTableModel', 'TransactionLoader', 'LoaderSignals', 'TransactionWidget',
+                           'open_stream', 'FETCH_BATCH_SIZE', 'PROGRESS_EVERY_ROWS'})
 
-        self.label = QLabel("Выберите тип файла для загрузки транзакций:")
-        layout.addWidget(self.label)
+# Дата в поле ввода виджета: "2023 01. 15"
+_WIDGET_DATE_RE = re.compile(r'^(\d{4}) (\d{2})\. (\d{2})$')
 
-        self.combo = QComboBox()
-        self.combo.addItems(["JSON", "CSV", "XLSX"])
-        layout.addWidget(self.combo)
 
-        self.btn_load = QPushButton("Загрузить транзакции")
-        layout.addWidget(self.btn_load)
+def get_date(value: str) -> str:
+    """Преобразует дату из поля ввода ("2023 01. 15") в формат отображения ("15.01.2023")"""
+    match = _WIDGET_DATE_RE.match(value)
+    if match is None:
+        raise ValueError(f"Неверный формат даты: {value!r}")
+    year, month, day = map(int, match.groups())
+    return format_date(date(year, month, day))
 
-        self.setLayout(layout)
\ No newline at end of file
+
+def __getattr__(name):
+    if name in _VIEWER_NAMES:
+        from scr import viewer
+
+        return getattr(viewer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _VIEWER_NAMES)
+
+
+if __name__ == '__main__':
+    import sys
+
+    from scr.viewer import main
+
+    sys.exit(main())
@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.fixture
+def make_tx():
+    """Фабрика транзакций в форме operations.json"""
+    def make(tx_id, currency, state, date, amount, **extra):
+        return {
+            "id": tx_id, "state": state, "date": date,
+            "operationAmount": {"amount": amount, "currency": {"name": currency, "code": currency}},
+            "description": "Перевод организации", **extra,
+        }
+
+    return make
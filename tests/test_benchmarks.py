@@ -0,0 +1,51 @@
+import json
+
+from benchmarks.cases import CASES, Case
+from benchmarks.run import compare, format_result, main, measure
+
+
+def test_measure_reports_throughput_and_memory(tmp_path):
+    result = measure("process_transactions", 200, tmp_path, repeats=1, allocations=True)
+    assert result["processed"] == 200
+    assert result["rows_per_s"] > 0
+    assert result["peak_rss_mb"] > 0
+    assert "alloc_peak_mb" in result
+
+
+def test_measure_zero_time_case(tmp_path, monkeypatch):
+    # Сценарий быстрее разрешения таймера не даёт деления на ноль и rows_per_s=None
+    monkeypatch.setitem(CASES, "noop", Case("noop", lambda workdir, rows: None, lambda state: 1))
+    monkeypatch.setattr("benchmarks.run.time.perf_counter", lambda: 0.0)
+    result = measure("noop", 1, tmp_path, repeats=1)
+    assert result["rows_per_s"] > 0
+    assert "noop" in format_result(result)
+
+
+def test_all_loaders_and_stages_covered():
+    for name in ("load_json", "load_csv", "load_xlsx", "process_transactions", "filter",
+                 "mask", "format_transaction", "save_report"):
+        assert name in CASES
+
+
+def test_compare_threshold():
+    baseline = {"results": [{"case": "mask", "rows": 100, "rows_per_s": 1000.0, "peak_rss_mb": 50.0}]}
+    # Замедление в пределах порога — не регрессия
+    assert compare([{"case": "mask", "rows": 100, "rows_per_s": 800.0, "peak_rss_mb": 55.0}], baseline, 0.25) == []
+    regressions = compare([{"case": "mask", "rows": 100, "rows_per_s": 700.0, "peak_rss_mb": 70.0}], baseline, 0.25)
+    assert len(regressions) == 2
+    # Сценарии без базовой линии не сравниваются
+    assert compare([{"case": "filter", "rows": 100, "rows_per_s": 1.0, "peak_rss_mb": 1.0}], baseline) == []
+
+
+def test_main_fails_on_regression(tmp_path):
+    args = ["--case", "filter", "--rows", "100", "--repeats", "1", "--no-isolate",
+            "--workdir", str(tmp_path), "--output", str(tmp_path / "results.json"),
+            "--baseline", str(tmp_path / "baseline.json")]
+    assert main(args + ["--save-baseline"]) == 0
+    assert (tmp_path / "results.json").exists()
+
+    # Базовая линия заведомо быстрее текущего результата
+    baseline = json.loads((tmp_path / "baseline.json").read_text(encoding="utf-8"))
+    baseline["results"][0]["rows_per_s"] = 1e12
+    (tmp_path / "baseline.json").write_text(json.dumps(baseline), encoding="utf-8")
+    assert main(args) == 1
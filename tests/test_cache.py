@@ -0,0 +1,79 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from scr.cache import ParseCache
+from scr.file_handlers import FileHandler
+from scr.table import TransactionTable
+
+
+@pytest.fixture
+def source(tmp_path):
+    records = [
+        {"id": 1, "state": "EXECUTED", "date": "2019-08-26T10:50:58.294041",
+         "operationAmount": {"amount": "31957.58", "currency": {"name": "руб.", "code": "RUB"}},
+         "description": "Перевод организации", "from": "Maestro 1596837868705199", "to": "Счет 64686473678894779589"},
+        {"id": 2, "state": "CANCELED", "date": "2018-06-30T02:08:58.425572",
+         "operationAmount": {"amount": "9824.07", "currency": {"name": "USD", "code": "USD"}},
+         "description": "Открытие вклада", "to": "Счет 11776614605963066702"},
+    ]
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(tmp_path / "cache")
+
+
+def counting_parser(calls):
+    def parser(path):
+        calls.append(path)
+        return TransactionTable.from_file(path)
+    return parser
+
+
+def test_cache_hit_is_memory_mapped(source, cache):
+    calls = []
+    first = cache.load(source, parser=counting_parser(calls))
+    second = cache.load(source, parser=counting_parser(calls))
+
+    assert len(calls) == 1
+    assert isinstance(second.amounts, np.memmap)
+    assert list(second.to_records()) == list(first.to_records())
+    assert second.filter(currency="USD").sum() == first.filter(currency="USD").sum()
+
+
+def test_touch_keeps_entry_but_change_evicts(source, cache):
+    calls = []
+    cache.load(source, parser=counting_parser(calls))
+
+    # Изменился только mtime — содержимое сверяется по хэшу, повторного разбора нет
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    cache.load(source, parser=counting_parser(calls))
+    assert len(calls) == 1
+
+    # Изменилось содержимое при том же размере — запись устарела
+    text = source.read_text(encoding="utf-8").replace("31957.58", "31957.59")
+    source.write_text(text, encoding="utf-8")
+    table = cache.load(source, parser=counting_parser(calls))
+    assert len(calls) == 2
+    assert str(table.sum()) == "41781.66"
+
+
+def test_corrupted_entry_is_evicted(source, cache):
+    cache.load(source)
+    (cache.entry_dir(source) / "amounts.npy").write_bytes(b"garbage")
+
+    assert cache.get(source) is None
+    assert not cache.entry_dir(source).exists()
+    assert len(cache.load(source)) == 2
+
+
+def test_file_handler_load_table(source, tmp_path):
+    table = FileHandler.load_table(source, cache_dir=tmp_path / "cache")
+    assert list(table.ids) == [1, 2]
+    assert (tmp_path / "cache").exists()
@@ -0,0 +1,171 @@
+import json
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pytest
+from scr.currency import CurrencyConverter, FileRateProvider, HTTPRateProvider, RateCache, RateProvider
+from scr.processing import process_transactions
+from scr.table import TransactionTable
+
+RATES = {
+    "base": "RUB",
+    "rates": {
+        "2019-08-26": {"USD": "64.50", "EUR": "71.25"},
+        "2019-09-01": {"USD": "66.00"},
+    },
+}
+
+
+class CountingProvider(RateProvider):
+    """Поставщик-заглушка: запоминает каждый вызов fetch"""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.base = provider.base
+        self.calls = []
+
+    def fetch(self, pairs):
+        self.calls.append(list(pairs))
+        return self.provider.fetch(pairs)
+
+
+@pytest.fixture
+def provider(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text(json.dumps(RATES), encoding="utf-8")
+    return CountingProvider(FileRateProvider(path))
+
+
+@pytest.fixture
+def transactions(make_tx):
+    return [
+        make_tx(1, "USD", "EXECUTED", "2019-08-26T10:50:58.294041", "100.00"),
+        make_tx(2, "USD", "EXECUTED", "2019-08-26T18:00:00Z", "1.00"),
+        make_tx(3, "EUR", "EXECUTED", "2019-08-27T00:00:00", "10.00"),
+        make_tx(4, "RUB", "EXECUTED", "2019-08-27T00:00:00", "500.50"),
+        make_tx(5, "USD", "EXECUTED", "2019-09-03T00:00:00", "0.01"),
+    ]
+
+
+def test_convert_transactions_one_fetch_per_batch(provider, transactions):
+    converter = CurrencyConverter(provider)
+    converted = list(converter.convert_transactions(transactions))
+
+    assert [tx["operationAmount"]["amount"] for tx in converted] == [
+        "6450.00", "64.50", "712.50", "500.50", "0.66"]
+    assert converted[0]["operationAmount"]["currency"]["code"] == "RUB"
+    assert converted[0]["originalAmount"]["amount"] == "100.00"
+    # Уникальные пары запрашиваются одним вызовом, RUB не запрашивается вовсе
+    assert provider.calls == [[("EUR", "2019-08-27"), ("USD", "2019-08-26"), ("USD", "2019-09-03")]]
+
+    # Повторный пересчёт обслуживается из кэша
+    list(converter.convert_transactions(transactions))
+    assert len(provider.calls) == 1
+    assert process_transactions(converted)["total_amount"] == Decimal("7728.16")
+
+
+def test_cross_rate_to_other_target(provider, transactions):
+    converter = CurrencyConverter(provider, target="USD")
+    amounts = converter.convert_amounts(np.array([7125, 6450]), ["EUR", "RUB"], ["2019-08-26", "2019-08-26"])
+    # 71.25 EUR * 71.25 / 64.50 = 78.71 USD; 64.50 RUB = 1.00 USD
+    assert amounts.tolist() == [7871, 100]
+
+
+def test_rounding_matches_parse_amount(tmp_path):
+    path = tmp_path / "rates.json"
+    path.write_text(json.dumps({"base": "RUB", "rates": {"2019-08-26": {"XXX": "0.5"}}}), encoding="utf-8")
+    converter = CurrencyConverter(FileRateProvider(path))
+    # Половина копейки округляется от нуля (np.rint дал бы 0, 2 и -2)
+    amounts = converter.convert_amounts([1, 5, -5, 3], ["XXX"] * 4, ["2019-08-26"] * 4)
+    assert amounts.tolist() == [1, 3, -3, 2]
+    assert converter.convert_amounts([], [], []).tolist() == []
+
+
+def test_large_products_fall_back_to_exact_integers(tmp_path):
+    path = tmp_path / "rates.json"
+    rate = "0.123456789012"
+    path.write_text(json.dumps({"base": "RUB", "rates": {"2019-08-26": {"XXX": rate}}}), encoding="utf-8")
+    converter = CurrencyConverter(FileRateProvider(path))
+    # 10^12 копеек * числитель курса (~3 * 10^10) не помещается в int64, результат — помещается
+    amounts = [10 ** 12, -10 ** 12, 12345]
+    expected = [round(Decimal(a) * Decimal(rate)) for a in amounts]
+    assert converter.convert_amounts(amounts, ["XXX"] * 3, ["2019-08-26"] * 3).tolist() == expected
+
+
+def test_transaction_without_date_uses_latest_rate(provider, make_tx):
+    converter = CurrencyConverter(provider)
+    tx = make_tx(1, "USD", "EXECUTED", None, "2.00")
+    assert next(converter.convert_transactions([tx]))["operationAmount"]["amount"] == "132.00"
+
+
+def test_rate_provider_is_abstract():
+    with pytest.raises(TypeError):
+        RateProvider()
+
+
+def test_missing_rate(provider):
+    converter = CurrencyConverter(provider)
+    with pytest.raises(ValueError, match="Нет курса для PEN"):
+        converter.convert_amounts([100], ["PEN"], ["2019-08-26"])
+    with pytest.raises(ValueError):
+        converter.convert_amounts([100], ["USD"], ["2019-01-01"])
+
+
+def test_rate_cache_ttl():
+    now = [0.0]
+    cache = RateCache(ttl=10, maxsize=2, clock=lambda: now[0])
+    cache.put(("USD", "2019-08-26"), Decimal("64.5"))
+    assert cache.get(("USD", "2019-08-26")) == Decimal("64.5")
+    now[0] = 11
+    assert cache.get(("USD", "2019-08-26")) is None
+    assert len(cache) == 0
+
+    for day in ("01", "02", "03"):
+        cache.put(("USD", f"2019-08-{day}"), Decimal(1))
+    assert len(cache) == 2
+    now[0] = 100
+    assert cache.evict_expired() == 2
+
+
+def test_convert_table(provider, transactions):
+    table = TransactionTable.from_records(transactions)
+    converted = CurrencyConverter(provider).convert_table(table)
+    assert converted.tolist() == [645000, 6450, 71250, 50050, 66]
+
+
+def test_http_provider_one_request_per_day():
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            query = parse_qs(urlsplit(self.path).query)
+            requests.append(query)
+            rates = {code: "60.00" for code in query["symbols"][0].split(",") if code != "XXX"}
+            data = json.dumps({"rates": rates}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    try:
+        provider = HTTPRateProvider(f"http://127.0.0.1:{server.server_port}")
+        rates = provider.fetch([("USD", "2019-08-26"), ("EUR", "2019-08-26"), ("XXX", "2019-08-26"),
+                                ("USD", "2019-08-27")])
+        provider.client.close()
+    finally:
+        server.shutdown()
+
+    assert rates == {("USD", "2019-08-26"): Decimal("60.00"), ("EUR", "2019-08-26"): Decimal("60.00"),
+                     ("USD", "2019-08-27"): Decimal("60.00")}
+    assert [(q["date"][0], q["symbols"][0]) for q in requests] == [
+        ("2019-08-26", "EUR,USD,XXX"), ("2019-08-27", "USD")]
@@ -0,0 +1,67 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from scr.dates import day_ordinal, format_date, format_date_column, parse_date, parse_date_column
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2019-08-26T10:50:58.294041", datetime(2019, 8, 26, 10, 50, 58, 294041)),
+    ("2023-09-05T11:30:32Z", datetime(2023, 9, 5, 11, 30, 32)),
+    ("2023-09-05T02:30:32+03:00", datetime(2023, 9, 4, 23, 30, 32)),
+    ("2019-08-26", datetime(2019, 8, 26)),
+    (date(2019, 8, 26), datetime(2019, 8, 26)),
+    ("26.08.2019", None),
+    ("", None),
+])
+def test_parse_date(value, expected):
+    assert parse_date(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2019-08-26T10:50:58.294041", "26.08.2019"),
+    ("2023-09-05T11:30:32Z", "05.09.2023"),
+    ("2019-08-26", "26.08.2019"),
+    ("2019-08-26 10:50:58", "26.08.2019"),
+    (datetime(2019, 8, 26, 23, 0), "26.08.2019"),
+])
+def test_format_date(value, expected):
+    assert format_date(value) == expected
+
+
+def test_format_date_invalid():
+    for value in ("2019-02-30", "26.08.2019", "2019-08-26X", None):
+        with pytest.raises(ValueError):
+            format_date(value)
+
+
+def test_format_date_column():
+    values = ["2019-08-26T10:50:58.294041", None, "bad", "2019-08-26T00:00:00Z"]
+    assert format_date_column(values) == ["26.08.2019", None, None, "26.08.2019"]
+    assert format_date_column(["2019-08-26"], fmt="%Y/%m/%d") == ["2019/08/26"]
+
+
+def test_parse_date_column_utc():
+    column = parse_date_column(["2023-09-05T11:30:32Z", "2023-09-05T14:30:32+03:00", None])
+    assert column.dtype == np.dtype("datetime64[us]")
+    assert column[0] == column[1]
+    assert np.isnat(column[2])
+
+
+def test_parse_date_column_other_iso_forms():
+    column = parse_date_column(["20190826", "2019-W35-1", "2019-08-26T10:50:58,123", "2019-08-26 10:50:58"])
+    expected = [parse_date(v) for v in ("20190826", "2019-W35-1", "2019-08-26T10:50:58,123", "2019-08-26 10:50:58")]
+    assert column.tolist() == expected
+    assert column[0] == np.datetime64("2019-08-26", "us")
+
+
+def test_parse_date_column_bad_values_become_nat():
+    column = parse_date_column(["not a date", "2019-13-45", "2019-08-26T10:50:58.294041"])
+    assert np.isnat(column[0]) and np.isnat(column[1])
+    assert column[2] == np.datetime64("2019-08-26T10:50:58.294041", "us")
+
+
+def test_day_ordinal():
+    assert day_ordinal("2020-01-01T02:00:00+03:00") == date(2019, 12, 31).toordinal()
+    assert day_ordinal("2019-08-26T10:50:58.294041") == date(2019, 8, 26).toordinal()
+    assert day_ordinal("bad") is None
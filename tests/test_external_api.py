@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from scr.external_api import BankAPI, BankAPIClient, BankAPIError
+
+
+class StubBank:
+    """Состояние заглушки API: страницы транзакций, счётчики запросов и сбоев"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.failures_left = {}
+        self.active = 0
+        self.max_active = 0
+
+
+def make_handler(bank):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            account_id = parts.path.split("/")[3]
+            with bank.lock:
+                bank.requests.append(self.path)
+                bank.active += 1
+                bank.max_active = max(bank.max_active, bank.active)
+                fail = bank.failures_left.get(account_id, 0)
+                if fail:
+                    bank.failures_left[account_id] = fail - 1
+            try:
+                time.sleep(0.02)
+                if account_id == "missing":
+                    return self.reply(404, {"error": "not found"})
+                if fail:
+                    return self.reply(503, {"error": "busy"}, {"Retry-After": "0"})
+                page = int(query.get("page", ["1"])[0])
+                body = {"transactions": [{"id": f"{account_id}-{page}-{i}"} for i in range(2)]}
+                if page < 3:
+                    body["next"] = f"{parts.path}?page={page + 1}"
+                self.reply(200, body)
+            finally:
+                with bank.lock:
+                    bank.active -= 1
+
+        def reply(self, status, body, headers=None):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+@pytest.fixture
+def bank():
+    return StubBank()
+
+
+@pytest.fixture
+def client(bank):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(bank))
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    api = BankAPIClient(f"http://127.0.0.1:{server.server_port}/v1", max_per_host=2, backoff=0.01)
+    api._sleep = lambda delay: None
+    yield api
+    api.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_iter_transactions_follows_pages(client, bank):
+    result = list(client.iter_transactions("acc1", "2024-01-01", "2024-01-31"))
+    assert [tx["id"] for tx in result] == [f"acc1-{p}-{i}" for p in (1, 2, 3) for i in range(2)]
+    assert "from=2024-01-01" in bank.requests[0]
+    assert len(bank.requests) == 3
+
+
+def test_retries_on_503(client, bank):
+    bank.failures_left["acc2"] = 2
+    assert len(client.get_transactions("acc2", "2024-01-01", "2024-01-31")) == 6
+    assert len(bank.requests) == 5
+
+
+def test_errors_are_raised(client, bank):
+    with pytest.raises(BankAPIError) as excinfo:
+        client.get_transactions("missing", "2024-01-01", "2024-01-31")
+    assert excinfo.value.status == 404
+    assert len(bank.requests) == 1  # 404 не повторяется
+
+    bank.failures_left["acc3"] = 100
+    with pytest.raises(BankAPIError):
+        client.get_transactions("acc3", "2024-01-01", "2024-01-31")
+    assert len(bank.requests) == 1 + client.max_retries + 1
+
+
+def test_get_transactions_many_caps_concurrency(client, bank):
+    accounts = [f"acc{i}" for i in range(6)]
+    result = client.get_transactions_many(accounts, "2024-01-01", "2024-01-31", workers=6)
+
+    assert list(result) == accounts
+    assert all(len(txs) == 6 for txs in result.values())
+    assert bank.max_active <= 2
+
+
+def test_invalid_url_is_not_retried(client):
+    calls = []
+    get = client.session.get
+    client.session.get = lambda *args, **kwargs: calls.append(args) or get(*args, **kwargs)
+    with pytest.raises(BankAPIError):
+        client.request("127.0.0.1/v1/accounts")  # без схемы: MissingSchema
+    assert len(calls) == 1
+
+
+def test_bank_api_delegates_to_client(client, bank):
+    api = BankAPI(client.base_url, client=client)
+    assert len(api.get_transactions("acc4", "2024-01-01", "2024-01-31")) == 6
+    with pytest.raises(BankAPIError):
+        api.get_transactions("missing", "2024-01-01", "2024-01-31")
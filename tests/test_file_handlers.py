@@ -0,0 +1,142 @@
+import json
+
+import openpyxl
+import pytest
+from scr.file_handlers import CsvFormat, FileHandler, sniff_csv
+
+
+@pytest.fixture
+def transactions():
+    return [
+        {"id": 1, "state": "EXECUTED", "amount": "31957.58", "description": "Перевод организации"},
+        {"id": 2, "state": "CANCELED", "amount": 12345, "description": "Открытие вклада"},
+        {"id": 3, "state": "EXECUTED", "amount": 0.5, "description": "Перевод с карты на карту"},
+        {},
+    ]
+
+
+@pytest.fixture
+def json_file(tmp_path, transactions):
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(transactions, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def test_iter_json_matches_load_json(json_file):
+    # Потоковый разбор даёт тот же результат, что и json.load
+    assert list(FileHandler.iter_json(json_file)) == FileHandler.load_json(json_file)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64])
+def test_iter_json_chunk_boundaries(tmp_path, chunk_size):
+    # Элементы корректно собираются, даже если граница чанка режет строку или число
+    data = [12345, "строка", {"a": [1, 2, {"b": None}]}, 1.25e3, True]
+    path = tmp_path / "numbers.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    assert list(FileHandler.iter_json(path, chunk_size=chunk_size)) == data
+
+
+def test_iter_json_empty_array_and_object(tmp_path):
+    empty = tmp_path / "empty.json"
+    empty.write_text("  [ ]  ", encoding="utf-8")
+    assert list(FileHandler.iter_json(empty)) == []
+
+    single = tmp_path / "single.json"
+    single.write_text('{"id": 1}', encoding="utf-8")
+    assert list(FileHandler.iter_json(single)) == [{"id": 1}]
+
+
+def test_iter_json_is_lazy(json_file):
+    # Генератор не читает файл до первого обращения и отдаёт элементы по одному
+    records = FileHandler.iter_json(json_file)
+    assert next(records)["id"] == 1
+
+
+def test_iter_json_truncated(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('[{"id": 1}, {"id": 2', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(FileHandler.iter_json(path, chunk_size=4))
+
+
+def test_iter_csv(tmp_path):
+    path = tmp_path / "operations.csv"
+    path.write_text("id,state\n1,EXECUTED\n2,CANCELED\n", encoding="utf-8")
+    assert list(FileHandler.iter_csv(path)) == FileHandler.load_csv(path)
+
+
+def test_iter_xlsx(tmp_path):
+    path = tmp_path / "operations.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["id", "state"])
+    ws.append([1, "EXECUTED"])
+    ws.append([2, "CANCELED"])
+    wb.save(path)
+
+    assert list(FileHandler.iter_xlsx(path)) == [
+        {"id": 1, "state": "EXECUTED"},
+        {"id": 2, "state": "CANCELED"},
+    ]
+
+
+def test_iter_any_dispatch(tmp_path, json_file, transactions):
+    assert list(FileHandler.iter_any(json_file)) == transactions
+
+    # Файл без расширения распознаётся по содержимому
+    no_ext = tmp_path / "operations"
+    no_ext.write_text(json_file.read_text(encoding="utf-8"), encoding="utf-8")
+    assert list(FileHandler.iter_any(no_ext)) == transactions
+
+    csv_no_ext = tmp_path / "csv"
+    csv_no_ext.write_text("id,state\n1,EXECUTED\n", encoding="utf-8")
+    assert list(FileHandler.iter_any(csv_no_ext)) == [{"id": 1, "state": "EXECUTED"}]
+
+    with pytest.raises(ValueError, match="Неподдерживаемый формат файла"):
+        FileHandler.iter_any(tmp_path / "report.txt")
+
+
+EXPORT_CSV = (
+    "id;state;date;amount;currency_name;currency_code;from;to;description\n"
+    "650703;EXECUTED;2023-09-05T11:30:32Z;16210;Sol;PEN;Счет 58803664561298323391;Счет 39745660563456619397;"
+    "Перевод организации\n"
+    "5380041;CANCELED;2021-02-01T11:54:58Z;23789;Peso;UYU;;Счет 23294994494356835683;Открытие вклада\n"
+)
+
+
+@pytest.mark.parametrize("encoding, expected", [("utf-8", "utf-8"), ("utf-8-sig", "utf-8-sig"), ("cp1251", "cp1251")])
+def test_sniff_csv(tmp_path, encoding, expected):
+    path = tmp_path / "export.csv"
+    path.write_bytes(EXPORT_CSV.encode(encoding))
+    assert sniff_csv(path) == CsvFormat(expected, ";")
+
+
+def test_iter_csv_transactions_normalizes_export(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_bytes(EXPORT_CSV.encode("utf-8-sig"))
+
+    records = list(FileHandler.iter_csv_transactions(path))
+    assert records == [
+        {
+            "id": 650703, "state": "EXECUTED", "date": "2023-09-05T11:30:32Z",
+            "operationAmount": {"amount": "16210", "currency": {"name": "Sol", "code": "PEN"}},
+            "description": "Перевод организации",
+            "from": "Счет 58803664561298323391", "to": "Счет 39745660563456619397",
+        },
+        {
+            # Пустой "from" опускается, как в operations.json
+            "id": 5380041, "state": "CANCELED", "date": "2021-02-01T11:54:58Z",
+            "operationAmount": {"amount": "23789", "currency": {"name": "Peso", "code": "UYU"}},
+            "description": "Открытие вклада", "to": "Счет 23294994494356835683",
+        },
+    ]
+
+
+def test_iter_csv_transactions_comma_and_extra_columns(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text('id,amount,currency,note\n7,"1,5",USD,x\n8,2\n', encoding="utf-8")
+
+    assert list(FileHandler.iter_csv_transactions(path)) == [
+        {"id": 7, "operationAmount": {"amount": "1,5", "currency": {"name": None, "code": "USD"}}, "note": "x"},
+        {"id": 8, "operationAmount": {"amount": "2", "currency": {"name": None, "code": None}}},
+    ]
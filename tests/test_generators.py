@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from scr.file_handlers import FileHandler
+from scr.generators import CSV_COLUMNS, DESCRIPTION_WEIGHTS, generate_transactions, write_transactions
+from scr.processing import process_transactions
+
+
+def test_generate_transactions_json_schema():
+    records = list(generate_transactions(500, seed=42, chunk_size=128))
+
+    assert len(records) == 500
+    assert len({tx["id"] for tx in records}) == 500
+    for tx in records:
+        assert tx["state"] in ("EXECUTED", "CANCELED", "PENDING")
+        assert tx["description"] in DESCRIPTION_WEIGHTS
+        whole, frac = tx["operationAmount"]["amount"].split(".")
+        assert whole.isdigit() and len(frac) == 2
+        assert tx["to"].split()[-1].isdigit()
+        # У "Открытие вклада" нет отправителя, как в data/operations.json
+        assert ("from" in tx) == (tx["description"] != "Открытие вклада")
+
+
+def test_generate_transactions_is_seedable():
+    first = list(generate_transactions(300, seed=7, chunk_size=100))
+    assert first == list(generate_transactions(300, seed=7, chunk_size=100))
+    assert first != list(generate_transactions(300, seed=8, chunk_size=100))
+
+
+def test_generate_transactions_csv_schema():
+    records = list(generate_transactions(50, seed=1, schema="csv"))
+    assert all(tuple(tx) == CSV_COLUMNS for tx in records)
+    assert all(tx["date"].endswith("Z") for tx in records)
+
+
+def test_write_json_matches_generator(tmp_path):
+    path = tmp_path / "operations.json"
+    write_transactions(path, 250, seed=3, chunk_size=100)
+
+    assert json.loads(path.read_text(encoding="utf-8")) == list(generate_transactions(250, seed=3, chunk_size=100))
+
+
+def test_write_csv_readable_by_loader(tmp_path):
+    path = tmp_path / "operations.csv"
+    write_transactions(path, 250, seed=3, chunk_size=100)
+
+    records = list(FileHandler.iter_csv_transactions(path))
+    assert len(records) == 250
+    assert records[0]["operationAmount"]["currency"]["code"]
+
+
+def test_write_with_workers_is_identical(tmp_path):
+    single, parallel = tmp_path / "single.csv", tmp_path / "parallel.csv"
+    write_transactions(single, 300, seed=5, chunk_size=50)
+    write_transactions(parallel, 300, seed=5, chunk_size=50, workers=2)
+    assert single.read_bytes() == parallel.read_bytes()
+
+
+def test_write_xlsx_and_empty(tmp_path):
+    path = tmp_path / "operations.xlsx"
+    write_transactions(path, 20, seed=1)
+    rows = list(FileHandler.iter_xlsx(path))
+    assert len(rows) == 20 and tuple(rows[0]) == CSV_COLUMNS
+
+    empty = tmp_path / "empty.json"
+    write_transactions(empty, 0, seed=1)
+    assert json.loads(empty.read_text(encoding="utf-8")) == []
+
+    with pytest.raises(ValueError, match="Неподдерживаемый формат"):
+        write_transactions(tmp_path / "x.txt", 1)
+
+
+def test_same_seed_same_totals_in_every_format(tmp_path):
+    # Суммы в CSV и XLSX пишутся с копейками, итоги совпадают с JSON
+    totals = {}
+    for fmt in ("json", "csv", "xlsx"):
+        path = tmp_path / f"operations.{fmt}"
+        write_transactions(path, 120, seed=11, chunk_size=50)
+        totals[fmt] = process_transactions(FileHandler.iter_any(path), keep_records=False)["total_amount"]
+    assert totals["json"] == totals["csv"] == totals["xlsx"]
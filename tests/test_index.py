@@ -0,0 +1,55 @@
+import pytest
+from scr.index import TransactionIndex
+
+
+@pytest.fixture
+def transactions(make_tx):
+    return [
+        make_tx(1, "USD", "EXECUTED", "2019-01-15T10:00:00.000000", "1500.00"),
+        make_tx(2, "USD", "CANCELED", "2019-03-01T10:00:00.000000", "2000.00"),
+        make_tx(3, "RUB", "EXECUTED", "2019-04-10T10:00:00.000000", "50000.00"),
+        make_tx(4, "USD", "EXECUTED", "2019-06-30T23:59:00.000000", "999.99"),
+        make_tx(5, "USD", "EXECUTED", "2019-07-01T00:00:00Z", "3000.00"),
+        make_tx(6, "USD", "EXECUTED", "2019-06-30T12:00:00Z", "1000.01"),
+        {"id": 7, "state": "EXECUTED"},
+    ]
+
+
+@pytest.fixture
+def index(transactions):
+    return TransactionIndex(transactions)
+
+
+def test_combined_query(index):
+    result = index.query(currency="USD", state="EXECUTED", date_from="2019-01-01",
+                         date_to="2019-06-30", min_amount="1000.01")
+    assert [tx["id"] for tx in result] == [1, 6]
+
+
+@pytest.mark.parametrize("conditions, expected", [
+    ({"currency": "USD"}, [1, 2, 4, 5, 6]),
+    ({"currency": ["RUB", "EUR"]}, [3]),
+    ({"state": "CANCELED"}, [2]),
+    ({"date_from": "2019-06-30"}, [4, 5, 6]),
+    ({"date_to": "2019-01-31"}, [1]),
+    ({"min_amount": 3000}, [3, 5]),
+    ({"max_amount": "999.99"}, [4, 7]),
+    ({"currency": "GBP"}, []),
+    ({}, [1, 2, 3, 4, 5, 6, 7]),
+])
+def test_single_conditions(index, conditions, expected):
+    assert [tx["id"] for tx in index.query(**conditions)] == expected
+
+
+def test_explain_picks_most_selective_index(index):
+    plan = index.explain(currency="USD", state="CANCELED", min_amount=0)
+    assert plan["index"] == "state"
+    assert plan["candidates"] == 1
+    assert plan["estimates"] == {"currency": 5, "state": 1, "amount": 7}
+
+    assert index.explain(date_from="2019-07-01")["index"] == "date"
+    assert index.explain()["index"] == "scan"
+
+
+def test_stats(index):
+    assert index.stats() == {"rows": 7, "currencies": 2, "states": 2, "dated_rows": 6}
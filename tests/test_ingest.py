@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from scr.ingest import collect_files, ingest, iter_task, plan_tasks, split_csv
+from scr.processing import process_transactions
+from scr.validation import Quarantine
+
+
+@pytest.fixture
+def export_dir(tmp_path):
+    json_records = [
+        {"id": i, "state": "EXECUTED", "description": "Перевод организации",
+         "operationAmount": {"amount": f"{i}.25", "currency": {"name": "USD", "code": "USD"}}}
+        for i in range(1, 6)
+    ]
+    (tmp_path / "day1.json").write_text(json.dumps(json_records, ensure_ascii=False), encoding="utf-8")
+
+    lines = ["id,state,amount,currency_code,description"]
+    lines += [f"{i},{'EXECUTED' if i % 3 else 'CANCELED'},{i}.10,RUB,Открытие вклада" for i in range(100, 300)]
+    (tmp_path / "day2.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    (tmp_path / "notes.txt").write_text("не выгрузка", encoding="utf-8")
+    return tmp_path
+
+
+def test_collect_files_skips_unsupported(export_dir):
+    assert [p.name for p in collect_files(export_dir)] == ["day1.json", "day2.csv"]
+
+
+def test_split_csv_covers_every_row_once(export_dir):
+    path = export_dir / "day2.csv"
+    tasks = split_csv(path, chunk_bytes=500)
+    assert len(tasks) > 1
+    ids = [row["id"] for task in tasks for row in iter_task(task)]
+    assert ids == list(range(100, 300))
+
+
+def test_plan_tasks_splits_only_large_csv(export_dir):
+    tasks = plan_tasks(collect_files(export_dir), chunk_bytes=500)
+    assert tasks[0].path.endswith("day1.json") and tasks[0].end is None
+    assert all(task.end is not None for task in tasks[1:])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ingest_matches_sequential(export_dir, workers):
+    expected = process_transactions(
+        list(iter_task(plan_tasks([export_dir / "day1.json"])[0]))
+        + list(iter_task(plan_tasks([export_dir / "day2.csv"])[0])),
+        keep_records=False,
+    )
+    result = ingest(export_dir, workers=workers, chunk_bytes=500).result()
+    assert result == expected
+    assert result["count"] == 205
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ingest_quarantines_bad_rows_without_stopping(tmp_path, workers):
+    lines = ["id,state,date,amount,currency_code,description"]
+    for i in range(1, 201):
+        # Каждая 50-я строка — с некорректной суммой, каждая 70-я — без описания
+        amount = "12.3.4" if i % 50 == 0 else f"{i}.10"
+        description = "" if i % 70 == 0 else "Открытие вклада"
+        lines.append(f"{i},EXECUTED,2019-08-26T10:50:58,{amount},RUB,{description}")
+    (tmp_path / "day.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    path = tmp_path / "quarantine.jsonl"
+    with Quarantine(path) as quarantine:
+        result = ingest(tmp_path / "day.csv", workers=workers, chunk_bytes=500, quarantine=quarantine).result()
+
+    bad = [json.loads(line)["record"]["id"] for line in path.read_text(encoding="utf-8").splitlines()]
+    assert bad == [50, 70, 100, 140, 150, 200]
+    assert result["count"] == 194
+    assert quarantine.reasons == {"operationAmount.amount: некорректное значение": 4, "description: нет значения": 2}
@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from scr.main import main
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ('PyQt5', 'numpy', 'openpyxl', 'requests')
+# Бюджет на импорт scr.main, микросекунды (сейчас около 15 мс)
+IMPORT_BUDGET_US = 150_000
+
+
+@pytest.fixture
+def operations_file(tmp_path):
+    records = [
+        {"id": 1, "state": "EXECUTED", "date": "2019-08-26T10:50:58.294041", "description": "Перевод организации",
+         "operationAmount": {"amount": "100.50", "currency": {"name": "руб.", "code": "RUB"}}},
+        {"id": 2, "state": "EXECUTED", "date": "2019-07-03T18:35:29.512364", "description": "Перевод с карты на карту",
+         "operationAmount": {"amount": "20.00", "currency": {"name": "USD", "code": "USD"}}},
+    ]
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def test_import_does_not_load_heavy_modules():
+    # Меню и пакетный режим не должны тянуть PyQt5, NumPy, openpyxl и requests
+    code = f"import sys, scr.main; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+
+def test_import_time_within_budget():
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import scr.main'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    line = next(line for line in result.stderr.splitlines() if line.endswith('| scr.main'))
+    cumulative = int(line.split('|')[1])
+    assert cumulative < IMPORT_BUDGET_US
+
+
+def test_batch_mode_prints_totals(operations_file, capsys, monkeypatch):
+    # Без вопросов пользователю: input() не должен вызываться
+    monkeypatch.setattr('builtins.input', lambda *args: pytest.fail("input() в пакетном режиме"))
+    main(['--input', str(operations_file)])
+    out = capsys.readouterr().out
+    # Без курсов RUB и USD не складываются: итоги только по валютам
+    assert "Итого: 2 транзакций\n" in out
+    assert "на сумму 120.50" not in out
+    assert "RUB: 1 транзакций на сумму 100.50" in out
+    assert "USD: 1 транзакций на сумму 20.00" in out
+
+
+def test_batch_mode_converts_with_rates(operations_file, tmp_path, capsys):
+    rates = tmp_path / "rates.json"
+    rates.write_text(json.dumps({"base": "RUB", "rates": {"2019-07-03": {"USD": "64.50"}}}), encoding="utf-8")
+    main(['--rates', str(rates), '--input', str(operations_file)])
+    # 100.50 руб. + 20.00 USD * 64.50
+    assert "Итого: 2 транзакций на сумму 1390.50 руб." in capsys.readouterr().out
+
+
+def test_batch_mode_writes_report(operations_file, tmp_path, capsys):
+    output = tmp_path / "report.jsonl"
+    main(['--input', str(operations_file), '--format', 'json', '--output', str(output)])
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)['id'] for line in lines] == [1, 2]
+    assert "Итого: 2 транзакций" in capsys.readouterr().out
+
+
+def test_batch_mode_error_exits_nonzero(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(['--input', str(tmp_path / "missing.json")])
+    assert exc.value.code == 1
+    assert "Ошибка" in capsys.readouterr().err
+
+
+def test_batch_mode_quarantines_bad_rows(operations_file, tmp_path, capsys):
+    records = json.loads(operations_file.read_text(encoding="utf-8"))
+    records.insert(1, {"id": 3, "description": "Перевод организации", "operationAmount": {"amount": "abc"}})
+    operations_file.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    quarantine = tmp_path / "bad.jsonl"
+
+    main(['--quarantine', str(quarantine), '--input', str(operations_file)])
+    captured = capsys.readouterr()
+    assert "Итого: 2 транзакций\n" in captured.out
+    assert "Отбраковано записей: 1" in captured.err
+    assert json.loads(quarantine.read_text(encoding="utf-8"))["record"]["id"] == 3
+
+
+def test_interactive_csv_uses_sniffing_loader(capsys, monkeypatch):
+    # Выгрузка data/csv разделена ';'; в карантин уходит только пустая строка ";;;;;;;;"
+    answers = iter(["2", str(ROOT / "data" / "csv")])
+    monkeypatch.setattr('builtins.input', lambda *args: next(answers))
+    main([])
+    captured = capsys.readouterr()
+    assert "Итого: 999 транзакций\n" in captured.out
+    assert "RUB: 54 транзакций на сумму 1178012.00" in captured.out
+    assert "Отбраковано записей: 1" in captured.err
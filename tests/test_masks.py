@@ -1,5 +1,6 @@
 import pytest
-from scr.masks import get_mask_card_number, get_mask_account
+from scr.masks import (get_mask_card_number, get_mask_account, mask_account_card, mask_instruments,
+                       mask_transactions, masking_cache_info)
 
 
 def test_get_mask_card_number() -> None:
@@ -38,3 +39,45 @@ def test_get_mask_account() -> None:
 
     with pytest.raises(ValueError, match="Номер счёта должен содержать минимум 4 цифры."):
         get_mask_account("")  # Пустая строка
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Visa 1959232722494097", "Visa 1959 23 ** **** **** 4097"),
+    ("Visa Classic 6831982476737658", "Visa Classic 6831 98 ** **** **** 7658"),
+    ("Счет 58803664561298323391", "Счет ****323391"),
+    ("Cчет: 12345678", "Cчет ****5678"),
+    ("Карта 1234-5678-9012-3456", "Карта 1234 56 ** **** **** 3456"),
+    ("Maestro 1234", "Maestro ****1234"),
+    ("Карта ABCD-EFGH", "Карта ABCD-EFGH"),  # Номера нет — маскировать нечего
+    ("64686473678894779589", "****779589"),
+    # Текст после номера: номер всё равно маскируется
+    ("Visa 1234567812345678 (основная)", "Visa 1234 56 ** **** **** 5678 (основная)"),
+    ("Счет 40817810099910004312.", "Счет ****004312."),
+    ("Visa 4276 3800 1234 5678 / Счет 40817810099910004312",
+     "Visa 4276 38 ** **** **** 5678 / Счет ****004312"),
+    ("Карта 12 (доп.)", "Карта ** (доп.)"),
+])
+def test_mask_account_card(value, expected):
+    """Функция тестирования маскирования строк from/to"""
+    assert mask_account_card(value) == expected
+
+
+def test_mask_instruments_batch() -> None:
+    """Пакетное маскирование столбца с повторами использует кэш"""
+    column = ["Visa 1959232722494097", None, "", "Счет 58803664561298323391"] * 3
+    before = masking_cache_info()["hits"]
+
+    masked = mask_instruments(column)
+    assert masked[:4] == ["Visa 1959 23 ** **** **** 4097", None, "", "Счет ****323391"]
+    assert masked[4:] == masked[:4] * 2
+    assert masking_cache_info()["hits"] - before >= 4
+
+
+def test_mask_transactions() -> None:
+    """Маскирование полей from/to не меняет исходные записи"""
+    tx = {"id": 1, "from": "Maestro 1596837868705199", "to": "Счет 64686473678894779589"}
+    assert list(mask_transactions([tx, {"id": 2}])) == [
+        {"id": 1, "from": "Maestro 1596 83 ** **** **** 5199", "to": "Счет ****779589"},
+        {"id": 2},
+    ]
+    assert tx["from"] == "Maestro 1596837868705199"
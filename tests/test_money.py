@@ -0,0 +1,61 @@
+from decimal import Decimal
+
+import pytest
+from scr.money import format_amount, mean_decimal, parse_amount, parse_amounts, to_decimal
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("31957.58", 3195758),
+    ("16210", 1621000),
+    ("0.5", 50),
+    (".05", 5),
+    ("-12.3", -1230),
+    ("+7", 700),
+    ("1 000,50", 100050),
+    ("1,000.50", 100050),
+    ("-12,345,678.9", -1234567890),
+    ("1.000,50", 100050),
+    # Запятая перед группами по три цифры — разряды тысяч, как и в "1,000.50"
+    ("1,000", 100000),
+    ("12,345", 1234500),
+    ("1,000,000", 100000000),
+    ("-12,345", -1234500),
+    ("12,34", 1234),
+    ("0,500", 50),
+    ("1000,500", 100050),
+    ("1.005", 101),
+    ("1.004", 100),
+    (12345, 1234500),
+    (0.1, 10),
+    (8221.37, 822137),
+    (1e-07, 0),
+    (Decimal("9824.07"), 982407),
+    (None, 0),
+    ("", 0),
+])
+def test_parse_amount(value, expected):
+    assert parse_amount(value) == expected
+
+
+@pytest.mark.parametrize("value", ["abc", "1.2.3", "-", ".", "12a", True, [1], "1,00.50", "1,000.5,0", ",000.50",
+                                   "1,00,000", "1,2,3"])
+def test_parse_amount_invalid(value):
+    with pytest.raises(ValueError, match="Некорректная сумма"):
+        parse_amount(value)
+
+
+def test_parse_amounts():
+    assert parse_amounts(["1.10", "2", 3.3]) == [110, 200, 330]
+
+
+def test_format_amount():
+    assert format_amount(3195758) == "31957.58"
+    assert format_amount(5) == "0.05"
+    assert format_amount(-1230) == "-12.30"
+    assert format_amount(0) == "0.00"
+
+
+def test_to_decimal_and_mean():
+    assert to_decimal(3195758) == Decimal("31957.58")
+    assert mean_decimal(1000, 3) == Decimal("3.33")
+    assert mean_decimal(0, 0) == Decimal("0.00")
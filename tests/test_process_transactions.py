@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+import pytest
+from scr.processing import process_transactions, TransactionAggregator
+
+
+@pytest.fixture
+def mixed_transactions():
+    return [
+        {
+            "id": 1,
+            "state": "EXECUTED",
+            "operationAmount": {"amount": "100.50", "currency": {"name": "руб.", "code": "RUB"}},
+            "description": "Перевод организации",
+        },
+        {
+            "id": 2,
+            "state": "CANCELED",
+            "operationAmount": {"amount": "20.00", "currency": {"name": "USD", "code": "USD"}},
+            "description": "Перевод организации",
+        },
+        {
+            "id": 3,
+            "state": "EXECUTED",
+            "amount": "300",
+            "currency_code": "RUB",
+            "description": "Открытие вклада",
+        },
+    ]
+
+
+def test_process_transactions_totals(mixed_transactions):
+    result = process_transactions(mixed_transactions)
+
+    assert result["count"] == 3
+    assert result["total_amount"] == Decimal("420.50")
+    assert result["min_amount"] == Decimal("20.00")
+    assert result["max_amount"] == Decimal("300.00")
+    assert result["mean_amount"] == Decimal("140.17")
+    assert result["transactions"] == mixed_transactions
+
+
+def test_process_transactions_groups(mixed_transactions):
+    result = process_transactions(iter(mixed_transactions), keep_records=False)
+
+    assert result["transactions"] is None
+    assert result["by_currency"]["RUB"]["count"] == 2
+    assert result["by_currency"]["RUB"]["total"] == Decimal("400.50")
+    assert result["by_currency"]["USD"]["total"] == Decimal("20.00")
+    assert result["by_state"]["EXECUTED"]["max"] == Decimal("300.00")
+    assert result["by_description"]["Перевод организации"]["count"] == 2
+
+
+def test_process_transactions_empty():
+    result = process_transactions([])
+    assert result["count"] == 0
+    assert result["total_amount"] == 0
+    assert result["min_amount"] is None
+    assert result["by_currency"] == {}
+
+
+def test_process_transactions_missing_fields():
+    # Пустая запись (как в data/operations.json) учитывается с нулевой суммой и без групп
+    result = process_transactions([{}])
+    assert result["count"] == 1
+    assert result["by_state"] == {}
+
+
+def test_aggregator_merge(mixed_transactions):
+    left = TransactionAggregator().consume(mixed_transactions[:1])
+    right = TransactionAggregator().consume(mixed_transactions[1:])
+
+    merged = left.merge(right).result()
+    expected = process_transactions(mixed_transactions, keep_records=False)
+    assert merged == expected
+
+
+def test_process_transactions_exact_total():
+    # Сумма 0.10 десять раз во float дала бы 0.9999999999999999
+    result = process_transactions([{"amount": "0.10"}] * 10, keep_records=False)
+    assert result["total_amount"] == Decimal("1.00")
+    assert str(result["total_amount"]) == "1.00"
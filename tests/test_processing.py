@@ -1,6 +1,6 @@
 
 import pytest
-from scr.processing import get_mask_card_number, filter_by_state, sort_by_date
+from scr.processing import as_values, get_currency_name, get_mask_card_number, filter_by_state, sort_by_date
 
 
 def test_get_mask_card_number() -> None:
@@ -77,3 +77,11 @@ def test_sort_by_date() -> None:
     # Ничего не передано в функцию (пустой список)
     sorted_transactions = sort_by_date([], reverse=True)
     assert sorted_transactions == []  # Результат тоже пустой список
+
+
+def test_get_currency_name_and_as_values() -> None:
+    assert get_currency_name({"operationAmount": {"currency": {"name": "руб.", "code": "RUB"}}}) == "руб."
+    assert get_currency_name({"currency_name": "Sol", "currency_code": "PEN"}) == "Sol"
+    assert get_currency_name({}) is None
+    assert as_values("USD") == ["USD"]
+    assert as_values(("USD", "EUR")) == ["USD", "EUR"]
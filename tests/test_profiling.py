@@ -0,0 +1,88 @@
+import json
+import pstats
+import time
+
+import pytest
+from scr import profiling
+from scr.main import main
+from scr.reports import write_report
+
+
+def slow(items, delay):
+    for item in items:
+        time.sleep(delay)
+        yield item
+
+
+def test_disabled_is_passthrough():
+    # Без активного профилирования обёрток нет вовсе
+    items = [1, 2, 3]
+    assert profiling.instrument(items, "parse") is items
+    assert profiling.stage("a") is profiling.stage("b")
+    profiling.count("parse", rows=1)
+    assert profiling.active() is None
+
+
+def test_stage_times_are_exclusive():
+    with profiling.profile() as prof:
+        rows = profiling.instrument(slow(range(5), 0.01), "parse")
+        with profiling.stage("aggregate"):
+            total = sum(rows)
+    report = prof.report()["stages"]
+    assert total == 10
+    assert report["parse"]["rows"] == 5
+    # Время получения строк засчитано parse, а не объемлющему aggregate
+    assert report["parse"]["seconds"] >= 0.05
+    assert report["aggregate"]["seconds"] < report["parse"]["seconds"]
+    assert "parse" in prof.format_report()
+
+
+def test_hooks_and_memory():
+    events = []
+    hook = lambda event, stage, data: events.append((event, stage))  # noqa: E731
+    profiling.add_hook(hook)
+    try:
+        with profiling.profile(memory=True) as prof:
+            with profiling.stage("build"):
+                data = [bytes(1024) for _ in range(1000)]
+            profiling.count("build", rows=len(data), nbytes=1024 * len(data))
+    finally:
+        profiling.remove_hook(hook)
+    stats = prof.report()["stages"]["build"]
+    assert stats["alloc_peak_mb"] >= 1
+    assert stats["bytes"] == 1024 * 1000
+    assert events == [("stage_end", "build"), ("count", "build")]
+
+
+def test_nested_profile_rejected():
+    with profiling.profile():
+        with pytest.raises(RuntimeError):
+            with profiling.profile():
+                pass
+
+
+def test_write_report_counts_bytes(tmp_path):
+    path = tmp_path / "report.jsonl"
+    with profiling.profile() as prof:
+        write_report([{"id": i} for i in range(10)], path)
+    stats = prof.report()["stages"]["write"]
+    assert stats["rows"] == 10
+    assert stats["bytes"] == path.stat().st_size
+
+
+def test_main_profile_flag(tmp_path, monkeypatch, capsys):
+    data = tmp_path / "operations.json"
+    data.write_text(json.dumps([{"id": 1, "state": "EXECUTED", "date": "2019-08-26T10:50:58.294041",
+                                 "operationAmount": {"amount": "10.00", "currency": {"code": "RUB"}},
+                                 "description": "Перевод организации"}]), encoding="utf-8")
+    answers = iter(["1", str(data)])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    output = tmp_path / "run.prof"
+
+    main(["--profile", "--profile-output", str(output)])
+
+    captured = capsys.readouterr()
+    assert "RUB: 1 транзакций на сумму 10.00" in captured.out
+    for name in ("parse", "aggregate", "output"):
+        assert name in captured.err
+    assert pstats.Stats(str(output)).total_calls > 0
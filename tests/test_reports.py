@@ -0,0 +1,151 @@
+import csv
+import gzip
+import json
+from decimal import Decimal
+
+import pytest
+from scr import reports
+from scr.file_handlers import FileHandler
+from scr.reports import ReportWriter, detect_report_format, write_report
+
+
+@pytest.fixture
+def records():
+    return [
+        {"id": i, "state": "EXECUTED", "date": "2019-08-26T10:50:58.294041",
+         "operationAmount": {"amount": f"{i}.50", "currency": {"name": "руб.", "code": "RUB"}},
+         "total": Decimal(f"{i}.50")}
+        for i in range(1, 26)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    # Маленькая пачка, чтобы проверить склейку нескольких пачек
+    monkeypatch.setattr(reports, "WRITE_BATCH_SIZE", 7)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("report.json", ("json", None)),
+    ("report.jsonl.gz", ("jsonl", "gzip")),
+    ("report.ndjson", ("jsonl", None)),
+    ("report.csv.zst", ("csv", "zstd")),
+    ("report.xlsx", ("xlsx", None)),
+])
+def test_detect_report_format(name, expected):
+    assert detect_report_format(name) == expected
+
+
+def test_detect_report_format_unknown():
+    with pytest.raises(ValueError, match="Неподдерживаемый формат отчёта"):
+        detect_report_format("report.txt")
+
+
+def test_json_array_is_compact(tmp_path, records):
+    path = tmp_path / "report.json"
+    assert write_report(iter(records), path) == 25
+
+    text = path.read_text(encoding="utf-8")
+    assert "\n" not in text and ", " not in text
+    loaded = json.loads(text)
+    assert len(loaded) == 25
+    assert loaded[0]["total"] == "1.50"
+
+
+def test_jsonl_gzip(tmp_path, records):
+    path = tmp_path / "report.jsonl.gz"
+    write_report(iter(records), path)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 25
+    assert json.loads(lines[-1])["id"] == 25
+
+
+def test_csv_declared_schema(tmp_path, records):
+    path = tmp_path / "report.csv"
+    write_report(iter(records), path, fieldnames=["id", "operationAmount.amount", "operationAmount.currency.code"])
+
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["id", "operationAmount.amount", "operationAmount.currency.code"]
+    assert rows[1] == ["1", "1.50", "RUB"]
+    assert len(rows) == 26
+
+
+def test_writer_incremental_and_empty(tmp_path, records):
+    path = tmp_path / "report.json"
+    with ReportWriter(path) as writer:
+        for record in records[:3]:
+            writer.write(record)
+    assert [r["id"] for r in json.loads(path.read_text(encoding="utf-8"))] == [1, 2, 3]
+
+    empty = tmp_path / "empty.csv"
+    write_report([], empty, fieldnames=["id", "state"])
+    assert empty.read_bytes() == b"id,state\r\n"
+
+
+def test_xlsx_write_only(tmp_path, records):
+    path = tmp_path / "report.xlsx"
+    FileHandler.save_report(iter(records), path, fieldnames=["id", "state", "operationAmount.amount"])
+
+    rows = list(FileHandler.iter_xlsx(path))
+    assert len(rows) == 25
+    assert rows[0] == {"id": 1, "state": "EXECUTED", "operationAmount.amount": "1.50"}
+
+    with pytest.raises(ValueError, match="XLSX"):
+        ReportWriter(tmp_path / "report.xlsx", fmt="xlsx", compression="gzip")
+
+
+def test_save_report_csv_from_first_record(tmp_path):
+    path = tmp_path / "report.csv"
+    FileHandler.save_report([{"a": 1, "b": None}, {"a": 2, "b": "x"}], path)
+    assert path.read_bytes() == b"a,b\r\n1,\r\n2,x\r\n"
+
+
+def test_csv_header_from_first_batch(tmp_path):
+    # Ключ "from" есть не в первой записи, но в первой пачке — столбец не теряется
+    path = tmp_path / "report.csv"
+    write_report([{"id": 1, "to": "a"}, {"id": 2, "from": "b", "to": "c"}], path)
+    assert path.read_bytes() == b"id,from,to\r\n1,,a\r\n2,b,c\r\n"
+
+
+def test_csv_flattens_nested_fields(tmp_path, records):
+    path = tmp_path / "report.csv"
+    write_report(iter(records), path)
+
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["id", "state", "date", "operationAmount.amount", "operationAmount.currency.name",
+                       "operationAmount.currency.code", "total"]
+    assert rows[1] == ["1", "EXECUTED", "2019-08-26T10:50:58.294041", "1.50", "руб.", "RUB", "1.50"]
+
+
+@pytest.mark.parametrize("name", ["report.json", "report.csv", "report.xlsx"])
+def test_failed_write_leaves_no_report(tmp_path, records, name):
+    def failing():
+        yield from records[:10]
+        raise RuntimeError("сбой источника")
+
+    path = tmp_path / name
+    with pytest.raises(RuntimeError):
+        write_report(failing(), path)
+    assert list(tmp_path.iterdir()) == []
+
+    # Прежний отчёт остаётся нетронутым
+    path.write_text("old", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        write_report(failing(), path)
+    assert list(tmp_path.iterdir()) == [path]
+    assert path.read_text(encoding="utf-8") == "old"
+
+
+def test_csv_key_after_header_raises(tmp_path):
+    with ReportWriter(tmp_path / "report.csv") as writer:
+        writer.write({"id": 1})
+        with pytest.raises(ValueError, match="Поля extra нет в заголовке"):
+            writer.write({"id": 2, "extra": "x"})
+    # Явно заданные столбцы — это выборка, лишние ключи пропускаются
+    path = tmp_path / "declared.csv"
+    write_report([{"id": 1}, {"id": 2, "extra": "x"}], path, fieldnames=["id"])
+    assert path.read_bytes() == b"id\r\n1\r\n2\r\n"
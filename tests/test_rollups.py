@@ -0,0 +1,107 @@
+import json
+from decimal import Decimal
+
+import pytest
+from scr.rollups import RollupStore, day_ordinal
+
+
+@pytest.fixture
+def transactions(make_tx):
+    return [
+        make_tx(1, "USD", "EXECUTED", "2019-01-15T10:00:00.000000", "1500.00"),
+        make_tx(2, "USD", "CANCELED", "2019-01-15T11:00:00.000000", "2000.00"),
+        make_tx(3, "RUB", "EXECUTED", "2019-02-10T10:00:00.000000", "50000.00"),
+        make_tx(4, "USD", "EXECUTED", "2019-06-30T23:59:00Z", "999.99"),
+        make_tx(5, "USD", "EXECUTED", "2020-01-01T02:00:00+03:00", "0.01"),
+        {"id": 6, "state": "EXECUTED"},
+    ]
+
+
+@pytest.fixture
+def store(transactions):
+    return RollupStore().consume(transactions)
+
+
+def test_day_ordinal_utc_offset():
+    # Смещение часового пояса учитывается: 02:00+03:00 — это ещё 31 декабря по UTC
+    assert day_ordinal("2020-01-01T02:00:00+03:00") == day_ordinal("2019-12-31")
+    assert day_ordinal("2019-06-30T23:59:00Z") == day_ordinal("2019-06-30")
+    assert day_ordinal("bad") is None
+
+
+@pytest.mark.parametrize("conditions, count, total", [
+    ({}, 5, Decimal("54500.00")),
+    ({"currency": "USD"}, 4, Decimal("4500.00")),
+    ({"currency": "USD", "state": "EXECUTED"}, 3, Decimal("2500.00")),
+    ({"date_from": "2019-01-15", "date_to": "2019-01-15"}, 2, Decimal("3500.00")),
+    ({"date_from": "2019-02-01", "date_to": "2019-06-30"}, 2, Decimal("50999.99")),
+    ({"date_from": "2021-01-01"}, 0, Decimal("0.00")),
+    ({"currency": "EUR"}, 0, Decimal("0.00")),
+])
+def test_range_total(store, conditions, count, total):
+    assert store.range_total(**conditions) == {"count": count, "total": total}
+
+
+def test_skipped_without_date(store):
+    assert store.skipped == 1
+
+
+def test_rollup_periods(store):
+    assert store.rollup("month", state="EXECUTED") == [
+        {"period": "2019-01", "count": 1, "total": Decimal("1500.00")},
+        {"period": "2019-02", "count": 1, "total": Decimal("50000.00")},
+        {"period": "2019-06", "count": 1, "total": Decimal("999.99")},
+        {"period": "2019-12", "count": 1, "total": Decimal("0.01")},
+    ]
+    assert [row["period"] for row in store.rollup("year")] == ["2019"]
+    with pytest.raises(ValueError):
+        store.rollup("week")
+
+
+def test_incremental_update_invalidates_prefix(store, make_tx):
+    assert store.range_total(currency="USD")["count"] == 4
+    store.add(make_tx(7, "USD", "EXECUTED", "2019-03-01T00:00:00", "10.00"))
+    assert store.range_total(currency="USD") == {"count": 5, "total": Decimal("4510.00")}
+
+
+def test_save_load_roundtrip(store, tmp_path):
+    path = tmp_path / "rollups.json"
+    store.save(path)
+    loaded = RollupStore.load(path)
+    assert loaded.rollup("day") == store.rollup("day")
+    assert RollupStore.load(tmp_path / "missing.json").range_total()["count"] == 0
+
+
+def test_ingest_dir_only_new_files(tmp_path, transactions):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.json").write_text(json.dumps(transactions[:3]), encoding="utf-8")
+    store = RollupStore()
+    assert len(store.ingest_dir(data)) == 1
+
+    (data / "b.json").write_text(json.dumps(transactions[3:5]), encoding="utf-8")
+    assert [path.name for path in store.ingest_dir(data)] == ["b.json"]
+    assert store.ingest_dir(data) == []
+    assert store.range_total()["count"] == 5
+
+    # Изменение уже учтённого файла не должно приводить к двойному учёту
+    (data / "a.json").write_text(json.dumps(transactions[:1]), encoding="utf-8")
+    with pytest.raises(ValueError):
+        store.ingest_file(data / "a.json")
+
+
+def test_failed_file_leaves_store_unchanged(tmp_path, transactions, make_tx):
+    path = tmp_path / "a.json"
+    # Некорректная сумма в третьей записи: первые две уже разобраны к моменту ошибки
+    broken = transactions[:2] + [make_tx(7, "USD", "EXECUTED", "2019-03-01T10:00:00", "1.2.3")]
+    path.write_text(json.dumps(broken), encoding="utf-8")
+    store = RollupStore()
+    with pytest.raises(ValueError, match="Некорректная сумма"):
+        store.ingest_file(path)
+    assert store.range_total()["count"] == 0
+    assert store.sources == {}
+
+    # После исправления файл учитывается один раз
+    path.write_text(json.dumps(transactions[:3]), encoding="utf-8")
+    assert store.ingest_file(path)
+    assert store.range_total()["count"] == 3
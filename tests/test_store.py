@@ -0,0 +1,105 @@
+import json
+from decimal import Decimal
+
+import pytest
+from scr.index import TransactionIndex
+from scr.processing import process_transactions
+from scr.store import TransactionStore
+from scr.table import TransactionTable
+from scr.validation import Quarantine
+
+
+@pytest.fixture
+def transactions(make_tx):
+    return [
+        make_tx(1, "USD", "EXECUTED", "2019-01-15T10:00:00.000000", "1500.00", to="Счет 64686473678894779589"),
+        make_tx(2, "USD", "CANCELED", "2019-03-01T10:00:00.000000", "2000.00"),
+        make_tx(3, "RUB", "EXECUTED", "2019-04-10T10:00:00.000000", "50000.00"),
+        make_tx(4, "USD", "EXECUTED", "2019-06-30T23:59:00.000000", "999.99"),
+        make_tx(5, "USD", "EXECUTED", "2019-07-01T00:00:00Z", "3000.00"),
+        make_tx(6, "USD", "EXECUTED", "2019-06-30T12:00:00Z", "1000.01"),
+    ]
+
+
+@pytest.fixture
+def store(transactions):
+    with TransactionStore() as store:
+        store.ingest(transactions)
+        yield store
+
+
+def test_ingest_deduplicates_by_id(store, transactions, make_tx):
+    # Повторная загрузка тех же данных ничего не добавляет
+    assert store.ingest(transactions) == 0
+    assert store.ingest([make_tx(7, "EUR", "EXECUTED", "2019-08-01", "1.00"), {"state": "EXECUTED"}]) == 1
+    assert len(store) == 7
+    assert store.skipped == 1
+
+
+def test_unstorable_rows_are_quarantined(transactions):
+    quarantine = Quarantine()
+    rows = transactions + [{"state": "EXECUTED"}, {**transactions[0], "id": "abc"},
+                           {**transactions[0], "id": 99, "operationAmount": {"amount": "1.2.3"}}]
+    with TransactionStore() as store:
+        assert store.ingest(rows, quarantine=quarantine, source="day.json") == 6
+        assert store.skipped == 3
+        # Итоги совпадают с process_transactions по записям, прошедшим в базу
+        assert store.aggregate() == process_transactions(transactions, keep_records=False)
+    assert quarantine.reasons == {"id: нет значения": 1, "id: некорректное значение": 1,
+                                  "operationAmount.amount: некорректное значение": 1}
+
+
+@pytest.mark.parametrize("conditions, expected", [
+    ({"currency": "USD", "state": "EXECUTED", "date_from": "2019-01-01", "date_to": "2019-06-30",
+      "min_amount": "1000.01"}, [1, 6]),
+    ({"currency": ["RUB", "EUR"]}, [3]),
+    ({"date_to": "2019-06-30"}, [1, 2, 3, 6, 4]),
+    ({"max_amount": "999.99"}, [4]),
+])
+def test_filter_matches_index(store, transactions, conditions, expected):
+    assert [tx["id"] for tx in store.filter(**conditions)] == expected
+    # Тот же результат, что у индекса и таблицы в памяти (дата без времени в date_to включает весь день)
+    assert sorted(tx["id"] for tx in TransactionIndex(transactions).query(**conditions)) == sorted(expected)
+    assert sorted(TransactionTable.from_records(transactions).filter(**conditions).ids) == sorted(expected)
+
+
+def test_date_only_upper_bound_covers_whole_day(make_tx):
+    records = [make_tx(1, "RUB", "EXECUTED", "2019-06-30T10:00:00", "100.00")]
+    with TransactionStore() as store:
+        store.ingest(records)
+        assert store.count(date_to="2019-06-30") == 1
+    assert len(TransactionIndex(records).query(date_to="2019-06-30")) == 1
+    assert TransactionTable.from_records(records).mask(date_to="2019-06-30").sum() == 1
+
+
+def test_records_roundtrip(store, transactions):
+    record = store.filter(currency="USD", max_amount="1500.00", min_amount="1500.00")[0]
+    assert record["operationAmount"] == transactions[0]["operationAmount"]
+    assert record["to"] == "Счет 64686473678894779589"
+    assert "from" not in record
+
+
+def test_aggregates_match_in_memory(store, transactions):
+    assert store.sum(currency="USD") == Decimal("8500.00")
+    assert store.group_by("state") == TransactionTable.from_records(transactions).group_by("state")
+
+    expected = process_transactions(transactions, keep_records=False)
+    assert store.aggregate() == expected
+    assert store.aggregate(currency="EUR")["count"] == 0
+
+
+def test_indexes_used(store):
+    assert any("idx_transactions_currency" in step for step in store.explain(currency="USD"))
+    assert any("idx_transactions_date" in step for step in store.explain(date_from="2019-01-01"))
+
+
+def test_persistent_file(tmp_path, transactions):
+    source = tmp_path / "operations.json"
+    source.write_text(json.dumps(transactions), encoding="utf-8")
+    db = tmp_path / "transactions.db"
+    with TransactionStore(db) as store:
+        assert store.ingest_dir(tmp_path) == 6
+        assert store.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    with TransactionStore(db) as store:
+        assert store.count(state="EXECUTED") == 5
+        assert store.ingest_file(source) == 0
@@ -0,0 +1,125 @@
+import json
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from scr.table import TransactionTable
+
+
+@pytest.fixture
+def transactions():
+    return [
+        {
+            "id": 1, "state": "EXECUTED", "date": "2019-08-26T10:50:58.294041",
+            "operationAmount": {"amount": "31957.58", "currency": {"name": "руб.", "code": "RUB"}},
+            "description": "Перевод организации", "from": "Maestro 1596837868705199", "to": "Счет 64686473678894779589",
+        },
+        {
+            "id": 2, "state": "CANCELED", "date": "2018-06-30T02:08:58.425572",
+            "operationAmount": {"amount": "9824.07", "currency": {"name": "USD", "code": "USD"}},
+            "description": "Перевод организации", "from": "Счет 75106830613657916952", "to": "Счет 11776614605963066702",
+        },
+        {
+            "id": 3, "state": "EXECUTED", "date": "2019-01-15T12:00:00.000000",
+            "operationAmount": {"amount": "1000.00", "currency": {"name": "USD", "code": "USD"}},
+            "description": "Открытие вклада", "to": "Счет 35383033474447895560",
+        },
+        {
+            "id": "4", "state": "EXECUTED", "date": "2023-09-05T11:30:32Z",
+            "amount": "16210", "currency_name": "Sol", "currency_code": "PEN",
+            "from": "Visa 1959232722494097", "to": "Visa 6804119550473710", "description": "Перевод с карты на карту",
+        },
+    ]
+
+
+@pytest.fixture
+def table(transactions):
+    return TransactionTable.from_records(transactions)
+
+
+def test_from_records_columns(table):
+    assert len(table) == 4
+    assert table.ids.dtype == np.int64
+    assert table.dates.dtype == np.dtype("datetime64[us]")
+    assert table.amounts.dtype == np.int64
+    assert table.amounts[0] == 3195758
+    assert table.categories("currency") == ["RUB", "USD", "PEN"]
+    assert list(table.column("from")) == [
+        "Maestro 1596837868705199", "Счет 75106830613657916952", None, "Visa 1959232722494097"
+    ]
+    assert table.dates[3] == np.datetime64("2023-09-05T11:30:32")
+
+
+def test_from_records_bad_date_does_not_abort(transactions):
+    transactions[0]["date"] = "not a date"
+    transactions[1]["date"] = "20180630"
+    table = TransactionTable.from_records(transactions)
+    assert np.isnat(table.dates[0])
+    assert table.dates[1] == np.datetime64("2018-06-30")
+
+
+def test_filter(table):
+    assert list(table.filter(currency="USD").ids) == [2, 3]
+    assert list(table.filter(currency="USD", state="EXECUTED").ids) == [3]
+    assert list(table.filter(currency=["RUB", "PEN"]).ids) == [1, 4]
+    assert list(table.filter(date_from="2019-01-01", date_to="2019-06-30").ids) == [3]
+    assert list(table.filter(min_amount=10000).ids) == [1, 4]
+    assert list(table.filter(min_amount="9824.07", max_amount="9824.07").ids) == [2]
+    assert len(table.filter(currency="GBP")) == 0
+
+
+def test_sort(table):
+    assert list(table.sort("date").ids) == [2, 3, 1, 4]
+    assert list(table.sort("amount", reverse=True).ids) == [1, 4, 2, 3]
+    assert list(table.sort("currency").ids) == [4, 1, 2, 3]
+    with pytest.raises(ValueError):
+        table.sort("unknown")
+
+
+def test_sum_and_group_by(table):
+    assert table.sum() == Decimal("58991.65")
+    groups = table.group_by("currency")
+    assert groups["USD"] == {"count": 2, "total": Decimal("10824.07")}
+    assert table.filter(state="CANCELED").group_by("state") == {"CANCELED": {"count": 1, "total": Decimal("9824.07")}}
+
+
+def test_to_records_roundtrip(table, transactions):
+    records = list(table.to_records())
+    assert records[0] == transactions[0]
+    assert "from" not in records[2]
+    assert records[3]["operationAmount"]["currency"] == {"name": "Sol", "code": "PEN"}
+
+
+def test_from_json(tmp_path, transactions):
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(transactions[:3] + [{}], ensure_ascii=False), encoding="utf-8")
+    table = TransactionTable.from_json(path)
+    assert len(table) == 4
+    assert table.ids[3] == -1
+    assert np.isnat(table.dates[3])
+    assert table.filter(state="EXECUTED").sum() == Decimal("32957.58")
+
+
+def test_masked(table):
+    masked = table.masked()
+    assert masked.column("from")[0] == "Maestro 1596 83 ** **** **** 5199"
+    assert masked.column("from")[2] is None
+    assert masked.column("to")[1] == "Счет ****066702"
+    assert masked.codes("from") is table.codes("from")
+    assert table.column("from")[0] == "Maestro 1596837868705199"
+
+
+def test_masked_merges_colliding_cards():
+    # Две разные карты с одинаковыми первыми шестью и последними четырьмя цифрами
+    records = [
+        {"id": i, "state": "EXECUTED", "date": "2019-01-01T10:00:00", "from": card, "description": "Перевод",
+         "operationAmount": {"amount": "10.00", "currency": {"name": "руб.", "code": "RUB"}}}
+        for i, card in enumerate(["Visa 1234561111115678", "Visa 1234562222225678", "Visa 9999990000000000"], 1)
+    ]
+    masked = TransactionTable.from_records(records + [{**records[0], "id": 4, "from": None}]).masked()
+    label = masked.column("from")[0]
+    assert masked.column("from")[1] == label
+    assert masked.column("from")[3] is None
+    # Поиск по маске находит строки обеих карт
+    assert list(masked.take(masked._category_mask("from", label)).ids) == [1, 2]
+    assert masked.group_by("from")[label]["count"] == 2
@@ -0,0 +1,17 @@
+from scr.utils import format_transaction
+
+
+def test_format_transaction_amount():
+    # Сумма берётся из вложенной структуры operations.json без округления через float
+    tx = {"date": "", "description": "Перевод организации",
+          "operationAmount": {"amount": "31957.58", "currency": {"code": "RUB"}}}
+    assert format_transaction(tx)["amount"] == "31957.58 руб."
+    assert format_transaction({"amount": 100})["amount"] == "100.00 руб."
+    assert format_transaction({})["description"] == "Без описания"
+
+
+def test_format_transaction_iso_dates():
+    # Даты выгрузок с временем, микросекундами и 'Z' форматируются, а не выводятся как есть
+    assert format_transaction({"date": "2019-08-26T10:50:58.294041"})["date"] == "26.08.2019"
+    assert format_transaction({"date": "2023-09-05T11:30:32Z"})["date"] == "05.09.2023"
+    assert format_transaction({"date": "не дата"})["date"] == "не дата"
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from scr.validation import SCHEMA, Field, Quarantine, compile_validator, iter_valid
+
+
+@pytest.fixture
+def valid_tx():
+    return {
+        "id": 441945886,
+        "state": "EXECUTED",
+        "date": "2019-08-26T10:50:58.294041",
+        "operationAmount": {"amount": "31957.58", "currency": {"name": "руб.", "code": "RUB"}},
+        "description": "Перевод организации",
+        "from": "Maestro 1596837868705199",
+        "to": "Счет 64686473678894779589",
+    }
+
+
+def test_valid_records_pass(valid_tx):
+    validate = compile_validator()
+    assert validate(valid_tx) == []
+    # Открытие вклада: счёта списания нет и в настоящих выгрузках
+    deposit = {k: v for k, v in valid_tx.items() if k != "from"}
+    assert validate(deposit) == []
+    # Плоская запись CSV/XLSX
+    flat = {"id": "7", "state": "CANCELED", "date": "2023-09-05T11:30:32Z", "amount": "16210",
+            "currency_code": "PEN", "description": "Перевод организации"}
+    assert validate(flat) == []
+
+
+@pytest.mark.parametrize("change, reason", [
+    ({"operationAmount": {"currency": {"code": "RUB"}}}, "operationAmount.amount: нет значения"),
+    ({"description": ""}, "description: нет значения"),
+    ({"operationAmount": {"amount": "12,3x", "currency": {"code": "RUB"}}}, "operationAmount.amount: некорректное значение"),
+    ({"operationAmount": {"amount": "1.2.3", "currency": {"code": "RUB"}}}, "operationAmount.amount: некорректное значение"),
+    ({"date": "2019-13-45"}, "date: некорректное значение"),
+    ({"id": True}, "id: некорректное значение"),
+    ({"from": 123}, "from: некорректное значение"),
+])
+def test_invalid_records_report_reason(valid_tx, change, reason):
+    assert compile_validator()({**valid_tx, **change}) == [reason]
+
+
+def test_non_dict_record():
+    assert compile_validator()([1, 2]) == ["запись не является объектом"]
+
+
+def test_amounts_in_other_forms_are_accepted(valid_tx):
+    validate = compile_validator()
+    for amount in ("-0.5", "1 000,50", "1,000.50", 100, 12.5):
+        assert validate({**valid_tx, "operationAmount": {"amount": amount, "currency": {"code": "RUB"}}}) == []
+
+
+def test_custom_schema():
+    validate = compile_validator(SCHEMA + (Field('mcc', 'mcc', (str,), str.isdigit),))
+    assert validate({}).count("mcc: нет значения") == 1
+
+
+def test_iter_valid_routes_bad_rows_to_quarantine(valid_tx, tmp_path):
+    path = tmp_path / "quarantine.jsonl"
+    rows = [valid_tx, {"id": 2}, {**valid_tx, "id": 3}, {**valid_tx, "date": "вчера"}]
+    with Quarantine(path) as quarantine:
+        good = list(iter_valid(rows, quarantine, source="day1.json"))
+
+    assert [tx["id"] for tx in good] == [441945886, 3]
+    assert quarantine.count == 2
+    assert quarantine.reasons["date: нет значения"] == 1
+    entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [e["record"]["id"] for e in entries] == [2, 441945886]
+    assert entries[1] == {"source": "day1.json", "reasons": ["date: некорректное значение"],
+                          "record": {**valid_tx, "date": "вчера"}}
+    assert quarantine.summary()[0] == f"Отбраковано записей: 2 (см. {path})"
+
+
+def test_quarantine_without_file_only_counts(valid_tx):
+    quarantine = Quarantine()
+    assert list(iter_valid([{}, valid_tx], quarantine)) == [valid_tx]
+    assert quarantine.count == 1
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+# Окно проверяется без дисплея
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QThreadPool  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from scr.file_handlers import FileHandler  # noqa: E402
+from scr.viewer import TransactionLoader, TransactionTableModel, TransactionWidget, open_stream  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+def make_records(count):
+    return [{"id": i, "state": "EXECUTED", "date": "2019-08-26T10:50:58.294041",
+             "operationAmount": {"amount": f"{i}.50", "currency": {"name": "USD", "code": "USD"}},
+             "description": "Перевод организации", "from": "Visa Classic 6831982476737658",
+             "to": "Счет 38976430693692818358"} for i in range(count)]
+
+
+@pytest.fixture
+def operations_file(tmp_path):
+    path = tmp_path / "operations.json"
+    path.write_text(json.dumps(make_records(250)), encoding="utf-8")
+    return path
+
+
+def wait_for(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Фоновая загрузка не завершилась"
+        QThreadPool.globalInstance().waitForDone(10)
+        qapp.processEvents()
+
+
+def test_model_fetches_lazily(qapp):
+    model = TransactionTableModel(iter(make_records(250)), batch_size=100)
+    # До первой прокрутки ничего не прочитано
+    assert model.rowCount() == 0 and model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 100
+    model.fetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 250
+    assert not model.canFetchMore()
+
+    cells = [model.data(model.index(1, column)) for column in range(model.columnCount())]
+    assert cells == ["26.08.2019", "Перевод организации", "1.50", "USD", "EXECUTED",
+                     "Visa Classic 6831 98 ** **** **** 7658", "Счет ****818358"]
+
+
+def test_loader_progress_and_result(qapp, operations_file):
+    loader = TransactionLoader(operations_file, progress_every=100)
+    progress, results = [], []
+    loader.signals.progress.connect(lambda percent, rows: progress.append((percent, rows)))
+    loader.signals.finished.connect(results.append)
+    loader.run()
+    assert [rows for _, rows in progress] == [0, 100, 200, 250]
+    assert progress[-1][0] == 100
+    assert results[0]["count"] == 250
+
+
+def test_loader_cancel(qapp, operations_file):
+    loader = TransactionLoader(operations_file)
+    events = []
+    loader.signals.cancelled.connect(lambda: events.append("cancelled"))
+    loader.signals.finished.connect(lambda result: events.append("finished"))
+    loader.cancel()
+    loader.run()
+    assert events == ["cancelled"]
+
+
+def test_widget_loads_in_background(qapp, operations_file, monkeypatch):
+    opened_in = []
+    iter_any = FileHandler.iter_any
+
+    def recording_iter_any(file_path):
+        opened_in.append(threading.current_thread())
+        return iter_any(file_path)
+
+    monkeypatch.setattr(FileHandler, "iter_any", staticmethod(recording_iter_any))
+    widget = TransactionWidget()
+    widget.load_file(str(operations_file))
+    # Файл открывается и первая пачка читается в пуле потоков, а не в потоке интерфейса
+    wait_for(qapp, lambda: widget.model.rowCount() > 0)
+    assert opened_in and threading.main_thread() not in opened_in
+    wait_for(qapp, lambda: widget.result is not None)
+    assert widget.result["count"] == 250
+    assert widget.summary.text().startswith("Итого: 250 транзакций")
+    assert widget.progress.value() == 100
+    widget.close()
+
+
+def test_model_stops_on_malformed_source(qapp, tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text(json.dumps(make_records(3))[:-1] + ', {"id": oops}]', encoding="utf-8")
+    widget = TransactionWidget()
+    widget.load_file(str(path))
+    # Приложение не падает: записи до ошибки показаны, подгрузка остановлена, ошибка — в строке итогов
+    wait_for(qapp, lambda: widget.summary.text().startswith("Ошибка"))
+    assert widget.model.rowCount() == 3
+    assert not widget.model.canFetchMore()
+    assert widget.summary.text().startswith("Ошибка: Expecting value")
+
+    widget.load_file(str(tmp_path / "notes.txt"))
+    wait_for(qapp, lambda: widget.summary.text().startswith("Ошибка"))
+    assert widget.summary.text().startswith("Ошибка: Неподдерживаемый формат")
+    assert widget.model.rowCount() == 0
+    widget.close()
+
+
+def test_bad_amount_cell_is_shown_as_is(qapp):
+    model = TransactionTableModel([{"operationAmount": {"amount": "1.2.3"}}])
+    model.fetchMore()
+    assert model.data(model.index(0, TransactionTableModel.AMOUNT_COLUMN)) == "1.2.3"
+
+
+def test_open_stream_opens_file_lazily(operations_file, monkeypatch):
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *args, **kwargs: opened.append(args[0]) or real_open(*args, **kwargs))
+    records, position = open_stream(operations_file)
+    # Генератор закрыт до первого чтения — файл так и не открывался
+    assert opened == [] and position() == 0
+    records.close()
+    assert opened == []
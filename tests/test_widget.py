@@ -1,6 +1,12 @@
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from scr.widget import get_mask_account, get_date
 
+ROOT = Path(__file__).resolve().parent.parent
+
 
 # Фикстура для генерации тестовых данных для маскирования карт и счетов
 @pytest.fixture
@@ -76,3 +82,18 @@ def test_get_date(date_test_data):
             # Проверка результата
             result = get_date(input_date)
             assert result == expected
+
+
+def test_widget_helpers_do_not_load_qt():
+    # Классы окна и PyQt5 загружаются только при обращении к ним
+    import scr.widget
+    assert callable(scr.widget.get_date)
+    if "scr.viewer" not in sys.modules:
+        assert "PyQt5.QtWidgets" not in sys.modules
+
+
+def test_widget_star_import_does_not_load_qt():
+    code = ("import sys; from scr.widget import *; import scr.widget as w; "
+            "assert 'TransactionWidget' in dir(w); print('PyQt5' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"